@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Iterator
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+
+# --batch-size auto: batches start at the old fixed default and move
+# between these bounds; above AUTO_BATCH_MEMORY_HEADROOM of the RSS
+# ceiling they stop growing.
+AUTO_BATCH_INITIAL_ROWS = 50_000
+AUTO_BATCH_MIN_ROWS = 5_000
+AUTO_BATCH_MAX_ROWS = 1_000_000
+AUTO_BATCH_MEMORY_HEADROOM = 0.8
+
+
+@dataclass(frozen=True)
+class AutoBatchSize:
+    min_rows: int
+    max_rows: int
+    target_seconds: float
+    memory_limit_mb: float
+
+
+@dataclass
+class BatchSizer:
+    """Current batch size of an --batch-size auto run."""
+
+    settings: AutoBatchSize
+    rows: int = AUTO_BATCH_INITIAL_ROWS
+
+
+def adjust_batch_size(
+    batch_sizer: BatchSizer,
+    batch_rows: int,
+    elapsed_seconds: float,
+    memory_mb: float,
+) -> None:
+    """Steer the next batch towards the target latency under the RSS ceiling.
+
+    The next size is the one that would have taken target_seconds at the
+    last batch's rate, limited to halving or doubling per step. Above the
+    RSS ceiling the size is halved; close to it, it may not grow.
+    """
+    settings = batch_sizer.settings
+    rows = batch_sizer.rows
+
+    if memory_mb >= settings.memory_limit_mb:
+        proposed_rows = rows // 2
+    else:
+        proposed_rows = int(
+            batch_rows * settings.target_seconds / max(elapsed_seconds, 1e-6)
+        )
+        proposed_rows = min(max(proposed_rows, rows // 2), rows * 2)
+
+        if memory_mb >= settings.memory_limit_mb * AUTO_BATCH_MEMORY_HEADROOM:
+            proposed_rows = min(proposed_rows, rows)
+
+    batch_sizer.rows = min(
+        max(proposed_rows, settings.min_rows),
+        settings.max_rows,
+    )
+
+
+def adaptive_record_batches(
+    parquet_file: pq.ParquetFile,
+    batch_sizer: BatchSizer,
+    **iter_batches_options: Any,
+) -> Iterator[pa.RecordBatch]:
+    """Yield record batches of batch_sizer.rows, re-read before every batch.
+
+    iter_batches fixes its batch size up front, so the file is read in
+    min_rows chunks and the chunks are concatenated up to the current
+    size.
+    """
+    chunks: list[pa.RecordBatch] = []
+    chunk_rows = 0
+
+    for chunk in parquet_file.iter_batches(
+        batch_size=batch_sizer.settings.min_rows,
+        **iter_batches_options,
+    ):
+        chunks.append(chunk)
+        chunk_rows += chunk.num_rows
+
+        if chunk_rows >= batch_sizer.rows:
+            yield pa.concat_batches(chunks)
+
+            chunks = []
+            chunk_rows = 0
+
+    if chunks:
+        yield pa.concat_batches(chunks)
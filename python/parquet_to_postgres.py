@@ -1,53 +1,222 @@
 from __future__ import annotations
 
 import argparse
+import atexit
+import csv
+import hashlib
 import io
+import json
+import math
 import os
+import queue
+import re
+import struct
+import threading
+import tomllib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field, replace
+from functools import partial
+from datetime import date, datetime, timedelta, timezone
 from pathlib import Path
 from time import perf_counter
 
+import duckdb
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
 import pyarrow.parquet as pq
+import psutil
 import psycopg
 from dotenv import load_dotenv
 
 from psycopg import sql
-from typing import TypedDict
-
-
-COLUMN_MAP = {
-    "VendorID": "vendor_id",
-    "tpep_pickup_datetime": "tpep_pickup_datetime",
-    "tpep_dropoff_datetime": "tpep_dropoff_datetime",
-    "passenger_count": "passenger_count",
-    "trip_distance": "trip_distance",
-    "RatecodeID": "ratecode_id",
-    "store_and_fwd_flag": "store_and_fwd_flag",
-    "PULocationID": "pu_location_id",
-    "DOLocationID": "do_location_id",
-    "payment_type": "payment_type",
-    "fare_amount": "fare_amount",
-    "extra": "extra",
-    "mta_tax": "mta_tax",
-    "tip_amount": "tip_amount",
-    "tolls_amount": "tolls_amount",
-    "improvement_surcharge": "improvement_surcharge",
-    "total_amount": "total_amount",
-    "congestion_surcharge": "congestion_surcharge",
-    "Airport_fee": "airport_fee",
+from typing import Any, Callable, Iterator, TypedDict
+
+from batch_sizing import (
+    AUTO_BATCH_INITIAL_ROWS,
+    AUTO_BATCH_MAX_ROWS,
+    AUTO_BATCH_MIN_ROWS,
+    AutoBatchSize,
+    BatchSizer,
+    adaptive_record_batches,
+    adjust_batch_size,
+)
+
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+DEFAULT_COLUMN_MAP_PATH = SCRIPT_DIR / "loader" / "columns.toml"
+
+# arrow_type names accepted in a TOML column map.
+ARROW_TYPES = {
+    "bool": pa.bool_(),
+    "int16": pa.int16(),
+    "int32": pa.int32(),
+    "int64": pa.int64(),
+    "float32": pa.float32(),
+    "float64": pa.float64(),
+    "date32": pa.date32(),
+    "timestamp[us]": pa.timestamp("us"),
+    "string": pa.string(),
+}
+
+# make_data_dictionary.py (DuckDB) types; integers are sized by min/max.
+DICTIONARY_INTEGER_TYPES = {"TINYINT", "SMALLINT", "INTEGER", "BIGINT"}
+DICTIONARY_TYPES = {
+    "BOOLEAN": (pa.bool_(), "boolean"),
+    "DOUBLE": (pa.float64(), "numeric(18,4)"),
+    "FLOAT": (pa.float64(), "numeric(18,4)"),
+    "DATE": (pa.date32(), "date"),
+    "TIMESTAMP": (pa.timestamp("us"), "timestamp"),
+    "TIMESTAMP_NS": (pa.timestamp("us"), "timestamp"),
+    "VARCHAR": (pa.string(), "text"),
+}
+
+PARTITION_COLUMN = "tpep_pickup_datetime"
+PARTITION_SPAN_LIMIT_MONTHS = 3
+FILE_MONTH_PATTERN = re.compile(r"\d{4}-\d{2}")
+
+COPY_FORMATS = ["csv", "binary"]
+
+# copy: psycopg COPY fed by Arrow; duckdb: INSERT ... SELECT FROM
+# read_parquet through DuckDB's postgres extension.
+LOAD_ENGINES = ["copy", "duckdb"]
+DUCKDB_TYPES = {
+    pa.bool_(): "BOOLEAN",
+    pa.int16(): "SMALLINT",
+    pa.int32(): "INTEGER",
+    pa.int64(): "BIGINT",
+    pa.float32(): "FLOAT",
+    pa.float64(): "DOUBLE",
+    pa.date32(): "DATE",
+    pa.timestamp("us"): "TIMESTAMP",
+    pa.string(): "VARCHAR",
 }
+DUCKDB_FLOAT_TYPES = {"FLOAT", "DOUBLE", "REAL"}
+
+# --target duckdb:PATH keeps bronze in a local DuckDB file and rebuilds
+# the dbt silver and gold models from it after every load.
+DUCKDB_TARGET_PREFIX = "duckdb:"
+WAREHOUSE_SILVER_TABLE = "silver.silver_yellow_tripdata"
+WAREHOUSE_GOLD_TABLE = "gold.trip_distances_stats"
+
+# dbt/nyctaxi_dbt/models/silver/silver_yellow_tripdata.sql
+WAREHOUSE_SILVER_SQL = """
+CREATE OR REPLACE TABLE {silver} AS
+SELECT
+    *,
+    CASE
+        WHEN trip_distance < 0.25 THEN 'extreme_short'
+        WHEN trip_distance < 1 THEN 'very_short'
+        WHEN trip_distance < 3 THEN 'short'
+        WHEN trip_distance < 7 THEN 'medium'
+        WHEN trip_distance < 15 THEN 'long'
+        WHEN trip_distance < 50 THEN 'very_long'
+        ELSE 'extreme_long'
+    END AS trip_distance_class
+FROM {bronze}
+ORDER BY tpep_pickup_datetime
+"""
 
-INTEGER_COLUMNS = [
+# dbt/nyctaxi_dbt/models/gold/trip_distances_stats.sql
+WAREHOUSE_GOLD_SQL = """
+CREATE OR REPLACE TABLE {gold} AS
+SELECT
+    count(*) AS trip_count,
+    min(trip_distance) AS min_distance,
+    avg(trip_distance) AS mean_distance,
+    percentile_cont(0.5)
+        WITHIN GROUP (ORDER BY trip_distance) AS median_distance,
+    stddev_samp(trip_distance) AS stddev_distance,
+    avg(trip_distance) - stddev_samp(trip_distance) AS minus_1_stddev,
+    avg(trip_distance) + stddev_samp(trip_distance) AS plus_1_stddev,
+    avg(trip_distance) - (2 * stddev_samp(trip_distance)) AS minus_2_stddev,
+    avg(trip_distance) + (2 * stddev_samp(trip_distance)) AS plus_2_stddev,
+    max(trip_distance) AS max_distance
+FROM {silver}
+"""
+
+LOAD_MODES = ["append", "swap", "upsert"]
+
+# --mode upsert merges rows on their content hash: a staged row whose
+# row_hash the target already holds is unchanged. trip_key hashes these
+# target columns and pairs a revised row with the row it replaces. Both
+# keys lead with the partition column so they can back indexes on a
+# month-partitioned target.
+TRIP_KEY_COLUMNS = [
     "vendor_id",
-    "passenger_count",
-    "ratecode_id",
+    "tpep_pickup_datetime",
+    "tpep_dropoff_datetime",
     "pu_location_id",
     "do_location_id",
-    "payment_type",
 ]
+HASH_COLUMNS = ["trip_key", "row_hash"]
+UPSERT_KEY_COLUMNS = ["tpep_pickup_datetime", "row_hash"]
+TRIP_MATCH_COLUMNS = ["tpep_pickup_datetime", "trip_key"]
+
+# --reconcile compares per-day row counts and these sums with the target.
+RECONCILE_SUM_COLUMNS = ["total_amount", "trip_distance"]
+RECONCILE_ABSOLUTE_TOLERANCE = 0.005
+
+# Quarantined rows are stored with their locators and every target
+# column as text, so files with different source types share one schema.
+QUARANTINE_LOCATOR_FIELDS = [
+    pa.field("source_file", pa.string()),
+    pa.field("row_group", pa.int32()),
+    pa.field("row_offset", pa.int64()),
+    pa.field("failed_columns", pa.string()),
+    pa.field("reasons", pa.string()),
+]
+
+POSTGRES_LIMITED_TYPE_PATTERN = re.compile(
+    r"(numeric|decimal|varchar|character varying)\((\d+)(?:,\s*(\d+))?\)"
+)
+
+# Row hashes fold 64-bit column hashes with a multiply-xor step.
+HASH_SEED = np.uint64(0x345678)
+HASH_MULTIPLIER = np.uint64(1_000_003)
+NULL_HASH = np.uint64(0x9E3779B97F4A7C15)
+
+# PostgreSQL binary COPY framing: signature, flags field, header extension length.
+PGCOPY_HEADER = b"PGCOPY\n\xff\r\n\x00" + struct.pack("!ii", 0, 0)
+PGCOPY_TRAILER = struct.pack("!h", -1)
+
+# PostgreSQL stores timestamps and dates relative to 2000-01-01.
+POSTGRES_EPOCH_MICROSECONDS = 946_684_800_000_000
+POSTGRES_EPOCH_DAYS = 10_957
+
+# numeric is sent as base-10000 digit groups; an int64 holds at most five.
+NUMERIC_DIGIT_GROUPS = 5
+NUMERIC_POSITIVE = 0x0000
+NUMERIC_NEGATIVE = 0x4000
+# Scale of the numeric(18,4) amounts in loader/columns.toml.
+NUMERIC_DEFAULT_SCALE = 4
+# An unconstrained numeric gets the scale of its data, up to the 15
+# significant digits a float64 holds.
+NUMERIC_MAX_DATA_SCALE = 15
+
+FIXED_WIDTH_TYPES = {
+    "int2": (pa.int16(), ">i2"),
+    "int4": (pa.int32(), ">i4"),
+    "int8": (pa.int64(), ">i8"),
+    "float4": (pa.float32(), ">f4"),
+    "float8": (pa.float64(), ">f8"),
+}
 
-SOURCE_COLUMNS = list(COLUMN_MAP.keys())
-TARGET_COLUMNS = list(COLUMN_MAP.values())
+TEXT_TYPES = {"text", "varchar", "bpchar"}
+
+COPY_CHUNK_BYTES = 1_048_576
+
+# A Parquet file ends with a 4-byte little-endian footer length and "PAR1".
+PARQUET_TAIL_BYTES = 8
+
+PIPELINE_STAGES = ["read", "encode", "copy"]
+PIPELINE_DONE = object()
+PIPELINE_POLL_SECONDS = 0.1
+
+# Connection owned by a --workers process; opened once by the pool initializer.
+worker_connection: psycopg.Connection | None = None
 
 
 def parse_arguments() -> argparse.Namespace:
@@ -79,9 +248,32 @@ def parse_arguments() -> argparse.Namespace:
 
     parser.add_argument(
         "--batch-size",
-        type=int,
+        type=batch_size_argument,
         default=50_000,
-        help="Rows processed per batch. Default: 50000",
+        help=(
+            "Rows processed per batch, or 'auto' to size batches for "
+            "--target-batch-seconds under --max-memory-mb. Default: 50000"
+        ),
+    )
+
+    parser.add_argument(
+        "--target-batch-seconds",
+        type=float,
+        default=1.0,
+        help=(
+            "With --batch-size auto, the per-batch latency to aim for. "
+            "Default: 1.0"
+        ),
+    )
+
+    parser.add_argument(
+        "--max-memory-mb",
+        type=float,
+        default=2048,
+        help=(
+            "With --batch-size auto, the process RSS above which batches "
+            "shrink. Default: 2048"
+        ),
     )
 
     parser.add_argument(
@@ -90,15 +282,227 @@ def parse_arguments() -> argparse.Namespace:
         help="Target PostgreSQL relation.",
     )
 
+    parser.add_argument(
+        "--target",
+        type=target_argument,
+        default="postgres",
+        help=(
+            "postgres, or duckdb:PATH to load --table into a local DuckDB "
+            "warehouse file instead, sorted by pickup time, and rebuild "
+            f"{WAREHOUSE_SILVER_TABLE} and {WAREHOUSE_GOLD_TABLE} from it "
+            "(the dbt models) for trip_analytics.py. Supports --mode "
+            "append or swap and --truncate. Default: postgres"
+        ),
+    )
+
     parser.add_argument(
         "--truncate",
         action="store_true",
         help="Truncate the target table before loading.",
     )
 
+    parser.add_argument(
+        "--mode",
+        choices=LOAD_MODES,
+        default="append",
+        help=(
+            "'append' COPYs into the target table. 'swap' COPYs each "
+            "batch in pickup order into an UNLOGGED, index-free staging "
+            "table, then sets it LOGGED, builds the target's indexes on "
+            "it, analyzes it and swaps it in for the target in one "
+            "transaction, with the target's owner and GRANTs copied onto "
+            "it; a partitioned target gets each month's staging "
+            "partition attached instead. 'upsert' COPYs into a "
+            "staging table with a per-row trip_key and row_hash, then "
+            "merges it into the target on row_hash: rows the target holds "
+            "are left alone, a revised trip replaces its old row, and "
+            "other rows are inserted. On first use it adds trip_key and "
+            "row_hash columns and two indexes to the target. "
+            "Default: append"
+        ),
+    )
+
+    parser.add_argument(
+        "--partitioned",
+        action="store_true",
+        help=(
+            "Create the target as a table range-partitioned by pickup "
+            "month, with a default partition, if it does not exist. "
+            "Month partitions of a partitioned target are always created "
+            "on demand from the Parquet footer statistics."
+        ),
+    )
+
+    parser.add_argument(
+        "--replace-month",
+        type=parse_month,
+        action="append",
+        default=[],
+        metavar="YYYY-MM",
+        help=(
+            "Truncate this month's partition before loading and reload "
+            "the input files for it. May be repeated."
+        ),
+    )
+
+    parser.add_argument(
+        "--format",
+        dest="copy_format",
+        choices=COPY_FORMATS,
+        default="csv",
+        help=(
+            "COPY wire format. 'binary' encodes Arrow columns directly "
+            "into PostgreSQL binary COPY rows. Default: csv"
+        ),
+    )
+
+    parser.add_argument(
+        "--engine",
+        choices=LOAD_ENGINES,
+        default="copy",
+        help=(
+            "copy streams Arrow batches through psycopg COPY. duckdb "
+            "ATTACHes the target with DuckDB's postgres extension and "
+            "loads every pending file in one INSERT ... SELECT FROM "
+            "read_parquet([...]) transaction, scanning files in parallel "
+            "without Python row handling; it loads whole files and "
+            "does not support --mode upsert, --quarantine or "
+            "--reconcile. Default: copy"
+        ),
+    )
+
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help=(
+            "Number of loader processes. Each process opens its own "
+            "connection and loads Parquet row groups as separately "
+            "committed shards. With --engine duckdb, the number of "
+            "DuckDB threads instead. Default: 1"
+        ),
+    )
+
+    parser.add_argument(
+        "--pipeline-depth",
+        type=int,
+        default=0,
+        help=(
+            "Run Parquet decode, encoding and COPY as concurrent stages "
+            "with this many batches queued between stages. "
+            "0 runs the stages one after another. Default: 0"
+        ),
+    )
+
+    parser.add_argument(
+        "--encoder-threads",
+        type=int,
+        default=1,
+        help="Encoder threads used when --pipeline-depth is set. Default: 1",
+    )
+
+    parser.add_argument(
+        "--column-map",
+        type=Path,
+        default=DEFAULT_COLUMN_MAP_PATH,
+        help=(
+            "Target columns and their source names and types: a TOML "
+            "column map or a make_data_dictionary.py CSV. "
+            "Default: loader/columns.toml next to this script"
+        ),
+    )
+
+    parser.add_argument(
+        "--telemetry",
+        type=Path,
+        default=None,
+        help=(
+            "Append one JSON Lines record per batch with decode, "
+            "transform, encode, COPY and server times, bytes sent, rows/s "
+            "and process RSS, in the shape of validation_progress.jsonl. "
+            "Write it to data_out/load_progress.jsonl to chart it on the "
+            "Validation Analytics page."
+        ),
+    )
+
+    parser.add_argument(
+        "--quarantine",
+        type=Path,
+        default=None,
+        help=(
+            "Directory for rows the target would reject: values that "
+            "do not cast to their column type, NULLs in NOT NULL columns, "
+            "and numbers or strings beyond the PostgreSQL type. Those rows "
+            "are written there with their file, row group and row offset "
+            "while the rest of the file keeps loading, to one Parquet file "
+            "per source file and run, so the rows set aside by earlier or "
+            "interrupted runs are kept. Without it, one such value aborts "
+            "the file."
+        ),
+    )
+
+    parser.add_argument(
+        "--reconcile",
+        action="store_true",
+        help=(
+            "Aggregate per pickup day the row count and the sums of "
+            "total_amount and trip_distance while loading, then compare "
+            "them with the target table once the load, swap or merge is "
+            "done, and report every day that differs. The target side is "
+            "what each day gained over a grouped query taken before the "
+            "load (days a swap rebuilds start from zero); after an upsert "
+            "it is the staged rows the target holds."
+        ),
+    )
+
+    parser.add_argument(
+        "--ledger-table",
+        default="bronze.load_ledger",
+        help=(
+            "Table recording every committed row group. Row groups "
+            "already in the ledger are skipped, so an interrupted load "
+            "can simply be rerun. Default: bronze.load_ledger"
+        ),
+    )
+
     return parser.parse_args()
 
 
+def target_argument(value: str) -> str:
+    """argparse type for --target: postgres or duckdb:PATH."""
+    if value == "postgres":
+        return value
+
+    if value.startswith(DUCKDB_TARGET_PREFIX) and value.removeprefix(
+        DUCKDB_TARGET_PREFIX
+    ):
+        return value
+
+    raise argparse.ArgumentTypeError(
+        "must be postgres or duckdb:PATH, e.g. duckdb:data_out/nyctaxi.duckdb"
+    )
+
+
+def batch_size_argument(value: str) -> int | str:
+    """argparse type for --batch-size: a positive row count or 'auto'."""
+    if value == "auto":
+        return value
+
+    try:
+        batch_size = int(value)
+    except ValueError as error:
+        raise argparse.ArgumentTypeError(
+            f"Expected a row count or 'auto', got {value!r}."
+        ) from error
+
+    if batch_size <= 0:
+        raise argparse.ArgumentTypeError(
+            "Batch size must be greater than zero."
+        )
+
+    return batch_size
+
+
 def normalize_extension(extension: str) -> str:
     return extension if extension.startswith(".") else f".{extension}"
 
@@ -167,215 +571,5272 @@ def load_postgres_configuration(
     }
 
 
-def validate_source_schema(
+@dataclass(frozen=True)
+class ColumnSpec:
+    target: str
+    sources: tuple[str, ...]
+    arrow_type: pa.DataType
+    postgres_type: str
+    nullable: bool = True
+    required: bool = True
+
+
+def load_column_specs(column_map_path: Path) -> tuple[ColumnSpec, ...]:
+    """Read the target columns from a TOML column map or a data dictionary."""
+    if not column_map_path.exists():
+        raise FileNotFoundError(
+            f"Column map does not exist: {column_map_path}"
+        )
+
+    if column_map_path.suffix.lower() == ".toml":
+        column_specs = column_specs_from_toml(column_map_path)
+    elif column_map_path.suffix.lower() == ".csv":
+        column_specs = column_specs_from_dictionary(column_map_path)
+    else:
+        raise ValueError(
+            f"Unsupported column map: {column_map_path.name}. "
+            "Use a .toml column map or a make_data_dictionary.py .csv."
+        )
+
+    if not column_specs:
+        raise ValueError(f"{column_map_path.name} defines no columns.")
+
+    return column_specs
+
+
+def column_specs_from_toml(toml_path: Path) -> tuple[ColumnSpec, ...]:
+    with toml_path.open("rb") as file:
+        column_config = tomllib.load(file)["columns"]
+
+    column_specs: list[ColumnSpec] = []
+
+    for target, settings in column_config.items():
+        arrow_type_name = settings["arrow_type"]
+
+        if arrow_type_name not in ARROW_TYPES:
+            raise ValueError(
+                f"{toml_path.name}: column {target} has unsupported "
+                f"arrow_type {arrow_type_name!r}. "
+                f"Expected one of {sorted(ARROW_TYPES)}."
+            )
+
+        column_specs.append(
+            ColumnSpec(
+                target=target,
+                sources=tuple(settings.get("sources", [target])),
+                arrow_type=ARROW_TYPES[arrow_type_name],
+                postgres_type=settings["postgres_type"],
+                nullable=settings.get("nullable", True),
+                required=settings.get("required", True),
+            )
+        )
+
+    return tuple(column_specs)
+
+
+def column_specs_from_dictionary(
+    dictionary_path: Path,
+) -> tuple[ColumnSpec, ...]:
+    """Map every column of a make_data_dictionary.py CSV to a target column.
+
+    Target names are the snake_case source names (VendorID -> vendor_id),
+    integer widths follow the profiled min/max and DOUBLE becomes
+    numeric(18,4), as in sql/yellow_tripdata.sql. Source names that map
+    to the same target, such as Airport_fee and airport_fee, become that
+    column's sources. Every column is nullable: the profile covers only
+    the files it was made from, and a later month may have nulls.
+    """
+    rows_by_target: dict[str, list[dict[str, str]]] = {}
+
+    with dictionary_path.open("r", encoding="utf-8-sig", newline="") as file:
+        for row in csv.DictReader(file):
+            rows_by_target.setdefault(snake_case(row["column"]), []).append(row)
+
+    column_specs: list[ColumnSpec] = []
+
+    for target, rows in rows_by_target.items():
+        sources = tuple(dict.fromkeys(row["column"] for row in rows))
+        dictionary_types = {row["type"].strip().upper() for row in rows}
+
+        if dictionary_types <= DICTIONARY_INTEGER_TYPES:
+            arrow_type, postgres_type = max(
+                (integer_width(row.get("min"), row.get("max")) for row in rows),
+                key=lambda width: width[0].bit_width,
+            )
+        elif len(dictionary_types) == 1 and (
+            dictionary_types <= DICTIONARY_TYPES.keys()
+        ):
+            (dictionary_type,) = dictionary_types
+            arrow_type, postgres_type = DICTIONARY_TYPES[dictionary_type]
+        else:
+            raise ValueError(
+                f"{dictionary_path.name}: column {target} ({', '.join(sources)}) "
+                f"has unsupported or conflicting types "
+                f"{sorted(row['type'] for row in rows)!r}."
+            )
+
+        column_specs.append(
+            ColumnSpec(
+                target=target,
+                sources=sources,
+                arrow_type=arrow_type,
+                postgres_type=postgres_type,
+            )
+        )
+
+    return tuple(column_specs)
+
+
+def snake_case(name: str) -> str:
+    """VendorID -> vendor_id, PULocationID -> pu_location_id."""
+    name = re.sub(r"([A-Z]+)([A-Z][a-z])", r"\1_\2", name)
+    name = re.sub(r"([a-z0-9])([A-Z])", r"\1_\2", name)
+
+    return name.lower()
+
+
+def integer_width(
+    minimum: str | None,
+    maximum: str | None,
+) -> tuple[pa.DataType, str]:
+    try:
+        low, high = float(minimum), float(maximum)
+    except (TypeError, ValueError):
+        return pa.int64(), "bigint"
+
+    if -32_768 <= low and high <= 32_767:
+        return pa.int16(), "smallint"
+
+    if -2_147_483_648 <= low and high <= 2_147_483_647:
+        return pa.int32(), "integer"
+
+    return pa.int64(), "bigint"
+
+
+def target_columns(column_specs: tuple[ColumnSpec, ...]) -> list[str]:
+    return [column_spec.target for column_spec in column_specs]
+
+
+def resolve_source_column(
+    available_columns: list[str],
+    column_spec: ColumnSpec,
+) -> str | None:
+    """Return the file's column for column_spec: exact names first, then any case."""
+    for source in column_spec.sources:
+        if source in available_columns:
+            return source
+
+    lowered = {column.lower(): column for column in available_columns}
+
+    for source in column_spec.sources:
+        if source.lower() in lowered:
+            return lowered[source.lower()]
+
+    return None
+
+
+@dataclass(frozen=True)
+class CastPlan:
+    """How one file schema is projected and cast onto the target columns."""
+
+    read_columns: list[str]
+    sources: list[str | None]
+    column_specs: tuple[ColumnSpec, ...]
+
+
+def compile_cast_plan(
     parquet_file: pq.ParquetFile,
     file_path: Path,
-) -> None:
-    available_columns = set(
-        parquet_file.schema_arrow.names
-    )
+    column_specs: tuple[ColumnSpec, ...],
+    report: bool = True,
+) -> CastPlan:
+    available_columns = parquet_file.schema_arrow.names
+
+    sources = [
+        resolve_source_column(available_columns, column_spec)
+        for column_spec in column_specs
+    ]
 
-    missing_columns = set(SOURCE_COLUMNS) - available_columns
+    missing_columns = [
+        column_spec.target
+        for column_spec, source in zip(column_specs, sources)
+        if source is None and column_spec.required
+    ]
 
     if missing_columns:
         raise ValueError(
-            f"{file_path.name} is missing required columns: "
-            f"{sorted(missing_columns)}"
+            f"{file_path.name} has no source column for: "
+            f"{missing_columns}"
         )
 
-    unexpected_columns = available_columns - set(SOURCE_COLUMNS)
+    read_columns = [source for source in sources if source is not None]
+    unexpected_columns = set(available_columns) - set(read_columns)
 
-    if unexpected_columns:
+    if report and unexpected_columns:
         print(
             f"  Additional columns will be ignored: "
             f"{sorted(unexpected_columns)}"
         )
 
+    absent_columns = [
+        column_spec.target
+        for column_spec, source in zip(column_specs, sources)
+        if source is None
+    ]
 
-def dataframe_to_csv_buffer(
-    dataframe: pd.DataFrame,
-) -> io.StringIO:
-    buffer = io.StringIO()
+    if report and absent_columns:
+        print(f"  Columns loaded as NULL: {absent_columns}")
 
-    dataframe.to_csv(
-        buffer,
-        index=False,
-        header=False,
-        na_rep=r"\N",
-        lineterminator="\n",
+    return CastPlan(
+        read_columns=read_columns,
+        sources=sources,
+        column_specs=column_specs,
     )
 
-    buffer.seek(0)
 
-    return buffer
+def apply_cast_plan(
+    record_batch: pa.RecordBatch,
+    cast_plan: CastPlan,
+) -> pa.RecordBatch:
+    """Rename, cast and fill one batch into the target columns in one pass.
 
+    NaN becomes NULL first, so float sources cast cleanly to integer
+    targets and both COPY formats send NULL for it.
+    """
+    arrays: list[pa.Array] = []
 
-def load_parquet_file(
-    connection: psycopg.Connection,
-    file_path: Path,
-    target_table: str,
-    batch_size: int,
-) -> int:
-    parquet_file = pq.ParquetFile(file_path)
+    for column_spec, source in zip(cast_plan.column_specs, cast_plan.sources):
+        if source is None:
+            arrays.append(pa.nulls(record_batch.num_rows, column_spec.arrow_type))
+            continue
 
-    validate_source_schema(
-        parquet_file=parquet_file,
-        file_path=file_path,
+        arrays.append(
+            cast_column(
+                nan_to_null(record_batch.column(source)),
+                column_spec,
+            )
+        )
+
+    return pa.RecordBatch.from_arrays(
+        arrays,
+        names=target_columns(cast_plan.column_specs),
     )
 
-    schema_name, table_name = target_table.split(".", maxsplit=1)
 
-    copy_sql = sql.SQL(
-        """
-        COPY {}.{} ({})
-        FROM STDIN
-        WITH (
-            FORMAT CSV,
-            NULL '\\N'
-        )
-        """
-    ).format(
-        sql.Identifier(schema_name),
-        sql.Identifier(table_name),
-        sql.SQL(", ").join(
-            sql.Identifier(column)
-            for column in TARGET_COLUMNS
-        ),
+def nan_to_null(array: pa.Array) -> pa.Array:
+    if not pa.types.is_floating(array.type):
+        return array
+
+    return pc.if_else(
+        pc.is_nan(array),
+        pa.scalar(None, array.type),
+        array,
     )
 
-    rows_loaded = 0
-    file_started_at = perf_counter()
 
-    print(
-        f"\nLoading {file_path.name} "
-        f"({parquet_file.metadata.num_rows:,} rows)"
+def cast_column(array: pa.Array, column_spec: ColumnSpec) -> pa.Array:
+    return pc.cast(
+        array,
+        column_spec.arrow_type,
+        # Parquet may hold nanosecond timestamps; PostgreSQL keeps µs.
+        safe=not pa.types.is_timestamp(array.type),
     )
 
-    for batch_number, record_batch in enumerate(
-        parquet_file.iter_batches(
-            batch_size=batch_size,
-            columns=SOURCE_COLUMNS,
-        ),
-        start=1,
+
+def castable_rows(array: pa.Array, column_spec: ColumnSpec) -> np.ndarray:
+    """Mask of the values of array that cast losslessly to the target type.
+
+    Numbers are cast unsafely and back, which flags truncated fractions
+    and overflows in one vectorised pass; anything else is retried value
+    by value. Only batches whose cast has already failed get here.
+    """
+    is_number = pa.types.is_integer(array.type) or pa.types.is_floating(
+        array.type
+    )
+
+    if is_number and (
+        pa.types.is_integer(column_spec.arrow_type)
+        or pa.types.is_floating(column_spec.arrow_type)
     ):
-        dataframe = record_batch.to_pandas()
+        round_trip = pc.cast(
+            pc.cast(array, column_spec.arrow_type, safe=False),
+            array.type,
+            safe=False,
+        )
 
-        dataframe = dataframe.rename(
-            columns=COLUMN_MAP
+        return np.asarray(
+            pc.fill_null(pc.equal(round_trip, array), True),
+            dtype=bool,
         )
 
-        dataframe = dataframe[TARGET_COLUMNS]
+    castable = np.ones(len(array), dtype=bool)
 
-        for column in INTEGER_COLUMNS:
-            dataframe[column] = dataframe[column].astype("Int64")
+    for index in range(len(array)):
+        try:
+            cast_column(array.slice(index, 1), column_spec)
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+            castable[index] = False
 
-        csv_buffer = dataframe_to_csv_buffer(dataframe)
+    return castable
 
-        with connection.cursor() as cursor:
-            with cursor.copy(copy_sql) as copy:
-                while csv_chunk := csv_buffer.read(1_048_576):
-                    copy.write(csv_chunk)
 
-        batch_rows = len(dataframe)
-        rows_loaded += batch_rows
+def postgres_limit_failures(
+    array: pa.Array,
+    column_spec: ColumnSpec,
+) -> tuple[np.ndarray, str] | None:
+    """Rows the server would reject for numeric precision or varchar length."""
+    type_match = POSTGRES_LIMITED_TYPE_PATTERN.fullmatch(
+        column_spec.postgres_type.strip().lower()
+    )
 
-        print(
-            f"  Batch {batch_number:,}: "
-            f"{batch_rows:,} rows "
-            f"({rows_loaded:,} total)"
-        )
+    if type_match is None:
+        return None
 
-    elapsed_seconds = perf_counter() - file_started_at
+    type_name, first_modifier, second_modifier = type_match.groups()
 
-    print(
-        f"Completed {file_path.name}: "
-        f"{rows_loaded:,} rows in "
-        f"{elapsed_seconds:,.2f} seconds"
-    )
+    if type_name in ("numeric", "decimal"):
+        integer_digits = int(first_modifier) - int(second_modifier or 0)
+        exceeded = pc.greater_equal(
+            pc.abs(pc.cast(array, pa.float64())),
+            10.0**integer_digits,
+        )
+        reason = f"exceeds {column_spec.postgres_type}"
+    else:
+        exceeded = pc.greater(pc.utf8_length(array), int(first_modifier))
+        reason = f"longer than {column_spec.postgres_type}"
 
-    return rows_loaded
+    failed = np.asarray(pc.fill_null(exceeded, False), dtype=bool)
 
-class PostgresConfiguration(TypedDict):
-    host: str
-    port: int
-    dbname: str
-    user: str
-    password: str
-    sslmode: str
+    return (failed, reason) if failed.any() else None
 
-def main() -> None:
-    args = parse_arguments()
 
-    data_in = args.data_in.expanduser().resolve()
-    env_file = args.env_file.expanduser().resolve()
-    extension = normalize_extension(args.extension)
+def apply_cast_plan_quarantining(
+    record_batch: pa.RecordBatch,
+    cast_plan: CastPlan,
+    first_row: int,
+) -> tuple[pa.RecordBatch, pa.Table | None]:
+    """Cast one batch, setting aside the rows the target would reject.
 
-    files = discover_files(
-        data_in=data_in,
-        extension=extension,
-    )
+    Rows with a value that does not cast to its column, a NULL in a NOT
+    NULL column, or a number or string beyond the PostgreSQL type are
+    returned as a quarantine table (row_offset within the row group,
+    the failed columns and reasons, and the source values as text);
+    the remaining rows are cast as usual.
+    """
+    arrays: list[pa.Array] = []
+    failures: list[tuple[str, str, np.ndarray]] = []
 
-    postgres_configuration = load_postgres_configuration(
-        env_file=env_file,
-    )
+    for column_spec, source in zip(cast_plan.column_specs, cast_plan.sources):
+        if source is None:
+            arrays.append(pa.nulls(record_batch.num_rows, column_spec.arrow_type))
 
-    print(f"Input directory: {data_in}")
-    print(f"Files discovered: {len(files)}")
-    print(f"Target relation: {args.table}")
-    print(f"Batch size: {args.batch_size:,}")
+            if not column_spec.nullable:
+                failures.append(
+                    (
+                        column_spec.target,
+                        "NULL in a NOT NULL column",
+                        np.ones(record_batch.num_rows, dtype=bool),
+                    )
+                )
 
-    total_rows_loaded = 0
-    load_started_at = perf_counter()
+            continue
 
-    with psycopg.connect(
-        host=postgres_configuration["host"],
-        port=postgres_configuration["port"],
-        dbname=postgres_configuration["dbname"],
-        user=postgres_configuration["user"],
-        password=postgres_configuration["password"],
-        sslmode=postgres_configuration["sslmode"],
-    ) as connection:
-        if args.truncate:
-            print(
-                f"Truncating {args.table} before loading."
-            )
+        array = nan_to_null(record_batch.column(source))
 
-            schema_name, table_name = args.table.split(
-                ".",
-                maxsplit=1,
+        if not column_spec.nullable and array.null_count:
+            failures.append(
+                (
+                    column_spec.target,
+                    "NULL in a NOT NULL column",
+                    np.asarray(pc.is_null(array), dtype=bool),
+                )
             )
 
-            truncate_sql = sql.SQL(
-                "TRUNCATE TABLE {}.{}"
-            ).format(
-                sql.Identifier(schema_name),
-                sql.Identifier(table_name),
+        try:
+            cast_array = cast_column(array, column_spec)
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+            failures.append(
+                (
+                    column_spec.target,
+                    f"cannot cast {array.type} to {column_spec.arrow_type}",
+                    ~castable_rows(array, column_spec),
+                )
             )
+            arrays.append(pa.nulls(record_batch.num_rows, column_spec.arrow_type))
+            continue
 
-            with connection.cursor() as cursor:
-                cursor.execute(truncate_sql)
+        limit_failure = postgres_limit_failures(cast_array, column_spec)
 
-            connection.commit()
+        if limit_failure is not None:
+            failed, reason = limit_failure
+            failures.append((column_spec.target, reason, failed))
 
-        for file_path in files:
-            rows_loaded = load_parquet_file(
+        arrays.append(cast_array)
+
+    if not failures:
+        return (
+            pa.RecordBatch.from_arrays(
+                arrays,
+                names=target_columns(cast_plan.column_specs),
+            ),
+            None,
+        )
+
+    failed_rows = np.logical_or.reduce([failed for _, _, failed in failures])
+    failed_indices = np.flatnonzero(failed_rows)
+
+    failed_columns = [[] for _ in failed_indices]
+    reasons = [[] for _ in failed_indices]
+
+    for target, reason, failed in failures:
+        for position in np.flatnonzero(failed[failed_indices]):
+            failed_columns[position].append(target)
+            reasons[position].append(f"{target}: {reason}")
+
+    quarantined_batch = record_batch.take(pa.array(failed_indices))
+
+    quarantined = pa.table(
+        {
+            "row_offset": pa.array(first_row + failed_indices, pa.int64()),
+            "failed_columns": [", ".join(columns) for columns in failed_columns],
+            "reasons": ["; ".join(row_reasons) for row_reasons in reasons],
+            **{
+                column_spec.target: (
+                    pc.cast(quarantined_batch.column(source), pa.string())
+                    if source is not None
+                    else pa.nulls(len(failed_indices), pa.string())
+                )
+                for column_spec, source in zip(
+                    cast_plan.column_specs,
+                    cast_plan.sources,
+                )
+            },
+        }
+    )
+
+    kept_batch = record_batch.filter(pa.array(~failed_rows))
+
+    return apply_cast_plan(kept_batch, cast_plan), quarantined
+
+
+def record_batch_to_csv(record_batch: pa.RecordBatch) -> bytes:
+    """Write a batch as CSV rows; NULL is an unquoted empty field."""
+    buffer = io.BytesIO()
+
+    pa_csv.write_csv(
+        record_batch,
+        buffer,
+        pa_csv.WriteOptions(include_header=False),
+    )
+
+    return buffer.getvalue()
+
+
+class PostgresColumnType(TypedDict):
+    type_name: str
+    type_modifier: int
+
+
+@dataclass(frozen=True)
+class BinaryColumn:
+    lengths: np.ndarray  # int32 byte length per row; -1 marks NULL
+    values: np.ndarray  # (rows, width) uint8, right-padded past each length
+
+
+def fetch_column_types(
+    connection: psycopg.Connection,
+    schema_name: str,
+    table_name: str,
+) -> dict[str, PostgresColumnType]:
+    relation = sql.Identifier(schema_name, table_name).as_string(connection)
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT a.attname, t.typname, a.atttypmod
+            FROM pg_catalog.pg_attribute AS a
+            JOIN pg_catalog.pg_type AS t
+                ON t.oid = a.atttypid
+            WHERE a.attrelid = %s::regclass
+              AND a.attnum > 0
+              AND NOT a.attisdropped
+            ORDER BY a.attnum
+            """,
+            (relation,),
+        )
+
+        return {
+            column_name: {
+                "type_name": type_name,
+                "type_modifier": type_modifier,
+            }
+            for column_name, type_name, type_modifier in cursor.fetchall()
+        }
+
+
+def build_copy_sql(
+    schema_name: str,
+    table_name: str,
+    copy_format: str,
+    columns: list[str],
+) -> sql.Composed:
+    if copy_format == "binary":
+        options = sql.SQL("FORMAT BINARY")
+    else:
+        options = sql.SQL("FORMAT CSV")
+
+    return sql.SQL(
+        """
+        COPY {}.{} ({})
+        FROM STDIN
+        WITH ({})
+        """
+    ).format(
+        sql.Identifier(schema_name),
+        sql.Identifier(table_name),
+        target_column_list(columns),
+        options,
+    )
+
+
+def valid_mask(array: pa.Array) -> np.ndarray:
+    """Return True for values that are neither NULL nor NaN.
+
+    NaN is treated as NULL to match the CSV path, where pandas writes
+    NaN using the NULL marker.
+    """
+    mask = pc.is_valid(array)
+
+    if pa.types.is_floating(array.type):
+        mask = pc.and_(mask, pc.invert(pc.is_nan(array)))
+
+    return mask.to_numpy(zero_copy_only=False)
+
+
+def fixed_width_column(
+    values: np.ndarray,
+    valid: np.ndarray,
+    wire_dtype: str,
+) -> BinaryColumn:
+    width = np.dtype(wire_dtype).itemsize
+    wire_values = values.astype(wire_dtype, copy=False)
+
+    return BinaryColumn(
+        lengths=np.where(valid, width, -1).astype(np.int32),
+        values=wire_values.view(np.uint8).reshape(-1, width),
+    )
+
+
+def numeric_scale(type_modifier: int) -> int | None:
+    """Scale of a numeric(p, s) column; None for an unconstrained numeric."""
+    if type_modifier < 0:
+        return None
+
+    return (type_modifier - 4) & 0xFFFF
+
+
+def data_numeric_scales(values: np.ndarray) -> np.ndarray:
+    """Per value, the fewest decimals that represent it exactly.
+
+    The CSV path writes each float's shortest decimal, so an
+    unconstrained numeric column receives them unrounded. A value with
+    more decimals than that keeps as many as still fit the digit groups.
+    """
+    magnitudes = np.abs(values)
+    scales = np.zeros(len(values), dtype=np.int16)
+    settled = np.zeros(len(values), dtype=bool)
+
+    for candidate in range(NUMERIC_MAX_DATA_SCALE + 1):
+        alignment = -candidate % 4
+        fits = magnitudes * 10.0**candidate < 10.0 ** (18 - alignment)
+
+        scales[~settled & fits] = candidate
+        settled |= ~fits | (np.round(values, candidate) == values)
+
+        if settled.all():
+            break
+
+    return scales
+
+
+def encode_numeric_column(
+    array: pa.Array,
+    scale: int | None,
+) -> BinaryColumn:
+    """Encode numbers as PostgreSQL binary numeric values.
+
+    Each value is rounded half away from zero to the column scale, or
+    for an unconstrained column (scale None) to its own scale, and
+    written as a fixed set of base-10000 digit groups. PostgreSQL strips
+    the leading and trailing zero groups on receipt.
+    """
+    valid = valid_mask(array)
+    values = pc.fill_null(
+        pc.cast(array, pa.float64()),
+        0.0,
+    ).to_numpy(zero_copy_only=False)
+    values = np.where(valid, values, 0.0)
+
+    if scale is None:
+        scale = data_numeric_scales(values)
+
+    fractional_groups = -(-scale // 4)
+    integer_groups = NUMERIC_DIGIT_GROUPS - fractional_groups
+
+    if np.min(integer_groups) < 1:
+        raise ValueError(
+            f"numeric scale {scale} is not supported by the binary encoder."
+        )
+
+    magnitude = np.floor(np.abs(values) * 10.0**scale + 0.5)
+
+    # Keep the digit-group aligned value below 10**18 so it fits an int64.
+    alignment = 4 * fractional_groups - scale
+
+    if np.any(magnitude >= 10.0 ** (18 - alignment)):
+        raise ValueError(
+            f"Value exceeds the range of numeric scale {np.max(scale)}."
+        )
+
+    scaled = magnitude.astype(np.int64) * 10**alignment
+
+    # ndigits, weight, sign and dscale, followed by the digit groups.
+    wire_values = np.empty(
+        (len(values), 4 + NUMERIC_DIGIT_GROUPS),
+        dtype=">i2",
+    )
+    wire_values[:, 0] = NUMERIC_DIGIT_GROUPS
+    wire_values[:, 1] = integer_groups - 1
+    wire_values[:, 2] = np.where(
+        (values < 0) & (magnitude > 0),
+        NUMERIC_NEGATIVE,
+        NUMERIC_POSITIVE,
+    )
+    wire_values[:, 3] = scale
+
+    for position in reversed(range(NUMERIC_DIGIT_GROUPS)):
+        scaled, wire_values[:, 4 + position] = np.divmod(scaled, 10_000)
+
+    width = wire_values.shape[1] * 2
+
+    return BinaryColumn(
+        lengths=np.where(valid, width, -1).astype(np.int32),
+        values=wire_values.view(np.uint8).reshape(-1, width),
+    )
+
+
+def encode_text_column(array: pa.Array) -> BinaryColumn:
+    """Encode strings as UTF-8 bytes padded to the longest value in the batch."""
+    array = pc.cast(array, pa.large_string())
+    valid = valid_mask(array)
+
+    _, offsets_buffer, data_buffer = array.buffers()
+
+    offsets = np.frombuffer(
+        offsets_buffer,
+        dtype=np.int64,
+    )[array.offset:array.offset + len(array) + 1]
+
+    lengths = np.where(valid, np.diff(offsets), 0)
+    width = int(lengths.max()) if len(lengths) else 0
+
+    if width == 0 or data_buffer is None:
+        values = np.zeros((len(array), 0), dtype=np.uint8)
+    else:
+        data = np.frombuffer(data_buffer, dtype=np.uint8)
+        positions = offsets[:-1, None] + np.arange(width)
+
+        values = data[np.minimum(positions, len(data) - 1)]
+
+    return BinaryColumn(
+        lengths=np.where(valid, lengths, -1).astype(np.int32),
+        values=values,
+    )
+
+
+def encode_binary_column(
+    array: pa.Array,
+    column_type: PostgresColumnType,
+) -> BinaryColumn:
+    """Encode one Arrow column as PostgreSQL binary COPY field values."""
+    type_name = column_type["type_name"]
+
+    if type_name in FIXED_WIDTH_TYPES:
+        arrow_type, wire_dtype = FIXED_WIDTH_TYPES[type_name]
+        valid = valid_mask(array)
+
+        values = pc.fill_null(
+            pc.cast(
+                pc.if_else(
+                    pa.array(valid),
+                    array,
+                    pa.scalar(None, array.type),
+                ),
+                arrow_type,
+            ),
+            0,
+        ).to_numpy(zero_copy_only=False)
+
+        return fixed_width_column(values, valid, wire_dtype)
+
+    if type_name == "numeric":
+        return encode_numeric_column(
+            array,
+            numeric_scale(column_type["type_modifier"]),
+        )
+
+    if type_name in ("timestamp", "timestamptz"):
+        valid = valid_mask(array)
+
+        microseconds = pc.cast(
+            pc.cast(
+                array,
+                pa.timestamp("us", tz=getattr(array.type, "tz", None)),
+                safe=False,
+            ),
+            pa.int64(),
+        )
+
+        values = pc.fill_null(microseconds, 0).to_numpy(zero_copy_only=False)
+
+        return fixed_width_column(
+            values - POSTGRES_EPOCH_MICROSECONDS,
+            valid,
+            ">i8",
+        )
+
+    if type_name == "date":
+        valid = valid_mask(array)
+
+        days = pc.cast(pc.cast(array, pa.date32()), pa.int32())
+        values = pc.fill_null(days, 0).to_numpy(zero_copy_only=False)
+
+        return fixed_width_column(
+            values - POSTGRES_EPOCH_DAYS,
+            valid,
+            ">i4",
+        )
+
+    if type_name == "bool":
+        valid = valid_mask(array)
+
+        values = pc.fill_null(
+            pc.cast(array, pa.bool_()),
+            False,
+        ).to_numpy(zero_copy_only=False)
+
+        return fixed_width_column(values, valid, "u1")
+
+    if type_name in TEXT_TYPES:
+        return encode_text_column(array)
+
+    raise ValueError(
+        f"PostgreSQL type {type_name!r} is not supported by the binary "
+        "encoder. Use --format csv for this table."
+    )
+
+
+def record_batch_to_copy_binary(
+    record_batch: pa.RecordBatch,
+    column_types: dict[str, PostgresColumnType],
+) -> bytes:
+    """Encode a record batch, named by target column, as one binary COPY stream."""
+    row_count = record_batch.num_rows
+
+    encoded_columns = [
+        encode_binary_column(
+            record_batch.column(target_column),
+            column_types[target_column],
+        )
+        for target_column in record_batch.schema.names
+    ]
+
+    # Lay every field out at full width, then drop the padding and the
+    # value bytes of NULL fields with one boolean mask. Row-major order of
+    # the kept bytes is exactly the binary COPY row stream.
+    row_width = 2 + sum(4 + column.values.shape[1] for column in encoded_columns)
+
+    fields = np.empty((row_count, row_width), dtype=np.uint8)
+    keep = np.ones((row_count, row_width), dtype=bool)
+
+    fields[:, 0:2] = np.frombuffer(
+        struct.pack("!h", len(encoded_columns)),
+        dtype=np.uint8,
+    )
+    position = 2
+
+    for column in encoded_columns:
+        width = column.values.shape[1]
+
+        fields[:, position:position + 4] = (
+            column.lengths.astype(">i4").view(np.uint8).reshape(-1, 4)
+        )
+        position += 4
+
+        fields[:, position:position + width] = column.values
+
+        if column.lengths.min(initial=width) < width:
+            keep[:, position:position + width] = (
+                np.arange(width) < column.lengths[:, None]
+            )
+
+        position += width
+
+    body = fields[keep]
+
+    stream = b"".join(
+        [
+            PGCOPY_HEADER,
+            body.tobytes(),
+            PGCOPY_TRAILER,
+        ]
+    )
+
+    return stream
+
+
+def column_hash(array: pa.Array) -> np.ndarray:
+    """Hash each value of a column to uint64, independent of batch layout.
+
+    Values are normalised to one NumPy dtype per Arrow type family first,
+    so a batch with NULLs hashes its non-NULL values exactly like a batch
+    without them.
+    """
+    valid = array.is_valid().to_numpy(zero_copy_only=False)
+
+    if pa.types.is_timestamp(array.type):
+        array = array.cast(pa.timestamp("us")).cast(pa.int64())
+    elif pa.types.is_integer(array.type) or pa.types.is_boolean(array.type):
+        array = array.cast(pa.int64())
+    elif pa.types.is_floating(array.type) or pa.types.is_decimal(array.type):
+        array = array.cast(pa.float64())
+    else:
+        array = array.cast(pa.string())
+
+    if pa.types.is_string(array.type):
+        values = array.fill_null("").to_numpy(zero_copy_only=False)
+    else:
+        values = array.fill_null(0).to_numpy(zero_copy_only=False)
+
+    hashes = pd.util.hash_array(values, categorize=False)
+    hashes[~valid] = NULL_HASH
+
+    return hashes
+
+
+def combine_hashes(column_hashes: list[np.ndarray]) -> np.ndarray:
+    """Fold per-column hashes into one int64 per row (order sensitive)."""
+    combined = np.full(len(column_hashes[0]), HASH_SEED, dtype=np.uint64)
+
+    for hashes in column_hashes:
+        combined ^= hashes
+        combined *= HASH_MULTIPLIER
+
+    return combined.view(np.int64)
+
+
+def with_content_hashes(record_batch: pa.RecordBatch) -> pa.RecordBatch:
+    """Append the trip_key and row_hash columns used by --mode upsert.
+
+    row_hash covers every loaded column and is what the merge matches
+    on. trip_key hashes TRIP_KEY_COLUMNS, which stay the same when a
+    corrected file revises a trip but are not unique to one trip.
+    """
+    column_hashes = {
+        target_column: column_hash(record_batch.column(target_column))
+        for target_column in record_batch.schema.names
+    }
+
+    trip_key = combine_hashes(
+        [column_hashes[column] for column in TRIP_KEY_COLUMNS]
+    )
+    row_hash = combine_hashes(list(column_hashes.values()))
+
+    return record_batch.append_column(
+        "trip_key",
+        pa.array(trip_key),
+    ).append_column(
+        "row_hash",
+        pa.array(row_hash),
+    )
+
+
+def load_columns(load_options: LoadOptions) -> list[str]:
+    """Target columns of one COPY, hash columns included."""
+    columns = target_columns(load_options.column_specs)
+
+    if load_options.content_hashes:
+        columns += HASH_COLUMNS
+
+    return columns
+
+
+@dataclass
+class DayTotals:
+    rows: int = 0
+    total_amount: float = 0.0
+    trip_distance: float = 0.0
+
+
+DailyTotals = dict[date, DayTotals]
+
+
+def batch_daily_totals(record_batch: pa.RecordBatch) -> DailyTotals:
+    """Per pickup day row count and sums of one projected batch.
+
+    Amounts are rounded to the numeric scale first, as PostgreSQL rounds
+    them on the way in, so the sums match those of the loaded rows.
+    """
+    table = pa.table(
+        {
+            "pickup_day": pc.cast(
+                record_batch.column(PARTITION_COLUMN),
+                pa.date32(),
+            ),
+            **{
+                column: pc.round(
+                    pc.cast(record_batch.column(column), pa.float64()),
+                    ndigits=NUMERIC_DEFAULT_SCALE,
+                    round_mode="half_towards_infinity",
+                )
+                for column in RECONCILE_SUM_COLUMNS
+            },
+        }
+    )
+
+    grouped = table.group_by("pickup_day").aggregate(
+        [
+            ([], "count_all"),
+            *((column, "sum") for column in RECONCILE_SUM_COLUMNS),
+        ]
+    ).to_pylist()
+
+    return {
+        group["pickup_day"]: DayTotals(
+            rows=group["count_all"],
+            total_amount=group["total_amount_sum"] or 0.0,
+            trip_distance=group["trip_distance_sum"] or 0.0,
+        )
+        for group in grouped
+        if group["pickup_day"] is not None
+    }
+
+
+def merge_daily_totals(daily_totals: DailyTotals, addition: DailyTotals) -> None:
+    for pickup_day, day_totals in addition.items():
+        merged = daily_totals.setdefault(pickup_day, DayTotals())
+        merged.rows += day_totals.rows
+        merged.total_amount += day_totals.total_amount
+        merged.trip_distance += day_totals.trip_distance
+
+
+def daily_totals_gained(
+    daily_totals: DailyTotals,
+    baseline_totals: DailyTotals,
+) -> DailyTotals:
+    """Per-day totals minus what the same days held in baseline_totals."""
+    gained: DailyTotals = {}
+
+    for pickup_day, day_totals in daily_totals.items():
+        baseline = baseline_totals.get(pickup_day, DayTotals())
+        gained[pickup_day] = DayTotals(
+            rows=day_totals.rows - baseline.rows,
+            total_amount=day_totals.total_amount - baseline.total_amount,
+            trip_distance=day_totals.trip_distance - baseline.trip_distance,
+        )
+
+    return gained
+
+
+@dataclass(frozen=True)
+class EncodedBatch:
+    payload: bytes
+    daily_totals: DailyTotals | None
+    quarantined: pa.Table | None
+
+
+def encode_record_batch(
+    record_batch: pa.RecordBatch,
+    copy_target: CopyTarget,
+    batch_timing: BatchTiming,
+    first_row: int,
+) -> EncodedBatch:
+    """Encode one record batch as the body of a COPY FROM STDIN.
+
+    Projecting the batch onto the target (renames, casts, quarantine
+    checks, hash columns, --reconcile aggregates) is timed as transform;
+    serialising it to the COPY format as encode. first_row is the offset
+    of the batch within its row group, used to locate quarantined rows.
+    """
+    transform_started_at = perf_counter()
+
+    quarantined = None
+
+    if copy_target.quarantine:
+        record_batch, quarantined = apply_cast_plan_quarantining(
+            record_batch,
+            copy_target.cast_plan,
+            first_row,
+        )
+        batch_timing.rows = record_batch.num_rows
+    else:
+        record_batch = apply_cast_plan(record_batch, copy_target.cast_plan)
+
+    if copy_target.reload_months:
+        record_batch = record_batch.filter(
+            pickup_in_months(
+                record_batch.column(PARTITION_COLUMN),
+                copy_target.reload_months,
+            )
+        )
+        batch_timing.rows = record_batch.num_rows
+
+    batch_totals = (
+        batch_daily_totals(record_batch)
+        if copy_target.reconcile
+        else None
+    )
+
+    if copy_target.pickup_order:
+        record_batch = record_batch.sort_by(PARTITION_COLUMN)
+
+    if copy_target.content_hashes:
+        record_batch = with_content_hashes(record_batch)
+
+    encode_started_at = perf_counter()
+    batch_timing.transform_seconds = encode_started_at - transform_started_at
+
+    if copy_target.copy_format == "binary":
+        payload = record_batch_to_copy_binary(
+            record_batch=record_batch,
+            column_types=copy_target.column_types,
+        )
+    else:
+        payload = record_batch_to_csv(record_batch)
+
+    batch_timing.encode_seconds = perf_counter() - encode_started_at
+
+    return EncodedBatch(
+        payload=payload,
+        daily_totals=batch_totals,
+        quarantined=quarantined,
+    )
+
+
+def copy_payload(
+    connection: psycopg.Connection,
+    copy_target: CopyTarget,
+    payload: bytes,
+    batch_timing: BatchTiming,
+) -> None:
+    """Send one payload, timing the writes and the wait for the server.
+
+    copy.write blocks once the socket buffer is full, so copy_seconds is
+    the wire time; server_seconds is how long the server took to finish
+    the COPY after the last byte arrived.
+    """
+    with connection.cursor() as cursor:
+        copy_started_at = perf_counter()
+
+        with cursor.copy(copy_target.copy_sql) as copy:
+            for offset in range(0, len(payload), COPY_CHUNK_BYTES):
+                copy.write(payload[offset:offset + COPY_CHUNK_BYTES])
+
+            finish_started_at = perf_counter()
+
+        batch_timing.copy_seconds = finish_started_at - copy_started_at
+        batch_timing.server_seconds = perf_counter() - finish_started_at
+
+    batch_timing.bytes_sent = len(payload)
+
+
+@dataclass
+class BatchTiming:
+    """Where one batch spent its time, for the telemetry stream."""
+
+    rows: int
+    decode_seconds: float
+    transform_seconds: float = 0.0
+    encode_seconds: float = 0.0
+    copy_seconds: float = 0.0
+    server_seconds: float = 0.0
+    bytes_sent: int = 0
+
+    @property
+    def elapsed_seconds(self) -> float:
+        return (
+            self.decode_seconds
+            + self.transform_seconds
+            + self.encode_seconds
+            + self.copy_seconds
+            + self.server_seconds
+        )
+
+
+@dataclass
+class FileProgress:
+    """File-level batch and row counters, across its row groups, behind
+    the batch lines and telemetry records of one file."""
+
+    file_name: str
+    batches: int = 0
+    rows: int = 0
+
+
+def utc_now() -> str:
+    """Return the current UTC time in ISO 8601 format."""
+    return datetime.now(timezone.utc).isoformat()
+
+
+def append_jsonl(path: Path, record: dict[str, Any]) -> None:
+    """Append one JSON object to a JSON Lines file.
+
+    The line goes out in a single write so --workers processes can share
+    the file without interleaving records.
+    """
+    line = json.dumps(record, ensure_ascii=False, default=str) + "\n"
+
+    with path.open("a", encoding="utf-8") as file:
+        file.write(line)
+
+
+def process_memory_mb() -> float:
+    return psutil.Process(os.getpid()).memory_info().rss / (1024 * 1024)
+
+
+def record_load_event(
+    telemetry_path: Path | None,
+    event_type: str,
+    **fields: Any,
+) -> None:
+    """Append a run- or file-level event when telemetry is enabled."""
+    if telemetry_path is None:
+        return
+
+    append_jsonl(
+        telemetry_path,
+        {
+            "event_type": event_type,
+            **fields,
+            "recorded_at": utc_now(),
+        },
+    )
+
+
+@dataclass(frozen=True)
+class ShardBatch:
+    """A batch sent by a --workers process, with that process's RSS.
+
+    The parent numbers these per file and writes their telemetry, as
+    each worker only sees its own row group.
+    """
+
+    batch_timing: BatchTiming
+    memory_mb: float
+    recorded_at: str
+
+
+def collect_shard_batch(
+    shard_batches: list[ShardBatch],
+    batch_timing: BatchTiming,
+) -> None:
+    shard_batches.append(
+        ShardBatch(
+            batch_timing=batch_timing,
+            memory_mb=process_memory_mb(),
+            recorded_at=utc_now(),
+        )
+    )
+
+
+def record_batch_telemetry(
+    telemetry_path: Path,
+    progress: FileProgress,
+    target_table: str,
+    row_group: int,
+    batch_timing: BatchTiming,
+    memory_mb: float | None = None,
+    recorded_at: str | None = None,
+) -> None:
+    """Append a batch_completed record shaped like validation_progress.jsonl.
+
+    progress already counts the batch. memory_mb and recorded_at default
+    to this process's RSS and the current time.
+    """
+    if memory_mb is None:
+        memory_mb = process_memory_mb()
+
+    append_jsonl(
+        telemetry_path,
+        {
+            "event_type": "batch_completed",
+            "file": progress.file_name,
+            "batch_number": progress.batches,
+            "batch_rows": batch_timing.rows,
+            "rows_processed": progress.rows,
+            "memory_mb": round(memory_mb, 1),
+            "recorded_at": recorded_at or utc_now(),
+            "target_table": target_table,
+            "row_group": row_group,
+            "decode_seconds": round(batch_timing.decode_seconds, 6),
+            "transform_seconds": round(batch_timing.transform_seconds, 6),
+            "encode_seconds": round(batch_timing.encode_seconds, 6),
+            "copy_seconds": round(batch_timing.copy_seconds, 6),
+            "server_seconds": round(batch_timing.server_seconds, 6),
+            "bytes_sent": batch_timing.bytes_sent,
+            "rows_per_second": round(
+                rows_per_second(
+                    batch_timing.rows,
+                    batch_timing.elapsed_seconds,
+                )
+            ),
+        },
+    )
+
+
+@dataclass
+class StageTime:
+    busy_seconds: float = 0.0
+    idle_seconds: float = 0.0
+
+
+def new_stage_times() -> dict[str, StageTime]:
+    return {stage: StageTime() for stage in PIPELINE_STAGES}
+
+
+def merge_stage_times(
+    total: dict[str, StageTime],
+    addition: dict[str, StageTime],
+) -> None:
+    for stage, stage_time in addition.items():
+        total[stage].busy_seconds += stage_time.busy_seconds
+        total[stage].idle_seconds += stage_time.idle_seconds
+
+
+def print_stage_times(stage_times: dict[str, StageTime]) -> None:
+    bottleneck = max(
+        stage_times,
+        key=lambda stage: stage_times[stage].busy_seconds,
+    )
+
+    for stage, stage_time in stage_times.items():
+        marker = "  <- bottleneck" if stage == bottleneck else ""
+
+        print(
+            f"  Stage {stage:<6} busy {stage_time.busy_seconds:,.2f} s, "
+            f"idle {stage_time.idle_seconds:,.2f} s{marker}"
+        )
+
+
+def put_until_stopped(
+    stage_queue: queue.Queue,
+    item: object,
+    stop_event: threading.Event,
+    stage_time: StageTime,
+) -> bool:
+    """Block on a full queue, giving up if another stage has failed."""
+    waiting_since = perf_counter()
+
+    try:
+        while not stop_event.is_set():
+            try:
+                stage_queue.put(item, timeout=PIPELINE_POLL_SECONDS)
+                return True
+            except queue.Full:
+                continue
+
+        return False
+    finally:
+        stage_time.idle_seconds += perf_counter() - waiting_since
+
+
+def get_until_stopped(
+    stage_queue: queue.Queue,
+    stop_event: threading.Event,
+    stage_time: StageTime,
+) -> object:
+    waiting_since = perf_counter()
+
+    try:
+        while not stop_event.is_set():
+            try:
+                return stage_queue.get(timeout=PIPELINE_POLL_SECONDS)
+            except queue.Empty:
+                continue
+
+        return PIPELINE_DONE
+    finally:
+        stage_time.idle_seconds += perf_counter() - waiting_since
+
+
+def copy_parquet_batches(
+    connection: psycopg.Connection,
+    parquet_file: pq.ParquetFile,
+    copy_target: CopyTarget,
+    load_options: LoadOptions,
+    row_group: int,
+    progress: FileProgress,
+    report_batches: bool = True,
+    stage_times: dict[str, StageTime] | None = None,
+    on_batch: Callable[[BatchTiming], None] | None = None,
+    batch_sizer: BatchSizer | None = None,
+    daily_totals: DailyTotals | None = None,
+    quarantined: list[pa.Table] | None = None,
+) -> int:
+    """COPY one row group and return the number of rows sent.
+
+    progress carries the file's batch and row counts across row groups.
+    With --reconcile, the aggregates of every batch sent are merged into
+    daily_totals; with --quarantine, the rows set aside are appended to
+    quarantined.
+    """
+    if stage_times is None:
+        stage_times = new_stage_times()
+
+    if batch_sizer is not None:
+        record_batches = adaptive_record_batches(
+            parquet_file,
+            batch_sizer,
+            row_groups=[row_group],
+            columns=copy_target.cast_plan.read_columns,
+        )
+    else:
+        record_batches = parquet_file.iter_batches(
+            batch_size=load_options.batch_size,
+            row_groups=[row_group],
+            columns=copy_target.cast_plan.read_columns,
+        )
+
+    if load_options.pipeline_depth > 0:
+        encoded_batches = pipeline_encoded_batches(
+            record_batches=record_batches,
+            copy_target=copy_target,
+            load_options=load_options,
+            stage_times=stage_times,
+        )
+    else:
+        encoded_batches = sequential_encoded_batches(
+            record_batches=record_batches,
+            copy_target=copy_target,
+            stage_times=stage_times,
+        )
+
+    rows_loaded = 0
+
+    for batch_timing, encoded_batch in encoded_batches:
+        batch_rows = batch_timing.rows
+
+        copy_payload(
+            connection=connection,
+            copy_target=copy_target,
+            payload=encoded_batch.payload,
+            batch_timing=batch_timing,
+        )
+
+        stage_times["copy"].busy_seconds += (
+            batch_timing.copy_seconds + batch_timing.server_seconds
+        )
+
+        rows_loaded += batch_rows
+        progress.batches += 1
+        progress.rows += batch_rows
+
+        if daily_totals is not None and encoded_batch.daily_totals is not None:
+            merge_daily_totals(daily_totals, encoded_batch.daily_totals)
+
+        if quarantined is not None and encoded_batch.quarantined is not None:
+            quarantined.append(encoded_batch.quarantined)
+
+        if on_batch is not None:
+            on_batch(batch_timing)
+
+        if batch_sizer is not None:
+            adjust_batch_size(
+                batch_sizer=batch_sizer,
+                batch_rows=batch_rows,
+                elapsed_seconds=batch_timing.elapsed_seconds,
+                memory_mb=process_memory_mb(),
+            )
+
+        if report_batches:
+            print(
+                f"  Batch {progress.batches:,}: "
+                f"{batch_rows:,} rows "
+                f"({progress.rows:,} total)"
+            )
+
+    return rows_loaded
+
+
+def sequential_encoded_batches(
+    record_batches: Iterator[pa.RecordBatch],
+    copy_target: CopyTarget,
+    stage_times: dict[str, StageTime],
+) -> Iterator[tuple[BatchTiming, EncodedBatch]]:
+    rows_read = 0
+
+    while True:
+        read_started_at = perf_counter()
+        record_batch = next(record_batches, None)
+        decode_seconds = perf_counter() - read_started_at
+        stage_times["read"].busy_seconds += decode_seconds
+
+        if record_batch is None:
+            return
+
+        first_row = rows_read
+        rows_read += record_batch.num_rows
+
+        batch_timing = BatchTiming(
+            rows=record_batch.num_rows,
+            decode_seconds=decode_seconds,
+        )
+
+        encode_started_at = perf_counter()
+        encoded_batch = encode_record_batch(
+            record_batch,
+            copy_target,
+            batch_timing,
+            first_row,
+        )
+        stage_times["encode"].busy_seconds += perf_counter() - encode_started_at
+
+        yield batch_timing, encoded_batch
+
+
+def pipeline_encoded_batches(
+    record_batches: Iterator[pa.RecordBatch],
+    copy_target: CopyTarget,
+    load_options: LoadOptions,
+    stage_times: dict[str, StageTime],
+) -> Iterator[tuple[BatchTiming, EncodedBatch]]:
+    """Decode and encode on background threads while the caller runs COPY.
+
+    The reader thread runs iter_batches, encoder threads turn record
+    batches into COPY payloads, and bounded queues between the stages cap
+    the number of batches held in memory at once.
+    """
+    decoded_queue: queue.Queue = queue.Queue(maxsize=load_options.pipeline_depth)
+    encoded_queue: queue.Queue = queue.Queue(maxsize=load_options.pipeline_depth)
+    stop_event = threading.Event()
+    errors: list[BaseException] = []
+
+    encoder_times = [
+        StageTime()
+        for _ in range(load_options.encoder_threads)
+    ]
+
+    def read_stage() -> None:
+        rows_read = 0
+
+        try:
+            while not stop_event.is_set():
+                read_started_at = perf_counter()
+                record_batch = next(record_batches, None)
+                decode_seconds = perf_counter() - read_started_at
+                stage_times["read"].busy_seconds += decode_seconds
+
+                if record_batch is None:
+                    break
+
+                first_row = rows_read
+                rows_read += record_batch.num_rows
+
+                if not put_until_stopped(
+                    decoded_queue,
+                    (record_batch, decode_seconds, first_row),
+                    stop_event,
+                    stage_times["read"],
+                ):
+                    return
+        except BaseException as error:
+            errors.append(error)
+            stop_event.set()
+            return
+
+        for _ in encoder_times:
+            put_until_stopped(
+                decoded_queue,
+                PIPELINE_DONE,
+                stop_event,
+                stage_times["read"],
+            )
+
+    def encode_stage(stage_time: StageTime) -> None:
+        try:
+            while True:
+                item = get_until_stopped(
+                    decoded_queue,
+                    stop_event,
+                    stage_time,
+                )
+
+                if item is PIPELINE_DONE:
+                    break
+
+                record_batch, decode_seconds, first_row = item
+
+                batch_timing = BatchTiming(
+                    rows=record_batch.num_rows,
+                    decode_seconds=decode_seconds,
+                )
+
+                encode_started_at = perf_counter()
+                encoded_batch = encode_record_batch(
+                    record_batch,
+                    copy_target,
+                    batch_timing,
+                    first_row,
+                )
+                stage_time.busy_seconds += perf_counter() - encode_started_at
+
+                if not put_until_stopped(
+                    encoded_queue,
+                    (batch_timing, encoded_batch),
+                    stop_event,
+                    stage_time,
+                ):
+                    return
+        except BaseException as error:
+            errors.append(error)
+            stop_event.set()
+            return
+
+        put_until_stopped(
+            encoded_queue,
+            PIPELINE_DONE,
+            stop_event,
+            stage_time,
+        )
+
+    threads = [
+        threading.Thread(
+            target=read_stage,
+            name="loader-read",
+            daemon=True,
+        ),
+        *(
+            threading.Thread(
+                target=encode_stage,
+                args=(stage_time,),
+                name=f"loader-encode-{index}",
+                daemon=True,
+            )
+            for index, stage_time in enumerate(encoder_times, start=1)
+        ),
+    ]
+
+    for thread in threads:
+        thread.start()
+
+    encoders_remaining = len(encoder_times)
+
+    try:
+        while encoders_remaining:
+            item = get_until_stopped(
+                encoded_queue,
+                stop_event,
+                stage_times["copy"],
+            )
+
+            if item is PIPELINE_DONE:
+                if stop_event.is_set():
+                    break
+
+                encoders_remaining -= 1
+                continue
+
+            yield item
+    finally:
+        stop_event.set()
+
+        for thread in threads:
+            thread.join()
+
+        for stage_time in encoder_times:
+            stage_times["encode"].busy_seconds += stage_time.busy_seconds
+            stage_times["encode"].idle_seconds += stage_time.idle_seconds
+
+    if errors:
+        raise errors[0]
+
+
+@dataclass(frozen=True)
+class CopyTarget:
+    copy_sql: sql.Composed
+    copy_format: str
+    column_types: dict[str, PostgresColumnType]
+    content_hashes: bool
+    pickup_order: bool
+    cast_plan: CastPlan
+    reconcile: bool
+    quarantine: bool
+    # Set for a row group the target already holds: only its rows picked
+    # up in these months are sent again.
+    reload_months: tuple[date, ...] = ()
+
+
+@dataclass(frozen=True)
+class LoadOptions:
+    batch_size: int
+    auto_batch_size: AutoBatchSize | None
+    copy_format: str
+    pipeline_depth: int
+    encoder_threads: int
+    ledger_table: str
+    content_hashes: bool
+    # --mode swap sorts each batch by pickup, so the staging table that
+    # becomes the target is close to pickup order without a rewrite.
+    pickup_order: bool
+    telemetry_path: Path | None
+    column_specs: tuple[ColumnSpec, ...]
+    reconcile: bool
+    quarantine_path: Path | None
+    # Months being replaced in a partitioned target (--replace-month, or
+    # every month a partitioned swap loads); see CopyTarget.reload_months.
+    reload_months: tuple[date, ...] = ()
+
+
+def new_batch_sizer(load_options: LoadOptions) -> BatchSizer | None:
+    """Start a file (or --workers shard) at the initial auto batch size."""
+    if load_options.auto_batch_size is None:
+        return None
+
+    return BatchSizer(settings=load_options.auto_batch_size)
+
+
+@dataclass
+class QuarantineSink:
+    """Side Parquet files collecting the rows --quarantine set aside.
+
+    Each source file gets its own file per run, named after the run's
+    start time, so a run never overwrites rows an earlier run committed.
+    """
+
+    directory: Path
+    run_stamp: str
+    schema: pa.Schema
+    writers: dict[str, pq.ParquetWriter] = field(default_factory=dict)
+    rows_by_file: dict[str, int] = field(default_factory=dict)
+
+
+def open_quarantine_sink(
+    quarantine_path: Path,
+    column_specs: tuple[ColumnSpec, ...],
+) -> QuarantineSink:
+    quarantine_path.mkdir(parents=True, exist_ok=True)
+
+    schema = pa.schema(
+        [
+            *QUARANTINE_LOCATOR_FIELDS,
+            *(
+                pa.field(column, pa.string())
+                for column in target_columns(column_specs)
+            ),
+        ]
+    )
+
+    quarantine_sink = QuarantineSink(
+        directory=quarantine_path,
+        run_stamp=datetime.now().strftime("%Y%m%dT%H%M%S"),
+        schema=schema,
+    )
+
+    # Keep the rows of committed row groups readable if the run fails.
+    atexit.register(close_quarantine_sink, quarantine_sink)
+
+    return quarantine_sink
+
+
+def quarantine_file_path(quarantine_sink: QuarantineSink, file_name: str) -> Path:
+    return quarantine_sink.directory / (
+        f"{Path(file_name).stem}.{quarantine_sink.run_stamp}.parquet"
+    )
+
+
+def close_quarantine_sink(quarantine_sink: QuarantineSink) -> None:
+    for writer in quarantine_sink.writers.values():
+        writer.close()
+
+    quarantine_sink.writers.clear()
+
+
+def write_quarantined_rows(
+    quarantine_sink: QuarantineSink,
+    file_name: str,
+    row_group: int,
+    quarantined: list[pa.Table],
+) -> None:
+    """Append the rows one committed row group set aside, with their locators."""
+    if not quarantined:
+        return
+
+    table = pa.concat_tables(quarantined)
+
+    table = table.add_column(
+        0,
+        "source_file",
+        pa.array([file_name] * table.num_rows, pa.string()),
+    ).add_column(
+        1,
+        "row_group",
+        pa.array([row_group] * table.num_rows, pa.int32()),
+    )
+
+    if file_name not in quarantine_sink.writers:
+        quarantine_sink.writers[file_name] = pq.ParquetWriter(
+            quarantine_file_path(quarantine_sink, file_name),
+            quarantine_sink.schema,
+        )
+
+    quarantine_sink.writers[file_name].write_table(
+        table.select(quarantine_sink.schema.names)
+    )
+
+    quarantine_sink.rows_by_file[file_name] = (
+        quarantine_sink.rows_by_file.get(file_name, 0) + table.num_rows
+    )
+
+
+def prepare_copy(
+    connection: psycopg.Connection,
+    target_table: str,
+    load_options: LoadOptions,
+    cast_plan: CastPlan,
+) -> CopyTarget:
+    schema_name, table_name = target_table.split(".", maxsplit=1)
+    copy_format = load_options.copy_format
+
+    copy_sql = build_copy_sql(
+        schema_name=schema_name,
+        table_name=table_name,
+        copy_format=copy_format,
+        columns=load_columns(load_options),
+    )
+
+    column_types = (
+        fetch_column_types(
+            connection=connection,
+            schema_name=schema_name,
+            table_name=table_name,
+        )
+        if copy_format == "binary"
+        else {}
+    )
+
+    return CopyTarget(
+        copy_sql=copy_sql,
+        copy_format=copy_format,
+        column_types=column_types,
+        content_hashes=load_options.content_hashes,
+        pickup_order=load_options.pickup_order,
+        cast_plan=cast_plan,
+        reconcile=load_options.reconcile,
+        quarantine=load_options.quarantine_path is not None,
+    )
+
+
+@dataclass(frozen=True)
+class FileFingerprint:
+    file_size: int
+    file_mtime: datetime
+    footer_sha256: str
+
+
+def file_fingerprint(file_path: Path) -> FileFingerprint:
+    """Identify a Parquet file by its size, mtime and a hash of its footer.
+
+    The footer holds the schema, row-group offsets and column statistics,
+    so it changes whenever the data does, and reading it costs one seek.
+    """
+    stat = file_path.stat()
+
+    with file_path.open("rb") as file:
+        file.seek(-PARQUET_TAIL_BYTES, os.SEEK_END)
+        footer_length_bytes = file.read(4)
+
+        footer_length = struct.unpack("<I", footer_length_bytes)[0]
+
+        file.seek(-(PARQUET_TAIL_BYTES + footer_length), os.SEEK_END)
+        footer = file.read(footer_length)
+
+    return FileFingerprint(
+        file_size=stat.st_size,
+        file_mtime=datetime.fromtimestamp(stat.st_mtime, tz=timezone.utc),
+        footer_sha256=hashlib.sha256(footer + footer_length_bytes).hexdigest(),
+    )
+
+
+def ensure_ledger_table(
+    connection: psycopg.Connection,
+    ledger_table: str,
+) -> None:
+    schema_name, table_name = ledger_table.split(".", maxsplit=1)
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            sql.SQL(
+                """
+                CREATE TABLE IF NOT EXISTS {}.{} (
+                    target_table text NOT NULL,
+                    file_name text NOT NULL,
+                    file_size bigint NOT NULL,
+                    file_mtime timestamptz NOT NULL,
+                    footer_sha256 text NOT NULL,
+                    row_group integer NOT NULL,
+                    rows_loaded bigint NOT NULL,
+                    loaded_at timestamptz NOT NULL DEFAULT now(),
+                    PRIMARY KEY (
+                        target_table,
+                        footer_sha256,
+                        file_size,
+                        row_group
+                    )
+                )
+                """
+            ).format(
+                sql.Identifier(schema_name),
+                sql.Identifier(table_name),
+            )
+        )
+
+    connection.commit()
+
+
+def fetch_loaded_row_groups(
+    connection: psycopg.Connection,
+    ledger_table: str,
+    target_table: str,
+    fingerprint: FileFingerprint,
+) -> set[int]:
+    schema_name, table_name = ledger_table.split(".", maxsplit=1)
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            sql.SQL(
+                """
+                SELECT row_group
+                FROM {}.{}
+                WHERE target_table = %s
+                  AND footer_sha256 = %s
+                  AND file_size = %s
+                """
+            ).format(
+                sql.Identifier(schema_name),
+                sql.Identifier(table_name),
+            ),
+            (
+                target_table,
+                fingerprint.footer_sha256,
+                fingerprint.file_size,
+            ),
+        )
+
+        return {row_group for (row_group,) in cursor.fetchall()}
+
+
+def record_ledger_entry(
+    connection: psycopg.Connection,
+    ledger_table: str,
+    target_table: str,
+    file_path: Path,
+    fingerprint: FileFingerprint,
+    row_group: int,
+    rows: int,
+) -> None:
+    """Claim a row group in the current transaction, before its COPY.
+
+    Inserting first means a concurrent run that already holds the same
+    row group fails on the primary key instead of loading it twice.
+    """
+    schema_name, table_name = ledger_table.split(".", maxsplit=1)
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            sql.SQL(
+                """
+                INSERT INTO {}.{} (
+                    target_table,
+                    file_name,
+                    file_size,
+                    file_mtime,
+                    footer_sha256,
+                    row_group,
+                    rows_loaded
+                )
+                VALUES (%s, %s, %s, %s, %s, %s, %s)
+                """
+            ).format(
+                sql.Identifier(schema_name),
+                sql.Identifier(table_name),
+            ),
+            (
+                target_table,
+                file_path.name,
+                fingerprint.file_size,
+                fingerprint.file_mtime,
+                fingerprint.footer_sha256,
+                row_group,
+                rows,
+            ),
+        )
+
+
+def clear_ledger(
+    connection: psycopg.Connection,
+    ledger_table: str,
+    target_table: str,
+) -> None:
+    schema_name, table_name = ledger_table.split(".", maxsplit=1)
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            sql.SQL(
+                "DELETE FROM {}.{} WHERE target_table = %s"
+            ).format(
+                sql.Identifier(schema_name),
+                sql.Identifier(table_name),
+            ),
+            (target_table,),
+        )
+
+
+def load_row_group(
+    connection: psycopg.Connection,
+    parquet_file: pq.ParquetFile,
+    file_path: Path,
+    fingerprint: FileFingerprint,
+    row_group: int,
+    target_table: str,
+    copy_target: CopyTarget,
+    load_options: LoadOptions,
+    report_batches: bool,
+    stage_times: dict[str, StageTime],
+    progress: FileProgress,
+    batch_sizer: BatchSizer | None,
+    daily_totals: DailyTotals | None = None,
+    quarantined: list[pa.Table] | None = None,
+    reload: bool = False,
+    shard_batches: list[ShardBatch] | None = None,
+) -> int:
+    """Load one row group and its ledger entry as a single transaction.
+
+    A reload (see replace_months) sends only the rows in
+    load_options.reload_months. With shard_batches, the batch telemetry
+    is collected there for the parent instead of written.
+    """
+    if reload:
+        copy_target = replace(
+            copy_target,
+            reload_months=load_options.reload_months,
+        )
+
+    row_group_totals: DailyTotals | None = (
+        {} if daily_totals is not None else None
+    )
+    row_group_quarantined: list[pa.Table] | None = (
+        [] if quarantined is not None else None
+    )
+    on_batch = None
+
+    if load_options.telemetry_path is not None and shard_batches is not None:
+        on_batch = partial(collect_shard_batch, shard_batches)
+    elif load_options.telemetry_path is not None:
+        on_batch = partial(
+            record_batch_telemetry,
+            load_options.telemetry_path,
+            progress,
+            target_table,
+            row_group,
+        )
+
+    try:
+        record_ledger_entry(
+            connection=connection,
+            ledger_table=load_options.ledger_table,
+            target_table=target_table,
+            file_path=file_path,
+            fingerprint=fingerprint,
+            row_group=row_group,
+            rows=parquet_file.metadata.row_group(row_group).num_rows,
+        )
+
+        rows_loaded = copy_parquet_batches(
+            connection=connection,
+            parquet_file=parquet_file,
+            copy_target=copy_target,
+            load_options=load_options,
+            row_group=row_group,
+            progress=progress,
+            report_batches=report_batches,
+            stage_times=stage_times,
+            on_batch=on_batch,
+            batch_sizer=batch_sizer,
+            daily_totals=row_group_totals,
+            quarantined=row_group_quarantined,
+        )
+
+        connection.commit()
+    except BaseException:
+        connection.rollback()
+        raise
+
+    # Only committed row groups count towards the reconciliation and
+    # the quarantine file.
+    if daily_totals is not None and row_group_totals is not None:
+        merge_daily_totals(daily_totals, row_group_totals)
+
+    if quarantined is not None and row_group_quarantined is not None:
+        quarantined.extend(row_group_quarantined)
+
+    return rows_loaded
+
+
+def relation_identifier(relation: str) -> sql.Identifier:
+    schema_name, table_name = relation.split(".", maxsplit=1)
+
+    return sql.Identifier(schema_name, table_name)
+
+
+def target_column_list(columns: list[str]) -> sql.Composed:
+    return sql.SQL(", ").join(
+        sql.Identifier(column)
+        for column in columns
+    )
+
+
+def relation_columns(
+    connection: psycopg.Connection,
+    relation: str,
+) -> list[str]:
+    """Return the column names of relation in table order."""
+    schema_name, table_name = relation.split(".", maxsplit=1)
+
+    return list(
+        fetch_column_types(
+            connection=connection,
+            schema_name=schema_name,
+            table_name=table_name,
+        )
+    )
+
+
+def sibling_relation(relation: str, suffix: str) -> str:
+    """Name a helper table next to relation, e.g. bronze.x__staging."""
+    return f"{relation}__{suffix}"
+
+
+def create_staging_table(
+    connection: psycopg.Connection,
+    target_table: str,
+    staging_table: str,
+    ledger_table: str,
+    columns: list[str],
+) -> None:
+    """Create an empty UNLOGGED table with just the loaded columns.
+
+    It has no indexes, defaults or constraints, so COPY pays only for
+    the heap writes. --mode upsert merges it into the target; --mode swap
+    uses create_swap_staging_table, whose table becomes the target.
+
+    A staging table left by an earlier failed run is dropped rather than
+    resumed: unlogged tables are emptied by crash recovery, so its ledger
+    entries could no longer be trusted.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            sql.SQL("DROP TABLE IF EXISTS {}").format(
+                relation_identifier(staging_table),
+            )
+        )
+
+        cursor.execute(
+            sql.SQL(
+                "CREATE UNLOGGED TABLE {} AS SELECT {} FROM {} WITH NO DATA"
+            ).format(
+                relation_identifier(staging_table),
+                target_column_list(columns),
+                relation_identifier(target_table),
+            )
+        )
+
+    clear_ledger(
+        connection=connection,
+        ledger_table=ledger_table,
+        target_table=staging_table,
+    )
+
+    connection.commit()
+
+
+def create_swap_staging_table(
+    connection: psycopg.Connection,
+    target_table: str,
+    staging_table: str,
+    ledger_table: str,
+    months: list[date] | None,
+) -> None:
+    """Create the UNLOGGED, index-free table that --mode swap promotes.
+
+    It has the target's columns, defaults and constraints, so it can be
+    set LOGGED and renamed into place without copying its rows. For a
+    partitioned target (months given) it is partitioned the same way:
+    one UNLOGGED partition per swapped month, each later attached to the
+    target, and a default partition for rows outside those months.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            sql.SQL("DROP TABLE IF EXISTS {}").format(
+                relation_identifier(staging_table),
+            )
+        )
+
+        if months is None:
+            cursor.execute(
+                sql.SQL(
+                    "CREATE UNLOGGED TABLE {} "
+                    "(LIKE {} INCLUDING ALL EXCLUDING INDEXES)"
+                ).format(
+                    relation_identifier(staging_table),
+                    relation_identifier(target_table),
+                )
+            )
+        else:
+            cursor.execute(
+                sql.SQL(
+                    "CREATE TABLE {} (LIKE {} INCLUDING DEFAULTS "
+                    "INCLUDING CONSTRAINTS) PARTITION BY RANGE ({})"
+                ).format(
+                    relation_identifier(staging_table),
+                    relation_identifier(target_table),
+                    sql.Identifier(PARTITION_COLUMN),
+                )
+            )
+
+            for month in months:
+                lower_bound, upper_bound = month_bounds(month)
+
+                cursor.execute(
+                    sql.SQL(
+                        "CREATE UNLOGGED TABLE {} PARTITION OF {} "
+                        "FOR VALUES FROM ({}) TO ({})"
+                    ).format(
+                        relation_identifier(
+                            partition_name(staging_table, month)
+                        ),
+                        relation_identifier(staging_table),
+                        lower_bound,
+                        upper_bound,
+                    )
+                )
+
+            cursor.execute(
+                sql.SQL(
+                    "CREATE UNLOGGED TABLE {} PARTITION OF {} DEFAULT"
+                ).format(
+                    relation_identifier(
+                        sibling_partition(staging_table, "default")
+                    ),
+                    relation_identifier(staging_table),
+                )
+            )
+
+    clear_ledger(
+        connection=connection,
+        ledger_table=ledger_table,
+        target_table=staging_table,
+    )
+
+    connection.commit()
+
+
+class IndexDefinition(TypedDict):
+    index_name: str
+    definition: str
+    constraint_name: str | None
+    constraint_type: str | None
+
+
+def fetch_index_definitions(
+    connection: psycopg.Connection,
+    relation: str,
+) -> list[IndexDefinition]:
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT
+                index_class.relname,
+                pg_catalog.pg_get_indexdef(i.indexrelid),
+                con.conname,
+                con.contype
+            FROM pg_catalog.pg_index AS i
+            JOIN pg_catalog.pg_class AS index_class
+                ON index_class.oid = i.indexrelid
+            LEFT JOIN pg_catalog.pg_constraint AS con
+                ON con.conindid = i.indexrelid
+               AND con.conrelid = i.indrelid
+            WHERE i.indrelid = %s::regclass
+            ORDER BY index_class.relname
+            """,
+            (relation_identifier(relation).as_string(connection),),
+        )
+
+        return [
+            {
+                "index_name": index_name,
+                "definition": definition,
+                "constraint_name": constraint_name,
+                "constraint_type": constraint_type,
+            }
+            for (
+                index_name,
+                definition,
+                constraint_name,
+                constraint_type,
+            ) in cursor.fetchall()
+        ]
+
+
+def fetch_dependent_views(
+    connection: psycopg.Connection,
+    relation: str,
+) -> list[tuple[str, str]]:
+    """Return (qualified name, definition) for views that select from relation."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT DISTINCT
+                format('%%I.%%I', view_namespace.nspname, view_class.relname),
+                view_class.relkind,
+                pg_catalog.pg_get_viewdef(view_class.oid)
+            FROM pg_catalog.pg_depend AS dependency
+            JOIN pg_catalog.pg_rewrite AS rewrite
+                ON rewrite.oid = dependency.objid
+            JOIN pg_catalog.pg_class AS view_class
+                ON view_class.oid = rewrite.ev_class
+            JOIN pg_catalog.pg_namespace AS view_namespace
+                ON view_namespace.oid = view_class.relnamespace
+            WHERE dependency.classid = 'pg_catalog.pg_rewrite'::regclass
+              AND dependency.refobjid = %s::regclass
+              AND view_class.oid <> dependency.refobjid
+            """,
+            (relation_identifier(relation).as_string(connection),),
+        )
+
+        views = cursor.fetchall()
+
+    materialized_views = [
+        view_name
+        for view_name, relkind, _ in views
+        if relkind != "v"
+    ]
+
+    if materialized_views:
+        raise ValueError(
+            "--mode swap cannot re-point materialized views: "
+            f"{', '.join(materialized_views)}"
+        )
+
+    return [
+        (view_name, definition)
+        for view_name, _, definition in views
+    ]
+
+
+@dataclass(frozen=True)
+class RelationPrivileges:
+    owner: str
+    owned_by_session: bool
+    # (column or None for the table, privilege, grantable, role or None
+    # for PUBLIC)
+    grants: list[tuple[str | None, str, bool, str | None]]
+
+
+def fetch_relation_privileges(
+    connection: psycopg.Connection,
+    relation: str,
+) -> RelationPrivileges:
+    """Read the owner, table GRANTs and column GRANTs of relation."""
+    relation_name = relation_identifier(relation).as_string(connection)
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT
+                NULL,
+                privilege.privilege_type,
+                privilege.is_grantable,
+                CASE WHEN privilege.grantee = 0 THEN NULL
+                     ELSE pg_catalog.pg_get_userbyid(privilege.grantee)
+                END
+            FROM pg_catalog.pg_class AS class,
+                 pg_catalog.aclexplode(class.relacl) AS privilege
+            WHERE class.oid = %(relation)s::regclass
+            UNION ALL
+            SELECT
+                attribute.attname,
+                privilege.privilege_type,
+                privilege.is_grantable,
+                CASE WHEN privilege.grantee = 0 THEN NULL
+                     ELSE pg_catalog.pg_get_userbyid(privilege.grantee)
+                END
+            FROM pg_catalog.pg_attribute AS attribute,
+                 pg_catalog.aclexplode(attribute.attacl) AS privilege
+            WHERE attribute.attrelid = %(relation)s::regclass
+              AND NOT attribute.attisdropped
+            """,
+            {"relation": relation_name},
+        )
+
+        grants = cursor.fetchall()
+
+        cursor.execute(
+            """
+            SELECT pg_catalog.pg_get_userbyid(relowner),
+                   pg_catalog.pg_get_userbyid(relowner) = current_user
+            FROM pg_catalog.pg_class
+            WHERE oid = %s::regclass
+            """,
+            (relation_name,),
+        )
+
+        owner, owned_by_session = cursor.fetchone()
+
+    return RelationPrivileges(
+        owner=owner,
+        owned_by_session=owned_by_session,
+        grants=grants,
+    )
+
+
+def apply_relation_privileges(
+    connection: psycopg.Connection,
+    relation: str,
+    privileges: RelationPrivileges,
+) -> None:
+    """Grant relation the privileges read from another, then hand it to
+    that relation's owner; a table created by this session has neither."""
+    with connection.cursor() as cursor:
+        for column_name, privilege_type, is_grantable, grantee in (
+            privileges.grants
+        ):
+            cursor.execute(
+                sql.SQL("GRANT {}{} ON TABLE {} TO {}{}").format(
+                    sql.SQL(privilege_type),
+                    sql.SQL("")
+                    if column_name is None
+                    else sql.SQL(" ({})").format(sql.Identifier(column_name)),
+                    relation_identifier(relation),
+                    sql.SQL("PUBLIC")
+                    if grantee is None
+                    else sql.Identifier(grantee),
+                    sql.SQL(" WITH GRANT OPTION" if is_grantable else ""),
+                )
+            )
+
+        # Last: every statement before it needs this session to own the
+        # table.
+        if not privileges.owned_by_session:
+            cursor.execute(
+                sql.SQL("ALTER TABLE {} OWNER TO {}").format(
+                    relation_identifier(relation),
+                    sql.Identifier(privileges.owner),
+                )
+            )
+
+
+def rebuild_index_sql(
+    definition: IndexDefinition,
+    connection: psycopg.Connection,
+    target_table: str,
+    swap_table: str,
+    swap_index_name: str,
+) -> str:
+    """Rewrite a pg_get_indexdef statement to build the index on swap_table."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT format('%%I.%%I', n.nspname, c.relname)
+            FROM pg_catalog.pg_class AS c
+            JOIN pg_catalog.pg_namespace AS n
+                ON n.oid = c.relnamespace
+            WHERE c.oid = %s::regclass
+            """,
+            (relation_identifier(target_table).as_string(connection),),
+        )
+
+        (target,) = cursor.fetchone()
+
+    # pg_get_indexdef quotes identifiers only where needed, like format('%I').
+    pattern = re.compile(
+        r'^(CREATE (?:UNIQUE )?INDEX )(?:"(?:[^"]|"")+"|\S+)( ON (?:ONLY )?)'
+        + re.escape(target)
+        + r" "
+    )
+
+    statement, replaced = pattern.subn(
+        lambda match: (
+            match.group(1)
+            + sql.Identifier(swap_index_name).as_string(connection)
+            + match.group(2)
+            + relation_identifier(swap_table).as_string(connection)
+            + " "
+        ),
+        definition["definition"],
+        count=1,
+    )
+
+    if not replaced:
+        raise ValueError(
+            f"Cannot rebuild index {definition['index_name']}: "
+            f"{definition['definition']}"
+        )
+
+    return statement
+
+
+def swap_in_staging_table(
+    connection: psycopg.Connection,
+    target_table: str,
+    staging_table: str,
+    ledger_table: str,
+) -> None:
+    """Replace target_table with the staging table in a single transaction.
+
+    The staging table is set LOGGED, which writes its rows to the WAL
+    once, the target's indexes are built once over the finished data,
+    and the table is analyzed before it is renamed into place. It takes
+    over the target's owner and privileges, views on the old table are
+    re-created against the new one, and the staging ledger entries
+    become the target's.
+    """
+    schema_name, table_name = target_table.split(".", maxsplit=1)
+    previous_table = sibling_relation(target_table, "previous")
+
+    index_definitions = fetch_index_definitions(connection, target_table)
+    dependent_views = fetch_dependent_views(connection, target_table)
+    privileges = fetch_relation_privileges(connection, target_table)
+
+    unsupported_constraints = [
+        definition["constraint_name"]
+        for definition in index_definitions
+        if definition["constraint_type"] not in (None, "p", "u")
+    ]
+
+    if unsupported_constraints:
+        raise ValueError(
+            "--mode swap cannot rebuild constraints: "
+            f"{', '.join(unsupported_constraints)}"
+        )
+
+    with connection.cursor() as cursor:
+        started_at = perf_counter()
+
+        cursor.execute(
+            sql.SQL("ALTER TABLE {} SET LOGGED").format(
+                relation_identifier(staging_table),
+            )
+        )
+
+        print(
+            f"  Set {staging_table} LOGGED "
+            f"({perf_counter() - started_at:,.2f} seconds)"
+        )
+
+        started_at = perf_counter()
+        renames: list[sql.Composed] = []
+
+        for position, definition in enumerate(index_definitions, start=1):
+            swap_index_name = f"{table_name}__swap_index_{position}"
+
+            cursor.execute(
+                rebuild_index_sql(
+                    definition=definition,
+                    connection=connection,
+                    target_table=target_table,
+                    swap_table=staging_table,
+                    swap_index_name=swap_index_name,
+                )
+            )
+
+            if definition["constraint_type"] is None:
+                renames.append(
+                    sql.SQL("ALTER INDEX {} RENAME TO {}").format(
+                        sql.Identifier(schema_name, swap_index_name),
+                        sql.Identifier(definition["index_name"]),
+                    )
+                )
+                continue
+
+            constraint_kind = (
+                "PRIMARY KEY"
+                if definition["constraint_type"] == "p"
+                else "UNIQUE"
+            )
+
+            cursor.execute(
+                sql.SQL(
+                    "ALTER TABLE {} ADD CONSTRAINT {} "
+                    + constraint_kind
+                    + " USING INDEX {}"
+                ).format(
+                    relation_identifier(staging_table),
+                    sql.Identifier(swap_index_name),
+                    sql.Identifier(swap_index_name),
+                )
+            )
+
+            renames.append(
+                sql.SQL("ALTER TABLE {} RENAME CONSTRAINT {} TO {}").format(
+                    relation_identifier(target_table),
+                    sql.Identifier(swap_index_name),
+                    sql.Identifier(definition["constraint_name"]),
+                )
+            )
+
+        print(
+            f"  Built {len(index_definitions):,} indexes "
+            f"({perf_counter() - started_at:,.2f} seconds)"
+        )
+
+        cursor.execute(
+            sql.SQL("ANALYZE {}").format(
+                relation_identifier(staging_table),
+            )
+        )
+
+        cursor.execute(
+            sql.SQL("ALTER TABLE {} RENAME TO {}").format(
+                relation_identifier(target_table),
+                sql.Identifier(previous_table.split(".", maxsplit=1)[1]),
+            )
+        )
+
+        cursor.execute(
+            sql.SQL("ALTER TABLE {} RENAME TO {}").format(
+                relation_identifier(staging_table),
+                sql.Identifier(table_name),
+            )
+        )
+
+        # Views are bound to the old table; replaying their definitions
+        # binds them to the new one so the old table can be dropped.
+        for view_name, definition in dependent_views:
+            cursor.execute(
+                sql.SQL("CREATE OR REPLACE VIEW {} AS {}").format(
+                    sql.SQL(view_name),
+                    sql.SQL(definition.rstrip().rstrip(";")),
+                )
+            )
+
+        cursor.execute(
+            sql.SQL("DROP TABLE {}").format(
+                relation_identifier(previous_table),
+            )
+        )
+
+        for rename in renames:
+            cursor.execute(rename)
+
+        rename_owned_sequences(connection, target_table)
+
+        apply_relation_privileges(
+            connection=connection,
+            relation=target_table,
+            privileges=privileges,
+        )
+
+
+    clear_ledger(
+        connection=connection,
+        ledger_table=ledger_table,
+        target_table=target_table,
+    )
+
+    rename_ledger_entries(
+        connection=connection,
+        ledger_table=ledger_table,
+        from_table=staging_table,
+        to_table=target_table,
+    )
+
+    connection.commit()
+
+
+def rename_owned_sequences(
+    connection: psycopg.Connection,
+    relation: str,
+) -> None:
+    """Give identity/serial sequences created for the staging table their usual names."""
+    schema_name, table_name = relation.split(".", maxsplit=1)
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT sequence_class.relname, a.attname
+            FROM pg_catalog.pg_depend AS dependency
+            JOIN pg_catalog.pg_class AS sequence_class
+                ON sequence_class.oid = dependency.objid
+               AND sequence_class.relkind = 'S'
+            JOIN pg_catalog.pg_attribute AS a
+                ON a.attrelid = dependency.refobjid
+               AND a.attnum = dependency.refobjsubid
+            WHERE dependency.refobjid = %s::regclass
+              AND dependency.deptype IN ('a', 'i')
+            """,
+            (relation_identifier(relation).as_string(connection),),
+        )
+
+        for sequence_name, column_name in cursor.fetchall():
+            cursor.execute(
+                sql.SQL("ALTER SEQUENCE {} RENAME TO {}").format(
+                    sql.Identifier(schema_name, sequence_name),
+                    sql.Identifier(f"{table_name}_{column_name}_seq"),
+                )
+            )
+
+
+def rename_ledger_entries(
+    connection: psycopg.Connection,
+    ledger_table: str,
+    from_table: str,
+    to_table: str,
+) -> None:
+    with connection.cursor() as cursor:
+        cursor.execute(
+            sql.SQL(
+                "UPDATE {} SET target_table = %s WHERE target_table = %s"
+            ).format(
+                relation_identifier(ledger_table),
+            ),
+            (to_table, from_table),
+        )
+
+
+def fetch_relation_kind(
+    connection: psycopg.Connection,
+    relation: str,
+) -> str:
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT relkind FROM pg_catalog.pg_class WHERE oid = %s::regclass",
+            (relation_identifier(relation).as_string(connection),),
+        )
+
+        (relkind,) = cursor.fetchone()
+
+    return relkind
+
+
+def parse_month(value: str) -> date:
+    """argparse type for YYYY-MM month arguments."""
+    try:
+        return datetime.strptime(value, "%Y-%m").date()
+    except ValueError as error:
+        raise argparse.ArgumentTypeError(
+            f"Expected a month as YYYY-MM, got {value!r}."
+        ) from error
+
+
+def add_months(month: date, months: int) -> date:
+    month_index = month.year * 12 + month.month - 1 + months
+
+    return date(month_index // 12, month_index % 12 + 1, 1)
+
+
+def month_range(first_month: date, last_month: date) -> list[date]:
+    months: list[date] = []
+    month = first_month
+
+    while month <= last_month:
+        months.append(month)
+        month = add_months(month, 1)
+
+    return months
+
+
+def footer_pickup_range(
+    parquet_file: pq.ParquetFile,
+    pickup_column: str,
+) -> tuple[datetime, datetime] | None:
+    """Return the min/max pickup time from row-group statistics, if recorded."""
+    metadata = parquet_file.metadata
+    column_index = parquet_file.schema_arrow.get_field_index(pickup_column)
+
+    minimums: list[datetime] = []
+    maximums: list[datetime] = []
+
+    for row_group in range(metadata.num_row_groups):
+        statistics = metadata.row_group(row_group).column(column_index).statistics
+
+        if statistics is None or not statistics.has_min_max:
+            return None
+
+        minimums.append(statistics.min)
+        maximums.append(statistics.max)
+
+    if not minimums:
+        return None
+
+    return min(minimums), max(maximums)
+
+
+def file_months(
+    file_path: Path,
+    parquet_file: pq.ParquetFile,
+    pickup_spec: ColumnSpec,
+) -> list[date]:
+    """Return the pickup months a file is loaded into.
+
+    The footer min/max decides the months. TLC files carry a handful of
+    trips with far-off pickup dates, so a span wider than
+    PARTITION_SPAN_LIMIT_MONTHS falls back to the month in the file name
+    and the outliers are left to the default partition.
+    """
+    pickup_column = resolve_source_column(
+        parquet_file.schema_arrow.names,
+        pickup_spec,
+    )
+    pickup_range = (
+        footer_pickup_range(parquet_file, pickup_column)
+        if pickup_column is not None
+        else None
+    )
+
+    if pickup_range is not None:
+        first_month = pickup_range[0].date().replace(day=1)
+        last_month = pickup_range[1].date().replace(day=1)
+        months = month_range(first_month, last_month)
+
+        if len(months) <= PARTITION_SPAN_LIMIT_MONTHS:
+            return months
+
+    if match := FILE_MONTH_PATTERN.search(file_path.name):
+        return [parse_month(match.group(0))]
+
+    return []
+
+
+def partition_name(target_table: str, month: date) -> str:
+    return f"{target_table}_{month:%Y_%m}"
+
+
+def sibling_partition(target_table: str, suffix: str) -> str:
+    return f"{target_table}_{suffix}"
+
+
+def month_bounds(month: date) -> tuple[sql.Literal, sql.Literal]:
+    return (
+        sql.Literal(month.isoformat()),
+        sql.Literal(add_months(month, 1).isoformat()),
+    )
+
+
+def month_predicate(month: date) -> sql.Composed:
+    lower_bound, upper_bound = month_bounds(month)
+
+    return sql.SQL("{} >= {} AND {} < {}").format(
+        sql.Identifier(PARTITION_COLUMN),
+        lower_bound,
+        sql.Identifier(PARTITION_COLUMN),
+        upper_bound,
+    )
+
+
+def pickup_in_months(pickups: pa.Array, months: tuple[date, ...]) -> pa.Array:
+    """True for pickups within one of months, as month_predicate."""
+    in_months = pa.array([False] * len(pickups))
+
+    for month in months:
+        lower_bound = pa.scalar(
+            datetime.combine(month, datetime.min.time()),
+            type=pickups.type,
+        )
+        upper_bound = pa.scalar(
+            datetime.combine(add_months(month, 1), datetime.min.time()),
+            type=pickups.type,
+        )
+
+        in_months = pc.or_(
+            in_months,
+            pc.and_(
+                pc.greater_equal(pickups, lower_bound),
+                pc.less(pickups, upper_bound),
+            ),
+        )
+
+    return pc.fill_null(in_months, False)
+
+
+def relation_exists(
+    connection: psycopg.Connection,
+    relation: str,
+) -> bool:
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT to_regclass(%s) IS NOT NULL",
+            (relation_identifier(relation).as_string(connection),),
+        )
+
+        (exists,) = cursor.fetchone()
+
+    return exists
+
+
+def drop_relation(
+    connection: psycopg.Connection,
+    relation: str,
+) -> None:
+    with connection.cursor() as cursor:
+        cursor.execute(
+            sql.SQL("DROP TABLE {}").format(
+                relation_identifier(relation),
+            )
+        )
+
+    connection.commit()
+
+
+def ensure_partitioned_table(
+    connection: psycopg.Connection,
+    target_table: str,
+    column_specs: tuple[ColumnSpec, ...],
+) -> None:
+    """Create the month-partitioned parent and its default partition."""
+    if relation_exists(connection, target_table):
+        if fetch_relation_kind(connection, target_table) != "p":
+            raise ValueError(
+                f"{target_table} already exists and is not partitioned. "
+                "Load into a new relation or migrate it first."
+            )
+    else:
+        print(f"Creating partitioned table {target_table}")
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            sql.SQL(
+                "CREATE TABLE IF NOT EXISTS {} ({}) PARTITION BY RANGE ({})"
+            ).format(
+                relation_identifier(target_table),
+                sql.SQL(", ").join(
+                    sql.SQL("{} {}{}").format(
+                        sql.Identifier(column_spec.target),
+                        sql.SQL(column_spec.postgres_type),
+                        sql.SQL("" if column_spec.nullable else " NOT NULL"),
+                    )
+                    for column_spec in column_specs
+                ),
+                sql.Identifier(PARTITION_COLUMN),
+            )
+        )
+
+        cursor.execute(
+            sql.SQL(
+                "CREATE TABLE IF NOT EXISTS {} PARTITION OF {} DEFAULT"
+            ).format(
+                relation_identifier(sibling_partition(target_table, "default")),
+                relation_identifier(target_table),
+            )
+        )
+
+    connection.commit()
+
+
+def ensure_month_partition(
+    connection: psycopg.Connection,
+    target_table: str,
+    month: date,
+) -> None:
+    """Create the partition for one pickup month if it does not exist.
+
+    Rows for the month that were parked in the default partition are
+    moved into the new partition first; PostgreSQL refuses to add a
+    partition whose range the default partition still holds.
+    """
+    partition = partition_name(target_table, month)
+
+    if relation_exists(connection, partition):
+        return
+
+    default_partition = sibling_partition(target_table, "default")
+    lower_bound, upper_bound = month_bounds(month)
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            sql.SQL("SELECT EXISTS (SELECT 1 FROM {} WHERE {})").format(
+                relation_identifier(default_partition),
+                month_predicate(month),
+            )
+        )
+
+        (default_has_rows,) = cursor.fetchone()
+
+        if not default_has_rows:
+            cursor.execute(
+                sql.SQL(
+                    "CREATE TABLE {} PARTITION OF {} "
+                    "FOR VALUES FROM ({}) TO ({})"
+                ).format(
+                    relation_identifier(partition),
+                    relation_identifier(target_table),
+                    lower_bound,
+                    upper_bound,
+                )
+            )
+        else:
+            cursor.execute(
+                sql.SQL(
+                    "CREATE TABLE {} (LIKE {} INCLUDING DEFAULTS "
+                    "INCLUDING CONSTRAINTS)"
+                ).format(
+                    relation_identifier(partition),
+                    relation_identifier(target_table),
+                )
+            )
+
+            cursor.execute(
+                sql.SQL(
+                    "WITH moved AS (DELETE FROM {} WHERE {} RETURNING *) "
+                    "INSERT INTO {} SELECT * FROM moved"
+                ).format(
+                    relation_identifier(default_partition),
+                    month_predicate(month),
+                    relation_identifier(partition),
+                )
+            )
+
+            print(
+                f"  Moved {cursor.rowcount:,} rows for {month:%Y-%m} "
+                "out of the default partition"
+            )
+
+            cursor.execute(
+                sql.SQL(
+                    "ALTER TABLE {} ATTACH PARTITION {} "
+                    "FOR VALUES FROM ({}) TO ({})"
+                ).format(
+                    relation_identifier(target_table),
+                    relation_identifier(partition),
+                    lower_bound,
+                    upper_bound,
+                )
+            )
+
+    connection.commit()
+
+    print(f"  Created partition {partition}")
+
+
+def rename_swap_partition_indexes(
+    connection: psycopg.Connection,
+    partition: str,
+) -> None:
+    """Drop the __swap marker from index names built during ATTACH PARTITION."""
+    schema_name = partition.split(".", maxsplit=1)[0]
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT index_class.relname
+            FROM pg_catalog.pg_index AS i
+            JOIN pg_catalog.pg_class AS index_class
+                ON index_class.oid = i.indexrelid
+            WHERE i.indrelid = %s::regclass
+              AND index_class.relname LIKE '%%\\_\\_swap%%'
+            """,
+            (relation_identifier(partition).as_string(connection),),
+        )
+
+        for (index_name,) in cursor.fetchall():
+            cursor.execute(
+                sql.SQL("ALTER INDEX {} RENAME TO {}").format(
+                    sql.Identifier(schema_name, index_name),
+                    sql.Identifier(index_name.replace("__swap", "", 1)),
+                )
+            )
+
+
+def plan_file_months(
+    files: list[Path],
+    column_specs: tuple[ColumnSpec, ...],
+) -> dict[Path, list[date]]:
+    (pickup_spec,) = [
+        column_spec
+        for column_spec in column_specs
+        if column_spec.target == PARTITION_COLUMN
+    ]
+
+    return {
+        file_path: file_months(
+            file_path,
+            pq.ParquetFile(file_path),
+            pickup_spec,
+        )
+        for file_path in files
+    }
+
+
+def files_pickup_days(
+    files: list[Path],
+    column_specs: tuple[ColumnSpec, ...],
+) -> list[date] | None:
+    """Return the first and last pickup day over files, from their footers.
+
+    None when a file records no pickup statistics, so no span is known.
+    """
+    (pickup_spec,) = [
+        column_spec
+        for column_spec in column_specs
+        if column_spec.target == PARTITION_COLUMN
+    ]
+
+    pickup_days: list[date] = []
+
+    for file_path in files:
+        parquet_file = pq.ParquetFile(file_path)
+        pickup_column = resolve_source_column(
+            parquet_file.schema_arrow.names,
+            pickup_spec,
+        )
+        pickup_range = (
+            footer_pickup_range(parquet_file, pickup_column)
+            if pickup_column is not None
+            else None
+        )
+
+        if pickup_range is None:
+            return None
+
+        pickup_days.extend(pickup.date() for pickup in pickup_range)
+
+    return pickup_days
+
+
+def replace_months(
+    connection: psycopg.Connection,
+    target_table: str,
+    ledger_table: str,
+    months: list[date],
+    months_by_file: dict[Path, list[date]],
+) -> dict[Path, set[int]]:
+    """Empty the given month partitions and forget their files in the ledger.
+
+    Input files that load into a replaced month are dropped from the
+    ledger in the same transaction, so this run loads them again even if
+    they have not changed. Returns the row groups dropped, per file: their
+    rows outside the replaced months are still loaded, so only the rows in
+    those months are sent again.
+    """
+    reloads: dict[Path, set[int]] = {}
+
+    with connection.cursor() as cursor:
+        for month in months:
+            partition = partition_name(target_table, month)
+
+            print(f"Truncating partition {partition}")
+
+            cursor.execute(
+                sql.SQL("TRUNCATE TABLE {}").format(
+                    relation_identifier(partition),
+                )
+            )
+
+        for file_path, file_month_list in months_by_file.items():
+            if not set(file_month_list) & set(months):
+                continue
+
+            fingerprint = file_fingerprint(file_path)
+
+            cursor.execute(
+                sql.SQL(
+                    "DELETE FROM {} WHERE target_table = %s "
+                    "AND footer_sha256 = %s AND file_size = %s "
+                    "RETURNING row_group"
+                ).format(
+                    relation_identifier(ledger_table),
+                ),
+                (
+                    target_table,
+                    fingerprint.footer_sha256,
+                    fingerprint.file_size,
+                ),
+            )
+
+            reloads[file_path] = {row_group for (row_group,) in cursor}
+
+    connection.commit()
+
+    return reloads
+
+
+def swap_in_month_partitions(
+    connection: psycopg.Connection,
+    target_table: str,
+    staging_table: str,
+    ledger_table: str,
+    months: list[date],
+) -> None:
+    """Replace whole month partitions with the staged ones in one transaction.
+
+    Each month's staging partition is detached, set LOGGED, given a CHECK
+    constraint matching its bounds so ATTACH PARTITION can skip the
+    validation scan, analyzed, and attached in place of the old partition.
+    The parent's indexes are built on it during the attach. Staged rows
+    outside the replaced months, held by the staging default partition,
+    are inserted through the parent.
+    """
+    default_partition = sibling_partition(target_table, "default")
+    staged_columns = target_column_list(
+        relation_columns(connection, staging_table)
+    )
+
+    with connection.cursor() as cursor:
+        for month in months:
+            partition = partition_name(target_table, month)
+            swap_partition = sibling_relation(partition, "swap")
+            bound_constraint = f"{swap_partition.split('.', maxsplit=1)[1]}_bound"
+            lower_bound, upper_bound = month_bounds(month)
+            staged_partition = partition_name(staging_table, month)
+
+            cursor.execute(
+                sql.SQL("DROP TABLE IF EXISTS {}").format(
+                    relation_identifier(swap_partition),
+                )
+            )
+
+            cursor.execute(
+                sql.SQL("ALTER TABLE {} DETACH PARTITION {}").format(
+                    relation_identifier(staging_table),
+                    relation_identifier(staged_partition),
+                )
+            )
+
+            cursor.execute(
+                sql.SQL("ALTER TABLE {} RENAME TO {}").format(
+                    relation_identifier(staged_partition),
+                    sql.Identifier(swap_partition.split(".", maxsplit=1)[1]),
+                )
+            )
+
+            cursor.execute(
+                sql.SQL("ALTER TABLE {} SET LOGGED").format(
+                    relation_identifier(swap_partition),
+                )
+            )
+
+            cursor.execute(
+                sql.SQL("SELECT count(*) FROM {}").format(
+                    relation_identifier(swap_partition),
+                )
+            )
+
+            (rows_staged,) = cursor.fetchone()
+
+            cursor.execute(
+                sql.SQL("ALTER TABLE {} ADD CONSTRAINT {} CHECK ({})").format(
+                    relation_identifier(swap_partition),
+                    sql.Identifier(bound_constraint),
+                    month_predicate(month),
+                )
+            )
+
+            cursor.execute(
+                sql.SQL("ANALYZE {}").format(
+                    relation_identifier(swap_partition),
+                )
+            )
+
+            if relation_exists(connection, partition):
+                cursor.execute(
+                    sql.SQL("ALTER TABLE {} DETACH PARTITION {}").format(
+                        relation_identifier(target_table),
+                        relation_identifier(partition),
+                    )
+                )
+
+                cursor.execute(
+                    sql.SQL("DROP TABLE {}").format(
+                        relation_identifier(partition),
+                    )
+                )
+
+            # Rows for this month parked in the default partition are
+            # replaced too, and would otherwise block the attach.
+            cursor.execute(
+                sql.SQL("DELETE FROM {} WHERE {}").format(
+                    relation_identifier(default_partition),
+                    month_predicate(month),
+                )
+            )
+
+            cursor.execute(
+                sql.SQL(
+                    "ALTER TABLE {} ATTACH PARTITION {} "
+                    "FOR VALUES FROM ({}) TO ({})"
+                ).format(
+                    relation_identifier(target_table),
+                    relation_identifier(swap_partition),
+                    lower_bound,
+                    upper_bound,
+                )
+            )
+
+            cursor.execute(
+                sql.SQL("ALTER TABLE {} DROP CONSTRAINT {}").format(
+                    relation_identifier(swap_partition),
+                    sql.Identifier(bound_constraint),
+                )
+            )
+
+            cursor.execute(
+                sql.SQL("ALTER TABLE {} RENAME TO {}").format(
+                    relation_identifier(swap_partition),
+                    sql.Identifier(partition.split(".", maxsplit=1)[1]),
+                )
+            )
+
+            rename_swap_partition_indexes(
+                connection=connection,
+                partition=partition,
+            )
+
+            print(f"  Swapped in {partition}: {rows_staged:,} rows")
+
+        # Only the default partition is left attached to the staging table.
+        cursor.execute(
+            sql.SQL("INSERT INTO {} ({}) SELECT {} FROM {}").format(
+                relation_identifier(target_table),
+                staged_columns,
+                staged_columns,
+                relation_identifier(staging_table),
+            )
+        )
+
+        if cursor.rowcount:
+            print(
+                f"  Appended {cursor.rowcount:,} staged rows outside the "
+                "replaced months through the parent table"
+            )
+
+        cursor.execute(
+            sql.SQL("DROP TABLE {}").format(
+                relation_identifier(staging_table),
+            )
+        )
+
+    adopt_staging_ledger(
+        connection=connection,
+        ledger_table=ledger_table,
+        staging_table=staging_table,
+        target_table=target_table,
+    )
+
+    connection.commit()
+
+
+def adopt_staging_ledger(
+    connection: psycopg.Connection,
+    ledger_table: str,
+    staging_table: str,
+    target_table: str,
+) -> None:
+    """Move staged ledger entries to the target, superseding earlier loads."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            sql.SQL(
+                """
+                DELETE FROM {} AS existing
+                USING {} AS staged
+                WHERE existing.target_table = %s
+                  AND staged.target_table = %s
+                  AND existing.footer_sha256 = staged.footer_sha256
+                  AND existing.file_size = staged.file_size
+                """
+            ).format(
+                relation_identifier(ledger_table),
+                relation_identifier(ledger_table),
+            ),
+            (target_table, staging_table),
+        )
+
+    rename_ledger_entries(
+        connection=connection,
+        ledger_table=ledger_table,
+        from_table=staging_table,
+        to_table=target_table,
+    )
+
+
+def ensure_upsert_columns(
+    connection: psycopg.Connection,
+    target_table: str,
+) -> None:
+    """Add the hash columns and the indexes that --mode upsert merges on.
+
+    This alters the target itself, so the columns and indexes it adds
+    are printed. Rows loaded before have no hashes and are not matched.
+    """
+    table_name = target_table.split(".", maxsplit=1)[1]
+    existing_columns = set(relation_columns(connection, target_table))
+    added_columns = [
+        column
+        for column in HASH_COLUMNS
+        if column not in existing_columns
+    ]
+    indexes = [
+        (f"{table_name}_row_hash_key", "UNIQUE INDEX", UPSERT_KEY_COLUMNS),
+        (f"{table_name}_trip_key_idx", "INDEX", TRIP_MATCH_COLUMNS),
+    ]
+
+    with connection.cursor() as cursor:
+        if added_columns:
+            print(
+                f"Adding columns {', '.join(added_columns)} to "
+                f"{target_table} for --mode upsert"
+            )
+
+            cursor.execute(
+                sql.SQL("ALTER TABLE {} {}").format(
+                    relation_identifier(target_table),
+                    sql.SQL(", ").join(
+                        sql.SQL("ADD COLUMN {} bigint").format(
+                            sql.Identifier(column),
+                        )
+                        for column in added_columns
+                    ),
+                )
+            )
+
+        cursor.execute(
+            "SELECT indexname FROM pg_indexes "
+            "WHERE schemaname = %s AND tablename = %s",
+            target_table.split(".", maxsplit=1),
+        )
+
+        existing_indexes = {index_name for (index_name,) in cursor.fetchall()}
+
+        for index_name, index_kind, index_columns in indexes:
+            if index_name in existing_indexes:
+                continue
+
+            print(f"Creating index {index_name} on {target_table}")
+
+            cursor.execute(
+                sql.SQL("CREATE {} {} ON {} ({})").format(
+                    sql.SQL(index_kind),
+                    sql.Identifier(index_name),
+                    relation_identifier(target_table),
+                    column_identifier_list(index_columns),
+                )
+            )
+
+        cursor.execute(
+            sql.SQL(
+                "SELECT count(*) FROM {} WHERE row_hash IS NULL"
+            ).format(
+                relation_identifier(target_table),
+            )
+        )
+
+        (unkeyed_rows,) = cursor.fetchone()
+
+    connection.commit()
+
+    if unkeyed_rows:
+        print(
+            f"Warning: {unkeyed_rows:,} rows in {target_table} have no "
+            "row_hash and will not be matched by the upsert. Reload them "
+            "with --mode upsert after a --truncate to deduplicate them."
+        )
+
+
+def column_identifier_list(columns: list[str]) -> sql.Composed:
+    return sql.SQL(", ").join(
+        sql.Identifier(column)
+        for column in columns
+    )
+
+
+def column_match(
+    left: str,
+    right: str,
+    columns: list[str],
+) -> sql.Composed:
+    """left.column = right.column for every column, joined with AND."""
+    return sql.SQL(" AND ").join(
+        sql.SQL("{}.{} = {}.{}").format(
+            sql.Identifier(left),
+            sql.Identifier(column),
+            sql.Identifier(right),
+            sql.Identifier(column),
+        )
+        for column in columns
+    )
+
+
+@dataclass(frozen=True)
+class UpsertCounts:
+    staged: int
+    duplicates: int
+    inserted: int
+    updated: int
+    unchanged: int
+    shared_trip_key: int
+
+
+def merge_staging_table(
+    connection: psycopg.Connection,
+    target_table: str,
+    staging_table: str,
+    ledger_table: str,
+) -> UpsertCounts:
+    """Merge the staged rows into target_table on row_hash in one transaction.
+
+    Only staged rows with the same row_hash, which are identical in every
+    loaded column, are collapsed. Rows whose row_hash the target holds
+    are left alone, so re-ingesting an unchanged month writes nothing.
+    A new row replaces a target row that the staged files no longer hold
+    when each is the only such row of their trip_key: that is a revised
+    trip. Every other new row is inserted, including trips that share a
+    trip_key with rows already in the target; those are counted in
+    shared_trip_key so they can be reviewed.
+
+    The staging table is kept for --reconcile; the caller drops it.
+    """
+    columns = relation_columns(connection, staging_table)
+    updated_columns = [
+        column
+        for column in columns
+        if column not in TRIP_MATCH_COLUMNS
+    ]
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            sql.SQL("SELECT count(*) FROM {}").format(
+                relation_identifier(staging_table),
+            )
+        )
+
+        (staged_rows,) = cursor.fetchone()
+
+        cursor.execute(
+            sql.SQL(
+                """
+                WITH staged AS (
+                    SELECT DISTINCT ON ({key}) {columns}
+                    FROM {staging}
+                ),
+                new_rows AS (
+                    SELECT {columns}
+                    FROM staged
+                    WHERE NOT EXISTS (
+                        SELECT FROM {target} AS existing
+                        WHERE {existing_matches_staged}
+                    )
+                ),
+                stale AS (
+                    SELECT {trip}, existing.row_hash
+                    FROM {target} AS existing
+                    WHERE ({trip}) IN (SELECT {trip} FROM new_rows)
+                    AND NOT EXISTS (
+                        SELECT FROM staged
+                        WHERE {existing_matches_staged}
+                    )
+                ),
+                revisions AS (
+                    SELECT new_rows.*, stale.row_hash AS stale_row_hash
+                    FROM new_rows
+                    JOIN stale USING ({trip})
+                    WHERE ({trip}) IN (
+                        SELECT {trip} FROM new_rows
+                        GROUP BY {trip}
+                        HAVING count(*) = 1
+                    )
+                    AND ({trip}) IN (
+                        SELECT {trip} FROM stale
+                        GROUP BY {trip}
+                        HAVING count(*) = 1
+                    )
+                ),
+                updated AS (
+                    UPDATE {target} AS existing
+                    SET {assignments}
+                    FROM revisions
+                    WHERE existing.tpep_pickup_datetime
+                        = revisions.tpep_pickup_datetime
+                    AND existing.row_hash = revisions.stale_row_hash
+                    RETURNING 1
+                ),
+                inserted AS (
+                    INSERT INTO {target} ({columns})
+                    SELECT {columns} FROM new_rows
+                    WHERE NOT EXISTS (
+                        SELECT FROM revisions
+                        WHERE {revision_matches_new}
+                    )
+                    RETURNING {trip}
+                )
+                SELECT
+                    (SELECT count(*) FROM staged),
+                    (SELECT count(*) FROM updated),
+                    (SELECT count(*) FROM inserted),
+                    (
+                        SELECT count(*)
+                        FROM inserted
+                        WHERE ({trip}) IN (SELECT {trip} FROM {target})
+                    )
+                """
+            ).format(
+                key=column_identifier_list(UPSERT_KEY_COLUMNS),
+                trip=column_identifier_list(TRIP_MATCH_COLUMNS),
+                columns=target_column_list(columns),
+                staging=relation_identifier(staging_table),
+                target=relation_identifier(target_table),
+                existing_matches_staged=column_match(
+                    "existing",
+                    "staged",
+                    UPSERT_KEY_COLUMNS,
+                ),
+                revision_matches_new=column_match(
+                    "revisions",
+                    "new_rows",
+                    UPSERT_KEY_COLUMNS,
+                ),
+                assignments=sql.SQL(", ").join(
+                    sql.SQL("{} = revisions.{}").format(
+                        sql.Identifier(column),
+                        sql.Identifier(column),
+                    )
+                    for column in updated_columns
+                ),
+            )
+        )
+
+        # Every CTE reads the pre-merge snapshot, so the last count is
+        # of inserted rows whose trip_key the target already held.
+        (
+            distinct_rows,
+            updated_rows,
+            inserted_rows,
+            shared_trip_key_rows,
+        ) = cursor.fetchone()
+
+    adopt_staging_ledger(
+        connection=connection,
+        ledger_table=ledger_table,
+        staging_table=staging_table,
+        target_table=target_table,
+    )
+
+    connection.commit()
+
+    return UpsertCounts(
+        staged=staged_rows,
+        duplicates=staged_rows - distinct_rows,
+        inserted=inserted_rows,
+        updated=updated_rows,
+        unchanged=distinct_rows - inserted_rows - updated_rows,
+        shared_trip_key=shared_trip_key_rows,
+    )
+
+
+def unchanged_files(
+    connection: psycopg.Connection,
+    files: list[Path],
+    target_table: str,
+    ledger_table: str,
+) -> list[Path]:
+    """Return the files whose every row group is already in the ledger."""
+    loaded_files: list[Path] = []
+
+    for file_path in files:
+        loaded_row_groups = fetch_loaded_row_groups(
+            connection=connection,
+            ledger_table=ledger_table,
+            target_table=target_table,
+            fingerprint=file_fingerprint(file_path),
+        )
+
+        row_group_count = pq.ParquetFile(file_path).metadata.num_row_groups
+
+        if len(loaded_row_groups) == row_group_count:
+            loaded_files.append(file_path)
+
+    return loaded_files
+
+
+def fetch_target_daily_totals(
+    connection: psycopg.Connection,
+    target_table: str,
+    pickup_days: list[date] | None,
+    held_by: str | None = None,
+) -> DailyTotals:
+    """Per-day totals of target_table over the given days, in one query.
+
+    The query covers the span from the first to the last of pickup_days;
+    None covers every day. With held_by, only rows whose pickup and
+    row_hash held_by also holds are counted: the staged rows an upsert
+    merged into held_by.
+    """
+    conditions: list[sql.Composable] = []
+    parameters: tuple[date, ...] = ()
+
+    if pickup_days is not None:
+        conditions.append(
+            sql.SQL("{pickup} >= %s AND {pickup} < %s").format(
+                pickup=sql.Identifier(PARTITION_COLUMN),
+            )
+        )
+        parameters = (min(pickup_days), max(pickup_days) + timedelta(days=1))
+
+    if held_by is not None:
+        conditions.append(
+            sql.SQL(
+                "EXISTS (SELECT FROM {} AS existing WHERE {})"
+            ).format(
+                relation_identifier(held_by),
+                column_match("existing", "staged", UPSERT_KEY_COLUMNS),
+            )
+        )
+
+    day_filter = (
+        sql.SQL("WHERE ") + sql.SQL(" AND ").join(conditions)
+        if conditions
+        else sql.SQL("")
+    )
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            sql.SQL(
+                """
+                SELECT
+                    {pickup}::date,
+                    count(*),
+                    {sums}
+                FROM {target} AS staged
+                {day_filter}
+                GROUP BY 1
+                """
+            ).format(
+                pickup=sql.Identifier(PARTITION_COLUMN),
+                sums=sql.SQL(", ").join(
+                    sql.SQL("coalesce(sum({}), 0)::float8").format(
+                        sql.Identifier(column),
+                    )
+                    for column in RECONCILE_SUM_COLUMNS
+                ),
+                target=relation_identifier(target_table),
+                day_filter=day_filter,
+            ),
+            parameters,
+        )
+
+        rows = cursor.fetchall()
+
+    connection.commit()
+
+    return {
+        pickup_day: DayTotals(
+            rows=row_count,
+            total_amount=total_amount,
+            trip_distance=trip_distance,
+        )
+        for pickup_day, row_count, total_amount, trip_distance in rows
+    }
+
+
+def totals_match(source: DayTotals, target: DayTotals) -> bool:
+    return source.rows == target.rows and all(
+        math.isclose(
+            getattr(source, column),
+            getattr(target, column),
+            rel_tol=1e-9,
+            abs_tol=RECONCILE_ABSOLUTE_TOLERANCE,
+        )
+        for column in RECONCILE_SUM_COLUMNS
+    )
+
+
+def reconcile_daily_totals(
+    connection: psycopg.Connection,
+    target_table: str,
+    daily_totals: DailyTotals,
+    baseline_totals: DailyTotals,
+    merged_table: str | None = None,
+) -> list[date]:
+    """Compare the streamed per-day totals with the target; return bad days.
+
+    The target side is what each day gained over baseline_totals, taken
+    before the load, so rows of the same day loaded by other files or
+    earlier runs do not count against it. After an upsert, merged_table
+    is the staging table and the target side is its rows that the target
+    now holds, so a staged row the merge dropped shows up as a mismatch.
+    """
+    pickup_days = sorted(daily_totals)
+
+    print(f"\nReconciling {len(pickup_days):,} pickup days with {target_table}")
+
+    if not pickup_days:
+        return []
+
+    if merged_table is None:
+        target_totals = daily_totals_gained(
+            fetch_target_daily_totals(
                 connection=connection,
+                target_table=target_table,
+                pickup_days=pickup_days,
+            ),
+            baseline_totals,
+        )
+    else:
+        target_totals = fetch_target_daily_totals(
+            connection=connection,
+            target_table=merged_table,
+            pickup_days=pickup_days,
+            held_by=target_table,
+        )
+
+    mismatched_days = [
+        pickup_day
+        for pickup_day in pickup_days
+        if not totals_match(
+            daily_totals[pickup_day],
+            target_totals.get(pickup_day, DayTotals()),
+        )
+    ]
+
+    for pickup_day in mismatched_days:
+        source = daily_totals[pickup_day]
+        target = target_totals.get(pickup_day, DayTotals())
+
+        print(
+            f"  {pickup_day}: "
+            f"rows {source.rows:,} vs {target.rows:,}, "
+            f"total_amount {source.total_amount:,.2f} vs "
+            f"{target.total_amount:,.2f}, "
+            f"trip_distance {source.trip_distance:,.2f} vs "
+            f"{target.trip_distance:,.2f}"
+        )
+
+    print(
+        f"  {len(pickup_days) - len(mismatched_days):,} days match, "
+        f"{len(mismatched_days):,} differ (source vs loaded)"
+    )
+
+    return mismatched_days
+
+
+def load_parquet_file(
+    connection: psycopg.Connection,
+    file_path: Path,
+    target_table: str,
+    load_options: LoadOptions,
+    daily_totals: DailyTotals | None = None,
+    quarantine_sink: QuarantineSink | None = None,
+    reload_row_groups: set[int] | None = None,
+) -> int:
+    parquet_file = pq.ParquetFile(file_path)
+
+    cast_plan = compile_cast_plan(
+        parquet_file=parquet_file,
+        file_path=file_path,
+        column_specs=load_options.column_specs,
+    )
+
+    copy_target = prepare_copy(
+        connection=connection,
+        target_table=target_table,
+        load_options=load_options,
+        cast_plan=cast_plan,
+    )
+
+    fingerprint = file_fingerprint(file_path)
+
+    loaded_row_groups = fetch_loaded_row_groups(
+        connection=connection,
+        ledger_table=load_options.ledger_table,
+        target_table=target_table,
+        fingerprint=fingerprint,
+    )
+
+    pending_row_groups = [
+        row_group
+        for row_group in range(parquet_file.metadata.num_row_groups)
+        if row_group not in loaded_row_groups
+    ]
+
+    print(
+        f"\nLoading {file_path.name} "
+        f"({parquet_file.metadata.num_rows:,} rows, "
+        f"{load_options.copy_format} COPY)"
+    )
+
+    if loaded_row_groups:
+        print(
+            f"  Skipping {len(loaded_row_groups):,} of "
+            f"{parquet_file.metadata.num_row_groups:,} row groups "
+            f"already recorded in {load_options.ledger_table}"
+        )
+
+    record_load_event(
+        load_options.telemetry_path,
+        "file_started",
+        file=file_path.name,
+        target_table=target_table,
+        row_groups_skipped=len(loaded_row_groups),
+    )
+
+    file_started_at = perf_counter()
+    stage_times = new_stage_times()
+    progress = FileProgress(file_name=file_path.name)
+    batch_sizer = new_batch_sizer(load_options)
+    rows_loaded = 0
+
+    for row_group in pending_row_groups:
+        quarantined: list[pa.Table] | None = (
+            [] if quarantine_sink is not None else None
+        )
+
+        rows_loaded += load_row_group(
+            connection=connection,
+            parquet_file=parquet_file,
+            file_path=file_path,
+            fingerprint=fingerprint,
+            row_group=row_group,
+            target_table=target_table,
+            copy_target=copy_target,
+            load_options=load_options,
+            report_batches=True,
+            stage_times=stage_times,
+            progress=progress,
+            batch_sizer=batch_sizer,
+            daily_totals=daily_totals,
+            quarantined=quarantined,
+            reload=row_group in (reload_row_groups or set()),
+        )
+
+        if quarantine_sink is not None and quarantined is not None:
+            write_quarantined_rows(
+                quarantine_sink=quarantine_sink,
+                file_name=file_path.name,
+                row_group=row_group,
+                quarantined=quarantined,
+            )
+
+    elapsed_seconds = perf_counter() - file_started_at
+    rows_quarantined = (
+        quarantine_sink.rows_by_file.get(file_path.name, 0)
+        if quarantine_sink is not None
+        else 0
+    )
+
+    record_load_event(
+        load_options.telemetry_path,
+        "file_completed",
+        file=file_path.name,
+        target_table=target_table,
+        rows_loaded=rows_loaded,
+        rows_quarantined=rows_quarantined,
+        elapsed_seconds=round(elapsed_seconds, 3),
+    )
+
+    print(
+        f"Completed {file_path.name}: "
+        f"{rows_loaded:,} rows in "
+        f"{elapsed_seconds:,.2f} seconds "
+        f"({rows_per_second(rows_loaded, elapsed_seconds):,.0f} rows/s)"
+    )
+
+    if rows_quarantined:
+        print(f"  Quarantined {rows_quarantined:,} rows")
+
+    print_stage_times(stage_times)
+
+    return rows_loaded
+
+
+@dataclass(frozen=True)
+class LoadShard:
+    file_path: Path
+    fingerprint: FileFingerprint
+    row_group: int
+    rows: int
+    reload: bool = False
+
+
+@dataclass(frozen=True)
+class ShardResult:
+    file_name: str
+    row_group: int
+    rows_loaded: int
+    elapsed_seconds: float
+    stage_times: dict[str, StageTime]
+    daily_totals: DailyTotals | None
+    quarantined: list[pa.Table] | None
+    batches: list[ShardBatch]
+
+
+def plan_shards(
+    connection: psycopg.Connection,
+    files: list[Path],
+    target_table: str,
+    ledger_table: str,
+    column_specs: tuple[ColumnSpec, ...],
+    reloads: dict[Path, set[int]] | None = None,
+) -> list[LoadShard]:
+    """Split every file into one shard per row group not yet in the ledger.
+
+    Row groups in reloads are marked as --replace-month reloads.
+    """
+    shards: list[LoadShard] = []
+
+    for file_path in files:
+        parquet_file = pq.ParquetFile(file_path)
+
+        # Fail on a file that cannot be mapped before any worker starts.
+        cast_plan = compile_cast_plan(
+            parquet_file=parquet_file,
+            file_path=file_path,
+            column_specs=column_specs,
+        )
+
+        fingerprint = file_fingerprint(file_path)
+
+        loaded_row_groups = fetch_loaded_row_groups(
+            connection=connection,
+            ledger_table=ledger_table,
+            target_table=target_table,
+            fingerprint=fingerprint,
+        )
+
+        if loaded_row_groups:
+            print(
+                f"  {file_path.name}: skipping {len(loaded_row_groups):,} "
+                f"row groups already recorded in {ledger_table}"
+            )
+
+        metadata = parquet_file.metadata
+
+        shards.extend(
+            LoadShard(
+                file_path=file_path,
+                fingerprint=fingerprint,
+                row_group=row_group,
+                rows=metadata.row_group(row_group).num_rows,
+                reload=row_group in (reloads or {}).get(file_path, set()),
+            )
+            for row_group in range(metadata.num_row_groups)
+            if row_group not in loaded_row_groups
+        )
+
+    # Start the largest shards first so the pool drains evenly.
+    return sorted(shards, key=lambda shard: shard.rows, reverse=True)
+
+
+def open_worker_connection(
+    postgres_configuration: PostgresConfiguration,
+) -> None:
+    global worker_connection
+
+    worker_connection = connect_to_postgres(postgres_configuration)
+    atexit.register(worker_connection.close)
+
+
+def load_shard(
+    shard: LoadShard,
+    target_table: str,
+    load_options: LoadOptions,
+) -> ShardResult:
+    """Load one row group on this worker's connection and commit it."""
+    connection = worker_connection
+
+    if connection is None:
+        raise RuntimeError("Worker connection has not been opened.")
+
+    shard_started_at = perf_counter()
+    stage_times = new_stage_times()
+    daily_totals: DailyTotals | None = {} if load_options.reconcile else None
+    quarantined: list[pa.Table] | None = (
+        [] if load_options.quarantine_path is not None else None
+    )
+    shard_batches: list[ShardBatch] = []
+
+    parquet_file = pq.ParquetFile(shard.file_path)
+
+    copy_target = prepare_copy(
+        connection=connection,
+        target_table=target_table,
+        load_options=load_options,
+        cast_plan=compile_cast_plan(
+            parquet_file=parquet_file,
+            file_path=shard.file_path,
+            column_specs=load_options.column_specs,
+            report=False,
+        ),
+    )
+
+    rows_loaded = load_row_group(
+        connection=connection,
+        parquet_file=parquet_file,
+        file_path=shard.file_path,
+        fingerprint=shard.fingerprint,
+        row_group=shard.row_group,
+        target_table=target_table,
+        copy_target=copy_target,
+        load_options=load_options,
+        report_batches=False,
+        stage_times=stage_times,
+        progress=FileProgress(file_name=shard.file_path.name),
+        batch_sizer=new_batch_sizer(load_options),
+        daily_totals=daily_totals,
+        quarantined=quarantined,
+        reload=shard.reload,
+        shard_batches=shard_batches,
+    )
+
+    return ShardResult(
+        file_name=shard.file_path.name,
+        row_group=shard.row_group,
+        rows_loaded=rows_loaded,
+        elapsed_seconds=perf_counter() - shard_started_at,
+        stage_times=stage_times,
+        daily_totals=daily_totals,
+        quarantined=quarantined,
+        batches=shard_batches,
+    )
+
+
+def load_with_workers(
+    shards: list[LoadShard],
+    postgres_configuration: PostgresConfiguration,
+    target_table: str,
+    load_options: LoadOptions,
+    workers: int,
+    daily_totals: DailyTotals | None = None,
+    quarantine_sink: QuarantineSink | None = None,
+) -> int:
+
+    print(
+        f"\nLoading {len(shards):,} row-group shards "
+        f"with {workers} workers ({load_options.copy_format} COPY)"
+    )
+
+    total_rows_loaded = 0
+    shards_completed = 0
+    stage_times = new_stage_times()
+    file_progress: dict[str, FileProgress] = {}
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=open_worker_connection,
+        initargs=(postgres_configuration,),
+    ) as executor:
+        futures = [
+            executor.submit(
+                load_shard,
+                shard,
+                target_table,
+                load_options,
+            )
+            for shard in shards
+        ]
+
+        try:
+            for future in as_completed(futures):
+                result = future.result()
+
+                shards_completed += 1
+                total_rows_loaded += result.rows_loaded
+                merge_stage_times(stage_times, result.stage_times)
+
+                if daily_totals is not None and result.daily_totals is not None:
+                    merge_daily_totals(daily_totals, result.daily_totals)
+
+                if quarantine_sink is not None and result.quarantined is not None:
+                    write_quarantined_rows(
+                        quarantine_sink=quarantine_sink,
+                        file_name=result.file_name,
+                        row_group=result.row_group,
+                        quarantined=result.quarantined,
+                    )
+
+                progress = file_progress.setdefault(
+                    result.file_name,
+                    FileProgress(file_name=result.file_name),
+                )
+
+                for shard_batch in result.batches:
+                    progress.batches += 1
+                    progress.rows += shard_batch.batch_timing.rows
+
+                    if load_options.telemetry_path is not None:
+                        record_batch_telemetry(
+                            telemetry_path=load_options.telemetry_path,
+                            progress=progress,
+                            target_table=target_table,
+                            row_group=result.row_group,
+                            batch_timing=shard_batch.batch_timing,
+                            memory_mb=shard_batch.memory_mb,
+                            recorded_at=shard_batch.recorded_at,
+                        )
+
+                print(
+                    f"  Shard {shards_completed:,}/{len(shards):,}: "
+                    f"{result.file_name} row group {result.row_group}, "
+                    f"{result.rows_loaded:,} rows in "
+                    f"{result.elapsed_seconds:,.2f} seconds "
+                    f"({total_rows_loaded:,} total)"
+                )
+        except Exception:
+            for future in futures:
+                future.cancel()
+
+            print(
+                f"Shard failed; {shards_completed:,} shards "
+                f"({total_rows_loaded:,} rows) were already committed."
+            )
+            raise
+
+    print("Stage times summed over all workers:")
+    print_stage_times(stage_times)
+
+    return total_rows_loaded
+
+
+def duckdb_identifier(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def duckdb_relation_name(relation: str) -> str:
+    return ".".join(
+        duckdb_identifier(part)
+        for part in relation.split(".", maxsplit=1)
+    )
+
+
+def duckdb_relation(catalog: str, relation: str) -> str:
+    return f"{duckdb_identifier(catalog)}.{duckdb_relation_name(relation)}"
+
+
+def duckdb_source_types(
+    duckdb_connection: duckdb.DuckDBPyConnection,
+    file_list: list[str],
+) -> dict[str, tuple[str, str]]:
+    """Column names and types of read_parquet(union_by_name) over the files."""
+    return {
+        column_name.lower(): (column_name, column_type)
+        for column_name, column_type, *_ in duckdb_connection.execute(
+            "DESCRIBE SELECT * FROM read_parquet($files, union_by_name = true)",
+            {"files": file_list},
+        ).fetchall()
+    }
+
+
+def duckdb_select_list(
+    column_specs: tuple[ColumnSpec, ...],
+    source_types: dict[str, tuple[str, str]],
+) -> str:
+    """Project read_parquet columns onto the target, as apply_cast_plan does.
+
+    source_types maps lower-case source names to their union_by_name name
+    and DuckDB type. NaN becomes NULL, and a fractional float headed for
+    an integer column fails the load instead of being rounded.
+    """
+    expressions: list[str] = []
+
+    for column_spec in column_specs:
+        duckdb_type = DUCKDB_TYPES[column_spec.arrow_type]
+
+        sources = [
+            source_types[source.lower()]
+            for source in column_spec.sources
+            if source.lower() in source_types
+        ]
+
+        source_expressions: list[str] = []
+
+        for source_name, source_type in dict.fromkeys(sources):
+            expression = duckdb_identifier(source_name)
+
+            if source_type in DUCKDB_FLOAT_TYPES:
+                expression = f"NULLIF({expression}, 'NaN'::DOUBLE)"
+
+                if pa.types.is_integer(column_spec.arrow_type):
+                    expression = (
+                        f"CASE WHEN {expression} <> trunc({expression}) "
+                        f"THEN error('{source_name} has a fractional value "
+                        f"for {column_spec.target}') "
+                        f"ELSE {expression} END"
+                    )
+
+            source_expressions.append(expression)
+
+        if not source_expressions:
+            value = "NULL"
+        elif len(source_expressions) == 1:
+            value = source_expressions[0]
+        else:
+            value = f"COALESCE({', '.join(source_expressions)})"
+
+        expressions.append(
+            f"CAST({value} AS {duckdb_type}) "
+            f"AS {duckdb_identifier(column_spec.target)}"
+        )
+
+    return ",\n                ".join(expressions)
+
+
+def load_with_duckdb(
+    shards: list[LoadShard],
+    postgres_configuration: PostgresConfiguration,
+    target_table: str,
+    load_options: LoadOptions,
+    threads: int,
+) -> int:
+    """Load every pending file in one DuckDB transaction on the target.
+
+    The ledger rows of all their row groups are inserted through the
+    same attached connection first, so the load and its ledger entries
+    commit or roll back together, as in the copy engine. Files reloaded
+    by --replace-month send only their rows in the replaced months.
+    """
+    files = sorted({shard.file_path for shard in shards})
+    reload_files = sorted(
+        {shard.file_path.as_posix() for shard in shards if shard.reload}
+    )
+
+    for file_path in files:
+        pending_row_groups = sum(
+            1
+            for shard in shards
+            if shard.file_path == file_path
+        )
+
+        if pending_row_groups != pq.ParquetFile(file_path).metadata.num_row_groups:
+            raise ValueError(
+                f"{file_path.name} is partially recorded in "
+                f"{load_options.ledger_table}; finish it with --engine copy, "
+                "which resumes by row group."
+            )
+
+    print(
+        f"\nLoading {len(files):,} files with DuckDB "
+        f"({threads} threads, postgres extension)"
+    )
+
+    if not files:
+        return 0
+
+    conninfo = psycopg.conninfo.make_conninfo(
+        host=postgres_configuration["host"],
+        port=postgres_configuration["port"],
+        dbname=postgres_configuration["dbname"],
+        user=postgres_configuration["user"],
+        password=postgres_configuration["password"],
+        sslmode=postgres_configuration["sslmode"],
+    )
+
+    file_list = [file_path.as_posix() for file_path in files]
+
+    with duckdb.connect() as duckdb_connection:
+        duckdb_connection.execute(f"SET threads TO {threads}")
+        duckdb_connection.execute("INSTALL postgres")
+        duckdb_connection.execute("LOAD postgres")
+        duckdb_connection.execute(
+            "ATTACH " + "'" + conninfo.replace("'", "''") + "'"
+            + " AS pg (TYPE postgres)"
+        )
+
+        source_types = duckdb_source_types(duckdb_connection, file_list)
+
+        column_list = ", ".join(
+            duckdb_identifier(column)
+            for column in load_columns(load_options)
+        )
+
+        insert_sql = f"""
+            INSERT INTO {duckdb_relation("pg", target_table)} ({column_list})
+            SELECT
+                {duckdb_select_list(load_options.column_specs, source_types)}
+            FROM read_parquet($files, union_by_name = true)
+        """
+        insert_parameters: dict[str, Any] = {"files": file_list}
+
+        if reload_files:
+            pickup = duckdb_identifier(PARTITION_COLUMN)
+            in_months = " OR ".join(
+                f"({pickup} >= TIMESTAMP '{month.isoformat()}' "
+                f"AND {pickup} < TIMESTAMP '{add_months(month, 1).isoformat()}')"
+                for month in load_options.reload_months
+            )
+
+            insert_sql = f"""
+                INSERT INTO {duckdb_relation("pg", target_table)} ({column_list})
+                SELECT {column_list}
+                FROM (
+                    SELECT
+                        {duckdb_select_list(load_options.column_specs, source_types)},
+                        filename AS __source_file
+                    FROM read_parquet(
+                        $files,
+                        union_by_name = true,
+                        filename = true
+                    )
+                )
+                WHERE NOT list_contains($reload_files, __source_file)
+                   OR {in_months}
+            """
+            insert_parameters["reload_files"] = reload_files
+
+        if load_options.pickup_order:
+            insert_sql += f"ORDER BY {duckdb_identifier(PARTITION_COLUMN)}\n"
+
+        duckdb_connection.execute("BEGIN TRANSACTION")
+
+        try:
+            duckdb_connection.executemany(
+                f"""
+                INSERT INTO {duckdb_relation('pg', load_options.ledger_table)} (
+                    target_table,
+                    file_name,
+                    file_size,
+                    file_mtime,
+                    footer_sha256,
+                    row_group,
+                    rows_loaded
+                )
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                [
+                    (
+                        target_table,
+                        shard.file_path.name,
+                        shard.fingerprint.file_size,
+                        shard.fingerprint.file_mtime,
+                        shard.fingerprint.footer_sha256,
+                        shard.row_group,
+                        shard.rows,
+                    )
+                    for shard in shards
+                ],
+            )
+
+            (rows_loaded,) = duckdb_connection.execute(
+                insert_sql,
+                insert_parameters,
+            ).fetchone()
+
+            duckdb_connection.execute("COMMIT")
+        except BaseException:
+            duckdb_connection.execute("ROLLBACK")
+            raise
+
+    return rows_loaded
+
+
+def ensure_warehouse_tables(
+    duckdb_connection: duckdb.DuckDBPyConnection,
+    target_table: str,
+    ledger_table: str,
+    column_specs: tuple[ColumnSpec, ...],
+) -> None:
+    for relation in (
+        target_table,
+        ledger_table,
+        WAREHOUSE_SILVER_TABLE,
+        WAREHOUSE_GOLD_TABLE,
+    ):
+        schema_name, _ = relation.split(".", maxsplit=1)
+        duckdb_connection.execute(
+            f"CREATE SCHEMA IF NOT EXISTS {duckdb_identifier(schema_name)}"
+        )
+
+    column_definitions = ",\n            ".join(
+        f"{duckdb_identifier(column_spec.target)} "
+        f"{DUCKDB_TYPES[column_spec.arrow_type]}"
+        + ("" if column_spec.nullable else " NOT NULL")
+        for column_spec in column_specs
+    )
+
+    duckdb_connection.execute(
+        f"""
+        CREATE TABLE IF NOT EXISTS {duckdb_relation_name(target_table)} (
+            {column_definitions}
+        )
+        """
+    )
+
+    # A warehouse made before an optional column was mapped, such as
+    # cbd_congestion_fee, gets it added.
+    for column_spec in column_specs:
+        if not column_spec.required:
+            duckdb_connection.execute(
+                f"ALTER TABLE {duckdb_relation_name(target_table)} "
+                f"ADD COLUMN IF NOT EXISTS "
+                f"{duckdb_identifier(column_spec.target)} "
+                f"{DUCKDB_TYPES[column_spec.arrow_type]}"
+            )
+
+    duckdb_connection.execute(
+        f"""
+        CREATE TABLE IF NOT EXISTS {duckdb_relation_name(ledger_table)} (
+            target_table VARCHAR NOT NULL,
+            file_name VARCHAR NOT NULL,
+            file_size BIGINT NOT NULL,
+            file_mtime TIMESTAMPTZ NOT NULL,
+            footer_sha256 VARCHAR NOT NULL,
+            row_group INTEGER NOT NULL,
+            rows_loaded BIGINT NOT NULL,
+            loaded_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+            PRIMARY KEY (target_table, footer_sha256, file_size, row_group)
+        )
+        """
+    )
+
+
+@dataclass(frozen=True)
+class LoadTotals:
+    files_loaded: int
+    rows_loaded: int
+    mismatched_days: tuple[date, ...] = ()
+
+
+def load_into_warehouse(
+    warehouse_path: Path,
+    files: list[Path],
+    target_table: str,
+    load_options: LoadOptions,
+    replace: bool,
+    threads: int,
+) -> LoadTotals:
+    """Load files into a DuckDB warehouse and rebuild its silver and gold.
+
+    Each run inserts its files in one transaction ordered by pickup time,
+    so row groups cover narrow time ranges and DuckDB's zone maps skip
+    most of them on time filters. replace (--mode swap or --truncate)
+    rebuilds the table from the given files; otherwise files already in
+    the ledger are skipped.
+    """
+    warehouse_path.parent.mkdir(parents=True, exist_ok=True)
+
+    target = duckdb_relation_name(target_table)
+    ledger = duckdb_relation_name(load_options.ledger_table)
+
+    with duckdb.connect(str(warehouse_path)) as duckdb_connection:
+        duckdb_connection.execute(f"SET threads TO {threads}")
+
+        ensure_warehouse_tables(
+            duckdb_connection=duckdb_connection,
+            target_table=target_table,
+            ledger_table=load_options.ledger_table,
+            column_specs=load_options.column_specs,
+        )
+
+        fingerprints = {
+            file_path: file_fingerprint(file_path)
+            for file_path in files
+        }
+
+        if not replace:
+            loaded_files = {
+                (footer_sha256, file_size)
+                for footer_sha256, file_size in duckdb_connection.execute(
+                    f"""
+                    SELECT DISTINCT footer_sha256, file_size
+                    FROM {ledger}
+                    WHERE target_table = ?
+                    """,
+                    [target_table],
+                ).fetchall()
+            }
+
+            for file_path in files:
+                fingerprint = fingerprints[file_path]
+
+                if (fingerprint.footer_sha256, fingerprint.file_size) in loaded_files:
+                    print(
+                        f"Skipping {file_path.name}, already recorded in "
+                        f"{load_options.ledger_table}"
+                    )
+
+            files = [
+                file_path
+                for file_path in files
+                if (
+                    fingerprints[file_path].footer_sha256,
+                    fingerprints[file_path].file_size,
+                ) not in loaded_files
+            ]
+
+        print(
+            f"\nLoading {len(files):,} files into {warehouse_path} "
+            f"({target_table}, {threads} DuckDB threads)"
+        )
+
+        for file_path in files:
+            # Fail on a file that cannot be mapped before anything is written.
+            compile_cast_plan(
+                parquet_file=pq.ParquetFile(file_path),
                 file_path=file_path,
-                target_table=args.table,
-                batch_size=args.batch_size,
+                column_specs=load_options.column_specs,
+            )
+
+        rows_loaded = 0
+
+        duckdb_connection.execute("BEGIN TRANSACTION")
+
+        try:
+            if replace:
+                duckdb_connection.execute(f"DELETE FROM {target}")
+                duckdb_connection.execute(
+                    f"DELETE FROM {ledger} WHERE target_table = ?",
+                    [target_table],
+                )
+
+            if files:
+                file_list = [file_path.as_posix() for file_path in files]
+
+                source_types = duckdb_source_types(duckdb_connection, file_list)
+
+                column_list = ", ".join(
+                    duckdb_identifier(column)
+                    for column in target_columns(load_options.column_specs)
+                )
+
+                (rows_loaded,) = duckdb_connection.execute(
+                    f"""
+                    INSERT INTO {target} ({column_list})
+                    SELECT
+                        {duckdb_select_list(load_options.column_specs, source_types)}
+                    FROM read_parquet($files, union_by_name = true)
+                    ORDER BY {duckdb_identifier(PARTITION_COLUMN)}
+                    """,
+                    {"files": file_list},
+                ).fetchone()
+
+                duckdb_connection.executemany(
+                    f"""
+                    INSERT INTO {ledger} (
+                        target_table,
+                        file_name,
+                        file_size,
+                        file_mtime,
+                        footer_sha256,
+                        row_group,
+                        rows_loaded
+                    )
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    [
+                        (
+                            target_table,
+                            file_path.name,
+                            fingerprints[file_path].file_size,
+                            fingerprints[file_path].file_mtime,
+                            fingerprints[file_path].footer_sha256,
+                            row_group,
+                            metadata.row_group(row_group).num_rows,
+                        )
+                        for file_path in files
+                        for metadata in [pq.ParquetFile(file_path).metadata]
+                        for row_group in range(metadata.num_row_groups)
+                    ],
+                )
+
+            if files or replace:
+                print(
+                    f"Rebuilding {WAREHOUSE_SILVER_TABLE} and "
+                    f"{WAREHOUSE_GOLD_TABLE}"
+                )
+
+                duckdb_connection.execute(
+                    WAREHOUSE_SILVER_SQL.format(
+                        silver=duckdb_relation_name(WAREHOUSE_SILVER_TABLE),
+                        bronze=target,
+                    )
+                )
+                duckdb_connection.execute(
+                    WAREHOUSE_GOLD_SQL.format(
+                        gold=duckdb_relation_name(WAREHOUSE_GOLD_TABLE),
+                        silver=duckdb_relation_name(WAREHOUSE_SILVER_TABLE),
+                    )
+                )
+
+            duckdb_connection.execute("COMMIT")
+        except BaseException:
+            duckdb_connection.execute("ROLLBACK")
+            raise
+
+        if replace:
+            # DELETE leaves the old row groups behind until a checkpoint.
+            duckdb_connection.execute("CHECKPOINT")
+
+    return LoadTotals(files_loaded=len(files), rows_loaded=rows_loaded)
+
+
+def rows_per_second(rows: int, elapsed_seconds: float) -> float:
+    return rows / elapsed_seconds if elapsed_seconds > 0 else 0.0
+
+
+class PostgresConfiguration(TypedDict):
+    host: str
+    port: int
+    dbname: str
+    user: str
+    password: str
+    sslmode: str
+
+
+def connect_to_postgres(
+    postgres_configuration: PostgresConfiguration,
+) -> psycopg.Connection:
+    return psycopg.connect(
+        host=postgres_configuration["host"],
+        port=postgres_configuration["port"],
+        dbname=postgres_configuration["dbname"],
+        user=postgres_configuration["user"],
+        password=postgres_configuration["password"],
+        sslmode=postgres_configuration["sslmode"],
+    )
+
+
+def columns_in_target(
+    postgres_configuration: PostgresConfiguration,
+    target_table: str,
+    column_specs: tuple[ColumnSpec, ...],
+) -> tuple[ColumnSpec, ...]:
+    """Leave out optional columns an existing target does not have yet.
+
+    A column published later, such as cbd_congestion_fee, can be mapped
+    before every target has it; it loads once the column is added.
+    """
+    with connect_to_postgres(postgres_configuration) as connection:
+        if not relation_exists(connection, target_table):
+            return column_specs
+
+        existing_columns = set(relation_columns(connection, target_table))
+
+    absent_columns = [
+        column_spec.target
+        for column_spec in column_specs
+        if not column_spec.required
+        and column_spec.target not in existing_columns
+    ]
+
+    for column in absent_columns:
+        print(
+            f"  {target_table} has no {column} column; "
+            "it is not loaded until the column is added."
+        )
+
+    return tuple(
+        column_spec
+        for column_spec in column_specs
+        if column_spec.target not in absent_columns
+    )
+
+
+def load_into_postgres(
+    postgres_configuration: PostgresConfiguration,
+    files: list[Path],
+    target_table: str,
+    load_options: LoadOptions,
+    mode: str,
+    engine: str,
+    workers: int,
+    create_partitioned: bool,
+    replace_month: list[date],
+    truncate: bool,
+    daily_totals: DailyTotals | None,
+    quarantine_sink: QuarantineSink | None,
+) -> LoadTotals:
+    """Load files into the PostgreSQL target in the given mode and engine."""
+    total_rows_loaded = 0
+    mismatched_days: list[date] = []
+    load_table = target_table
+
+    with connect_to_postgres(postgres_configuration) as connection:
+        ensure_ledger_table(
+            connection=connection,
+            ledger_table=load_options.ledger_table,
+        )
+
+        if create_partitioned:
+            ensure_partitioned_table(
+                connection=connection,
+                target_table=target_table,
+                column_specs=load_options.column_specs,
+            )
+
+        relation_kind = fetch_relation_kind(connection, target_table)
+        partitioned = relation_kind == "p"
+
+        if mode == "swap" and relation_kind not in ("r", "p"):
+            raise ValueError(
+                f"--mode swap requires {target_table} to be a table."
+            )
+
+        if replace_month and not partitioned:
+            raise ValueError(
+                f"--replace-month requires {target_table} to be partitioned."
+            )
+
+        months_by_file: dict[Path, list[date]] = {}
+        loaded_months: list[date] = []
+        reloads: dict[Path, set[int]] = {}
+
+        if partitioned:
+            months_by_file = plan_file_months(
+                files,
+                load_options.column_specs,
+            )
+            loaded_months = sorted(
+                {
+                    month
+                    for months in months_by_file.values()
+                    for month in months
+                }
+            )
+
+            if mode != "swap":
+                for month in sorted(
+                    set(loaded_months) | set(replace_month)
+                ):
+                    ensure_month_partition(
+                        connection=connection,
+                        target_table=target_table,
+                        month=month,
+                    )
+
+            if replace_month:
+                reloads = replace_months(
+                    connection=connection,
+                    target_table=target_table,
+                    ledger_table=load_options.ledger_table,
+                    months=replace_month,
+                    months_by_file=months_by_file,
+                )
+
+            if mode == "swap":
+                # The swapped months are rebuilt from staging, but rows
+                # outside them are appended: files the target already
+                # holds send only their rows in the swapped months.
+                load_options = replace(
+                    load_options,
+                    reload_months=tuple(loaded_months),
+                )
+                reloads = {
+                    file_path: fetch_loaded_row_groups(
+                        connection=connection,
+                        ledger_table=load_options.ledger_table,
+                        target_table=target_table,
+                        fingerprint=file_fingerprint(file_path),
+                    )
+                    for file_path in files
+                }
+
+        if mode == "upsert":
+            ensure_upsert_columns(
+                connection=connection,
+                target_table=target_table,
+            )
+
+        if mode in ("swap", "upsert"):
+            load_table = sibling_relation(target_table, "staging")
+
+            print(f"Staging table: {load_table}")
+
+        if mode == "swap":
+            create_swap_staging_table(
+                connection=connection,
+                target_table=target_table,
+                staging_table=load_table,
+                ledger_table=load_options.ledger_table,
+                months=loaded_months if partitioned else None,
+            )
+
+        if mode == "upsert":
+            create_staging_table(
+                connection=connection,
+                target_table=target_table,
+                staging_table=load_table,
+                ledger_table=load_options.ledger_table,
+                columns=load_columns(load_options),
+            )
+
+        if truncate:
+            print(
+                f"Truncating {target_table} before loading."
+            )
+
+            schema_name, table_name = target_table.split(
+                ".",
+                maxsplit=1,
+            )
+
+            truncate_sql = sql.SQL(
+                "TRUNCATE TABLE {}.{}"
+            ).format(
+                sql.Identifier(schema_name),
+                sql.Identifier(table_name),
+            )
+
+            with connection.cursor() as cursor:
+                cursor.execute(truncate_sql)
+
+            clear_ledger(
+                connection=connection,
+                ledger_table=load_options.ledger_table,
+                target_table=target_table,
             )
 
             connection.commit()
-            total_rows_loaded += rows_loaded
+
+        # Skip files whose every row group the ledger already holds in
+        # this exact version. The staging ledger of an upsert starts
+        # empty, so it checks what the target has merged.
+        loaded_files = unchanged_files(
+            connection=connection,
+            files=files,
+            target_table=target_table if mode == "upsert" else load_table,
+            ledger_table=load_options.ledger_table,
+        )
+
+        for file_path in loaded_files:
+            print(f"Skipping unchanged {file_path.name}")
+
+        files = [
+            file_path
+            for file_path in files
+            if file_path not in loaded_files
+        ]
+
+        baseline_totals: DailyTotals = {}
+
+        if (
+            daily_totals is not None
+            and files
+            and (mode == "append" or (mode == "swap" and partitioned))
+        ):
+            # Days this run shares with rows already in the target are
+            # compared on what they gain, see reconcile_daily_totals. A
+            # swap rebuilds the whole target, or the months it loads, so
+            # those days start from zero.
+            baseline_totals = {
+                pickup_day: day_totals
+                for pickup_day, day_totals in fetch_target_daily_totals(
+                    connection=connection,
+                    target_table=target_table,
+                    pickup_days=files_pickup_days(
+                        files,
+                        load_options.column_specs,
+                    ),
+                ).items()
+                if mode == "append"
+                or pickup_day.replace(day=1) not in loaded_months
+            }
+
+        if engine == "duckdb":
+            total_rows_loaded = load_with_duckdb(
+                shards=plan_shards(
+                    connection=connection,
+                    files=files,
+                    target_table=load_table,
+                    ledger_table=load_options.ledger_table,
+                    column_specs=load_options.column_specs,
+                    reloads=reloads,
+                ),
+                postgres_configuration=postgres_configuration,
+                target_table=load_table,
+                load_options=load_options,
+                threads=workers,
+            )
+        elif workers > 1:
+            shards = plan_shards(
+                connection=connection,
+                files=files,
+                target_table=load_table,
+                ledger_table=load_options.ledger_table,
+                column_specs=load_options.column_specs,
+                reloads=reloads,
+            )
+
+            total_rows_loaded = load_with_workers(
+                shards=shards,
+                postgres_configuration=postgres_configuration,
+                target_table=load_table,
+                load_options=load_options,
+                workers=workers,
+                daily_totals=daily_totals,
+                quarantine_sink=quarantine_sink,
+            )
+        else:
+            for file_path in files:
+                rows_loaded = load_parquet_file(
+                    connection=connection,
+                    file_path=file_path,
+                    target_table=load_table,
+                    load_options=load_options,
+                    daily_totals=daily_totals,
+                    quarantine_sink=quarantine_sink,
+                    reload_row_groups=reloads.get(file_path),
+                )
+
+                connection.commit()
+                total_rows_loaded += rows_loaded
+
+        if mode == "swap":
+            print(f"\nSwapping {load_table} into {target_table}")
+
+            if partitioned:
+                swap_in_month_partitions(
+                    connection=connection,
+                    target_table=target_table,
+                    staging_table=load_table,
+                    ledger_table=load_options.ledger_table,
+                    months=loaded_months,
+                )
+            else:
+                swap_in_staging_table(
+                    connection=connection,
+                    target_table=target_table,
+                    staging_table=load_table,
+                    ledger_table=load_options.ledger_table,
+                )
+
+        if mode == "upsert":
+            print(f"\nMerging {load_table} into {target_table}")
+
+            upsert_counts = merge_staging_table(
+                connection=connection,
+                target_table=target_table,
+                staging_table=load_table,
+                ledger_table=load_options.ledger_table,
+            )
+
+            print(f"  Staged rows: {upsert_counts.staged:,}")
+            print(f"  Identical rows collapsed: {upsert_counts.duplicates:,}")
+            print(f"  Inserted: {upsert_counts.inserted:,}")
+            print(f"  Updated: {upsert_counts.updated:,}")
+            print(f"  Unchanged: {upsert_counts.unchanged:,}")
+
+            if upsert_counts.shared_trip_key:
+                print(
+                    f"  Inserted alongside a row with the same trip key: "
+                    f"{upsert_counts.shared_trip_key:,} (review these; "
+                    "they may be revisions that could not be paired)"
+                )
+
+        if daily_totals is not None:
+            mismatched_days = reconcile_daily_totals(
+                connection=connection,
+                target_table=target_table,
+                daily_totals=daily_totals,
+                baseline_totals=baseline_totals,
+                merged_table=load_table if mode == "upsert" else None,
+            )
+
+            record_load_event(
+                load_options.telemetry_path,
+                "reconcile_completed",
+                target_table=target_table,
+                days_compared=len(daily_totals),
+                days_mismatched=[str(day) for day in mismatched_days],
+            )
+
+        if mode == "upsert":
+            drop_relation(connection, load_table)
+
+    return LoadTotals(
+        files_loaded=len(files),
+        rows_loaded=total_rows_loaded,
+        mismatched_days=tuple(mismatched_days),
+    )
+
+
+def main() -> None:
+    args = parse_arguments()
+
+    data_in = args.data_in.expanduser().resolve()
+    env_file = args.env_file.expanduser().resolve()
+    extension = normalize_extension(args.extension)
+
+    files = discover_files(
+        data_in=data_in,
+        extension=extension,
+    )
+
+    warehouse_path = None
+
+    if args.target.startswith(DUCKDB_TARGET_PREFIX):
+        warehouse_path = (
+            Path(args.target.removeprefix(DUCKDB_TARGET_PREFIX))
+            .expanduser()
+            .resolve()
+        )
+    else:
+        postgres_configuration = load_postgres_configuration(
+            env_file=env_file,
+        )
+
+    print(f"Input directory: {data_in}")
+    print(f"Files discovered: {len(files)}")
+
+    # COPY format and pipeline depth only apply to the copy engine.
+    copy_engine = warehouse_path is None and args.engine == "copy"
+
+    if warehouse_path is not None:
+        print(f"DuckDB warehouse: {warehouse_path}")
+
+    print(f"Target relation: {args.table}")
+    print(f"Load mode: {args.mode}")
+    auto_batch_size = None
+
+    if args.batch_size == "auto":
+        auto_batch_size = AutoBatchSize(
+            min_rows=AUTO_BATCH_MIN_ROWS,
+            max_rows=AUTO_BATCH_MAX_ROWS,
+            target_seconds=args.target_batch_seconds,
+            memory_limit_mb=args.max_memory_mb,
+        )
+
+        print(
+            f"Batch size: auto ({AUTO_BATCH_MIN_ROWS:,}-"
+            f"{AUTO_BATCH_MAX_ROWS:,} rows, "
+            f"{args.target_batch_seconds:,.2f} s target, "
+            f"{args.max_memory_mb:,.0f} MB RSS ceiling)"
+        )
+    else:
+        print(f"Batch size: {args.batch_size:,}")
+
+    if warehouse_path is None:
+        print(f"Engine: {args.engine}")
+
+    if copy_engine:
+        print(f"COPY format: {args.copy_format}")
+
+    if args.workers < 1:
+        raise ValueError("--workers must be at least 1.")
+
+    if args.target_batch_seconds <= 0 or args.max_memory_mb <= 0:
+        raise ValueError(
+            "--target-batch-seconds and --max-memory-mb must be positive."
+        )
+
+    if args.mode == "swap" and (args.truncate or args.replace_month):
+        raise ValueError(
+            "--truncate and --replace-month cannot be combined with "
+            "--mode swap, which already replaces what it loads."
+        )
+
+    if args.mode == "upsert" and args.replace_month:
+        raise ValueError(
+            "--replace-month cannot be combined with --mode upsert, "
+            "which merges revised months in place."
+        )
+
+    if warehouse_path is not None and (
+        args.mode == "upsert"
+        or args.engine == "duckdb"
+        or args.partitioned
+        or args.replace_month
+        or args.quarantine
+        or args.reconcile
+    ):
+        raise ValueError(
+            "--target duckdb: supports --mode append or swap and --truncate; "
+            "--mode upsert, --engine duckdb, --partitioned, --replace-month, "
+            "--quarantine and --reconcile apply to PostgreSQL targets."
+        )
+
+    if args.engine == "duckdb" and (
+        args.mode == "upsert" or args.quarantine or args.reconcile
+    ):
+        raise ValueError(
+            "--engine duckdb cannot be combined with --mode upsert, "
+            "--quarantine or --reconcile, which need the Arrow batches "
+            "of the copy engine."
+        )
+
+    if args.pipeline_depth < 0 or args.encoder_threads < 1:
+        raise ValueError(
+            "--pipeline-depth must be at least 0 and "
+            "--encoder-threads at least 1."
+        )
+
+    column_map_path = args.column_map.expanduser().resolve()
+    column_specs = load_column_specs(column_map_path)
+
+    print(f"Column map: {column_map_path} ({len(column_specs)} columns)")
+
+    if warehouse_path is None:
+        column_specs = columns_in_target(
+            postgres_configuration=postgres_configuration,
+            target_table=args.table,
+            column_specs=column_specs,
+        )
+
+    loaded_columns = target_columns(column_specs)
+
+    if PARTITION_COLUMN not in loaded_columns:
+        raise ValueError(
+            f"The column map must define {PARTITION_COLUMN}, which orders "
+            "and partitions the target."
+        )
+
+    if args.reconcile and set(RECONCILE_SUM_COLUMNS) - set(loaded_columns):
+        raise ValueError(
+            "--reconcile needs these columns in the column map: "
+            f"{sorted(set(RECONCILE_SUM_COLUMNS) - set(loaded_columns))}"
+        )
+
+    if args.mode == "upsert" and set(TRIP_KEY_COLUMNS) - set(loaded_columns):
+        raise ValueError(
+            "--mode upsert needs the trip key columns in the column map: "
+            f"{sorted(set(TRIP_KEY_COLUMNS) - set(loaded_columns))}"
+        )
+
+    load_options = LoadOptions(
+        batch_size=(
+            AUTO_BATCH_INITIAL_ROWS
+            if auto_batch_size is not None
+            else args.batch_size
+        ),
+        auto_batch_size=auto_batch_size,
+        copy_format=args.copy_format,
+        pipeline_depth=args.pipeline_depth,
+        encoder_threads=args.encoder_threads,
+        ledger_table=args.ledger_table,
+        content_hashes=args.mode == "upsert",
+        pickup_order=args.mode == "swap",
+        telemetry_path=(
+            args.telemetry.expanduser().resolve()
+            if args.telemetry is not None
+            else None
+        ),
+        column_specs=column_specs,
+        reconcile=args.reconcile,
+        quarantine_path=(
+            args.quarantine.expanduser().resolve()
+            if args.quarantine is not None
+            else None
+        ),
+        reload_months=tuple(args.replace_month),
+    )
+
+    if load_options.telemetry_path is not None:
+        load_options.telemetry_path.parent.mkdir(parents=True, exist_ok=True)
+
+    record_load_event(
+        load_options.telemetry_path,
+        "run_started",
+        source_directory=str(data_in),
+        target_table=args.table,
+        load_mode=args.mode,
+        copy_format=args.copy_format,
+        files_discovered=len(files),
+        batch_size=args.batch_size,
+        workers=args.workers,
+        pipeline_depth=args.pipeline_depth,
+    )
+
+    print(f"Workers: {args.workers}")
+
+    if copy_engine:
+        print(f"Pipeline depth: {args.pipeline_depth}")
+
+    quarantine_sink = None
+
+    if load_options.quarantine_path is not None:
+        print(f"Quarantine directory: {load_options.quarantine_path}")
+
+        quarantine_sink = open_quarantine_sink(
+            quarantine_path=load_options.quarantine_path,
+            column_specs=load_options.column_specs,
+        )
+
+    daily_totals: DailyTotals | None = {} if args.reconcile else None
+    load_started_at = perf_counter()
+
+    if warehouse_path is not None:
+        load_totals = load_into_warehouse(
+            warehouse_path=warehouse_path,
+            files=files,
+            target_table=args.table,
+            load_options=load_options,
+            replace=args.mode == "swap" or args.truncate,
+            threads=args.workers,
+        )
+    else:
+        load_totals = load_into_postgres(
+            postgres_configuration=postgres_configuration,
+            files=files,
+            target_table=args.table,
+            load_options=load_options,
+            mode=args.mode,
+            engine=args.engine,
+            workers=args.workers,
+            create_partitioned=args.partitioned,
+            replace_month=args.replace_month,
+            truncate=args.truncate,
+            daily_totals=daily_totals,
+            quarantine_sink=quarantine_sink,
+        )
 
     elapsed_seconds = perf_counter() - load_started_at
+    if warehouse_path is not None:
+        load_method = "DuckDB warehouse"
+    elif args.engine == "duckdb":
+        load_method = "DuckDB engine"
+    else:
+        load_method = f"{args.copy_format} COPY"
+    rows_quarantined = 0
+
+    if quarantine_sink is not None:
+        close_quarantine_sink(quarantine_sink)
+        rows_quarantined = sum(quarantine_sink.rows_by_file.values())
+
+    record_load_event(
+        load_options.telemetry_path,
+        "run_completed",
+        target_table=args.table,
+        rows_loaded=load_totals.rows_loaded,
+        rows_quarantined=rows_quarantined,
+        elapsed_seconds=round(elapsed_seconds, 3),
+    )
 
     print("\nLoad completed.")
-    print(f"Files loaded: {len(files)}")
-    print(f"Rows loaded: {total_rows_loaded:,}")
+    print(f"Files loaded: {load_totals.files_loaded}")
+    print(f"Rows loaded: {load_totals.rows_loaded:,}")
+
+    if quarantine_sink is not None:
+        print(
+            f"Rows quarantined: {rows_quarantined:,} "
+            f"({quarantine_sink.directory})"
+        )
+
+        for file_name, file_rows in sorted(
+            quarantine_sink.rows_by_file.items()
+        ):
+            print(
+                f"  {file_name}: {file_rows:,} "
+                f"({quarantine_file_path(quarantine_sink, file_name).name})"
+            )
     print(
         f"Elapsed time: {elapsed_seconds:,.2f} seconds"
     )
+    print(
+        f"Throughput: "
+        f"{rows_per_second(load_totals.rows_loaded, elapsed_seconds):,.0f} "
+        f"rows/s ({load_method})"
+    )
+
+    if load_totals.mismatched_days:
+        raise SystemExit(
+            "Reconciliation failed: "
+            f"{len(load_totals.mismatched_days):,} pickup days differ "
+            f"between the source files and {args.table}."
+        )
 
 
 if __name__ == "__main__":
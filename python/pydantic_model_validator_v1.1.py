@@ -1,21 +1,134 @@
 from __future__ import annotations
 import argparse
+import csv
+from concurrent.futures import Future, ProcessPoolExecutor, wait
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
-from dataclasses import dataclass
+from dataclasses import asdict, dataclass, field
+import hashlib
 import json
 from datetime import datetime, timezone
-from typing import Any
-from pydantic import BaseModel
+from time import monotonic, perf_counter, sleep
+from types import NoneType, UnionType
+from typing import Any, Callable, Iterable, Iterator, Union, get_args, get_origin
+from urllib.parse import parse_qs, urlparse
+from pydantic import BaseModel, ValidationError
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
 import pyarrow.parquet as pq
 import os
 import psutil
 import gc
+import multiprocessing
+import queue
+import re
+import shutil
+import struct
+import threading
 import tomllib
 
+from batch_sizing import (
+    AUTO_BATCH_INITIAL_ROWS,
+    AUTO_BATCH_MAX_ROWS,
+    AUTO_BATCH_MIN_ROWS,
+    AutoBatchSize,
+    BatchSizer,
+    adjust_batch_size,
+)
+
 
 SCRIPT_DIR = Path(__file__).resolve().parent
 CONFIG_PATH = SCRIPT_DIR / "validator" / "config.toml"
 
+# columnar: Arrow checks derived from TaxiTrip, with Pydantic only for the
+# rows they cannot clear; pydantic: model_validate on every row.
+VALIDATION_ENGINES = ["columnar", "pydantic"]
+
+# Pydantic accepts a float for an int field only below the int64 limit.
+INT64_LIMIT = 2.0**63
+
+# How often a stop request is checked for while waiting on workers, a
+# pause or a free worker slot.
+STOP_POLL_SECONDS = 0.5
+
+# --control-port serves here only; the endpoint has no authentication.
+CONTROL_HOST = "127.0.0.1"
+
+# One row per failed field of an invalid row (source "model") or per rule
+# a row violates (source "rule", error_type the rule name), written per
+# row group under the errors directory:
+# <errors>/<file name>/row_group_<n>.parquet.
+ERROR_SCHEMA = pa.schema(
+    [
+        ("file", pa.string()),
+        ("row_group", pa.int32()),
+        ("row_offset", pa.int64()),
+        ("source", pa.string()),
+        ("field", pa.string()),
+        ("error_type", pa.string()),
+        ("message", pa.string()),
+        ("value", pa.string()),
+    ]
+)
+
+# A batch's errors, before write_row_group_errors adds their file and
+# row group.
+ROW_ERROR_SCHEMA = pa.schema(
+    [
+        error_field
+        for error_field in ERROR_SCHEMA
+        if error_field.name not in ("file", "row_group")
+    ]
+)
+
+# Offending values kept per field and error type in the file summary.
+SUMMARY_TOP_VALUES = 5
+
+# DuckDB writes a whole double as "1.0" and drops a timestamp's zero
+# fraction; Arrow's string cast does neither.
+ARROW_WHOLE_NUMBER_TEXT = re.compile(r"-?\d+")
+ARROW_TIMESTAMP_FRACTION = re.compile(r"\.?0+$")
+
+# The year and month a TLC file covers, e.g. yellow_tripdata_2024-01.parquet.
+FILE_MONTH_PATTERN = re.compile(r"(\d{4})-(\d{2})")
+
+# A Parquet file ends with a 4-byte little-endian footer length and "PAR1".
+PARQUET_TAIL_BYTES = 8
+
+# PSV exports from parquet_to_psv.py. A PSV file has no row groups; it is
+# read as row group 0, in blocks of PSV_BLOCK_BYTES parsed on Arrow's
+# thread pool, so reading stays bounded by the block and batch sizes. Its
+# row errors are stored, and it is checkpointed, once the file is done.
+PARQUET_EXTENSION = ".parquet"
+PSV_EXTENSION = ".psv"
+PSV_DELIMITER = "|"
+PSV_NULL = ""  # parquet_to_psv.py writes NULL '' and quotes empty strings
+PSV_BLOCK_BYTES = 16 * 1024 * 1024
+
+# A PSV file has no footer; its tail fingerprints the content instead.
+PSV_TAIL_BYTES = 64 * 1024
+
+# Part of every cached result's key along with the TaxiTrip schema and
+# the [[rules]] config; bump it when validation changes in a way neither
+# shows.
+RULES_VERSION = 1
+
+# The log writer commits queued records once this many are waiting or
+# the oldest has waited this long; a full queue blocks the validator.
+LOG_COMMIT_RECORDS = 256
+LOG_COMMIT_SECONDS = 0.2
+LOG_QUEUE_RECORDS = 10_000
+
+# commit: fsync every group commit; close: fsync each log once at exit;
+# none: leave flushing to the operating system.
+FSYNC_POLICIES = ["commit", "close", "none"]
+
+# Forced garbage collection runs only when RSS has grown this much since
+# the last collection; reference counting frees batches without it.
+GC_GROWTH_MB = 256.0
+
 def load_config(config_path: Path) -> dict[str, Any]:
     """Load validator configuration from a TOML file."""
     if not config_path.exists():
@@ -31,8 +144,10 @@ class OutputPaths:
     execution_log: Path # what the script did, for people reading the log
     event_log: Path # structured file-state events used for restart and resume
     progress: Path
-    errors: Path # detailed row-validation failures
+    errors: Path # directory of Parquet row-validation failures
     summary: Path # aggregate validation results per file
+    cache: Path # validation results by file fingerprint, for skipping
+    profile_state: Path # --profile progress at the last checkpoint, per file
 
 
 class TaxiTrip(BaseModel):
@@ -58,6 +173,567 @@ class TaxiTrip(BaseModel):
     cbd_congestion_fee: float | None = None
 
 
+@dataclass(frozen=True)
+class FieldCheck:
+    """Columnar equivalent of one model field: its type and nullability."""
+
+    name: str
+    kind: type
+    nullable: bool
+    required: bool
+
+
+def model_field_checks(model: type[BaseModel]) -> tuple[FieldCheck, ...] | None:
+    """Derive per-column checks from a model, or None if it needs Pydantic.
+
+    Only plain int, float, str and datetime fields (optionally None) in
+    Pydantic's default lax mode are translated; validators, constraints,
+    aliases, strict mode or forbidden extras fall back to model_validate
+    for every row.
+    """
+    decorators = model.__pydantic_decorators__
+
+    if (
+        decorators.validators
+        or decorators.field_validators
+        or decorators.root_validators
+        or decorators.model_validators
+        or model.model_config.get("strict")
+        or model.model_config.get("extra") == "forbid"
+    ):
+        return None
+
+    field_checks: list[FieldCheck] = []
+
+    for name, model_field in model.model_fields.items():
+        if model_field.metadata or (
+            model_field.alias and model_field.alias != name
+        ):
+            return None
+
+        annotation = model_field.annotation
+        nullable = False
+
+        if get_origin(annotation) in (Union, UnionType):
+            members = get_args(annotation)
+            nullable = NoneType in members
+            members = tuple(
+                member
+                for member in members
+                if member is not NoneType
+            )
+
+            if len(members) != 1:
+                return None
+
+            annotation = members[0]
+
+        if annotation not in (int, float, str, datetime):
+            return None
+
+        field_checks.append(
+            FieldCheck(
+                name=name,
+                kind=annotation,
+                nullable=nullable,
+                required=model_field.is_required(),
+            )
+        )
+
+    return tuple(field_checks)
+
+
+def column_passes(column: pa.Array, field_check: FieldCheck) -> np.ndarray | None:
+    """Rows of one column that Pydantic would certainly accept.
+
+    Returns None for Arrow types without a columnar rule; those batches
+    are validated row by row.
+    """
+    if pa.types.is_dictionary(column.type):
+        column = column.dictionary_decode()
+
+    column_type = column.type
+
+    if pa.types.is_null(column_type):
+        return np.full(len(column), field_check.nullable)
+
+    if field_check.kind is int:
+        if pa.types.is_integer(column_type) and column_type != pa.uint64():
+            passes = None
+        elif pa.types.is_floating(column_type):
+            # 2.0 passes as 2; fractions, NaN, inf and values past int64 fail.
+            passes = pc.and_(
+                pc.equal(column, pc.trunc(column)),
+                pc.less(pc.abs(column), INT64_LIMIT),
+            )
+        else:
+            return None
+    elif field_check.kind is float:
+        if pa.types.is_floating(column_type) or (
+            pa.types.is_integer(column_type)
+        ):
+            passes = None
+        else:
+            return None
+    elif field_check.kind is str:
+        if pa.types.is_string(column_type) or pa.types.is_large_string(
+            column_type
+        ):
+            passes = None
+        else:
+            return None
+    elif field_check.kind is datetime:
+        if pa.types.is_timestamp(column_type):
+            passes = None
+        else:
+            return None
+    else:
+        return None
+
+    if passes is None:
+        passes_mask = np.ones(len(column), dtype=bool)
+    else:
+        passes_mask = np.asarray(pc.fill_null(passes, True), dtype=bool)
+
+    if not field_check.nullable and column.null_count:
+        passes_mask &= np.asarray(pc.is_valid(column), dtype=bool)
+
+    return passes_mask
+
+
+def rows_needing_model(
+    batch: pa.RecordBatch,
+    field_checks: tuple[FieldCheck, ...],
+) -> np.ndarray:
+    """Indices of the rows the columnar checks could not clear."""
+    passes = np.ones(batch.num_rows, dtype=bool)
+
+    for field_check in field_checks:
+        if field_check.name not in batch.schema.names:
+            if field_check.required:
+                return np.arange(batch.num_rows)
+
+            continue
+
+        column_passes_mask = column_passes(
+            batch.column(field_check.name),
+            field_check,
+        )
+
+        if column_passes_mask is None:
+            return np.arange(batch.num_rows)
+
+        passes &= column_passes_mask
+
+    return np.flatnonzero(~passes)
+
+
+def row_errors(
+    row_offset: int,
+    error: ValidationError,
+) -> list[dict[str, Any]]:
+    """Flatten a row's ValidationError into one record per failed field."""
+    return [
+        {
+            "row_offset": row_offset,
+            "source": "model",
+            "field": ".".join(str(part) for part in detail["loc"]),
+            "error_type": detail["type"],
+            "message": detail["msg"],
+            # A missing field's input is the whole row, not a value.
+            "value": (
+                None
+                if detail["type"] == "missing" or detail["input"] is None
+                else str(detail["input"])
+            ),
+        }
+        for detail in error.errors(include_url=False)
+    ]
+
+
+def validate_batch(
+    batch: pa.RecordBatch,
+    field_checks: tuple[FieldCheck, ...] | None,
+    first_row: int = 0,
+    rules: tuple[Rule, ...] = (),
+    file_name: str = "",
+    timings: BatchTimings | None = None,
+) -> pa.Table:
+    """Validate one batch and return the errors of its invalid rows.
+
+    With field checks, only rows that fail them are converted to dicts
+    and passed to TaxiTrip.model_validate, so both engines report the
+    same errors. Rule violations follow the model errors. Row offsets
+    count from first_row. Each stage's time is added to timings.
+    """
+    model_errors: list[dict[str, Any]] = []
+    timings = timings if timings is not None else BatchTimings()
+
+    started_at = perf_counter()
+
+    if field_checks is None:
+        row_indices = range(batch.num_rows)
+    else:
+        row_indices = rows_needing_model(batch, field_checks)
+
+    checked_at = perf_counter()
+
+    if field_checks is None:
+        records = batch.to_pylist()
+    else:
+        records = batch.take(pa.array(row_indices)).to_pylist()
+
+    converted_at = perf_counter()
+
+    for row_index, record in zip(row_indices, records):
+        try:
+            TaxiTrip.model_validate(record)
+        except ValidationError as error:
+            model_errors.extend(row_errors(first_row + int(row_index), error))
+
+    validated_at = perf_counter()
+
+    errors = pa.concat_tables(
+        [
+            pa.Table.from_pylist(model_errors, schema=ROW_ERROR_SCHEMA),
+            rule_violations(batch, rules, file_name, first_row),
+        ]
+    )
+
+    timings.to_pylist_seconds += converted_at - checked_at
+    timings.model_seconds += (
+        (checked_at - started_at) + (validated_at - converted_at)
+    )
+    timings.rules_seconds += perf_counter() - validated_at
+
+    return errors
+
+
+def batch_column(batch: pa.RecordBatch, name: str) -> pa.Array | None:
+    """The column called name, matched case-insensitively if not exactly.
+
+    TLC files spell some columns both ways, e.g. Airport_fee and
+    airport_fee, and a rule written for one must still find the other.
+    """
+    if name in batch.schema.names:
+        return batch.column(name)
+
+    for column_name in batch.schema.names:
+        if column_name.lower() == name.lower():
+            return batch.column(column_name)
+
+    return None
+
+
+@dataclass(frozen=True)
+class RangeRule:
+    """field lies within [minimum, maximum]; either bound may be open."""
+
+    name: str
+    field: str
+    budget: int | None
+    minimum: float | None
+    maximum: float | None
+
+    @property
+    def message(self) -> str:
+        return (
+            f"{self.field} outside "
+            f"[{'-inf' if self.minimum is None else self.minimum}, "
+            f"{'inf' if self.maximum is None else self.maximum}]"
+        )
+
+    def violations(self, batch: pa.RecordBatch, file_name: str) -> pa.Array | None:
+        column = batch_column(batch, self.field)
+
+        if column is None:
+            return None
+
+        if self.minimum is None:
+            return pc.greater(column, self.maximum)
+
+        if self.maximum is None:
+            return pc.less(column, self.minimum)
+
+        return pc.or_(
+            pc.less(column, self.minimum),
+            pc.greater(column, self.maximum),
+        )
+
+
+@dataclass(frozen=True)
+class AllowedValuesRule:
+    """field is one of values."""
+
+    name: str
+    field: str
+    budget: int | None
+    values: tuple[Any, ...]
+
+    @property
+    def message(self) -> str:
+        return f"{self.field} not in {list(self.values)}"
+
+    def violations(self, batch: pa.RecordBatch, file_name: str) -> pa.Array | None:
+        column = batch_column(batch, self.field)
+
+        if column is None:
+            return None
+
+        value_set = pa.array(self.values).cast(column.type)
+
+        return pc.and_(
+            pc.is_valid(column),
+            pc.invert(pc.is_in(column, value_set=value_set)),
+        )
+
+
+@dataclass(frozen=True)
+class GreaterThanRule:
+    """field is strictly greater than other, e.g. dropoff after pickup."""
+
+    name: str
+    field: str
+    budget: int | None
+    other: str
+
+    @property
+    def message(self) -> str:
+        return f"{self.field} not after {self.other}"
+
+    def violations(self, batch: pa.RecordBatch, file_name: str) -> pa.Array | None:
+        column = batch_column(batch, self.field)
+        other_column = batch_column(batch, self.other)
+
+        if column is None or other_column is None:
+            return None
+
+        return pc.less_equal(column, other_column)
+
+
+@dataclass(frozen=True)
+class SumRule:
+    """field equals the sum of components within tolerance.
+
+    Null or absent components count as zero.
+    """
+
+    name: str
+    field: str
+    budget: int | None
+    components: tuple[str, ...]
+    tolerance: float
+
+    @property
+    def message(self) -> str:
+        return (
+            f"{self.field} differs from {' + '.join(self.components)} "
+            f"by more than {self.tolerance}"
+        )
+
+    def violations(self, batch: pa.RecordBatch, file_name: str) -> pa.Array | None:
+        column = batch_column(batch, self.field)
+
+        if column is None:
+            return None
+
+        components_total = pa.array(np.zeros(batch.num_rows))
+
+        for component in self.components:
+            component_column = batch_column(batch, component)
+
+            if component_column is not None:
+                components_total = pc.add(
+                    components_total,
+                    pc.fill_null(component_column.cast(pa.float64()), 0.0),
+                )
+
+        return pc.greater(
+            pc.abs(pc.subtract(column.cast(pa.float64()), components_total)),
+            self.tolerance,
+        )
+
+
+@dataclass(frozen=True)
+class FileMonthRule:
+    """field falls in the year and month in the file name."""
+
+    name: str
+    field: str
+    budget: int | None
+
+    @property
+    def message(self) -> str:
+        return f"{self.field} outside the file's month"
+
+    def violations(self, batch: pa.RecordBatch, file_name: str) -> pa.Array | None:
+        column = batch_column(batch, self.field)
+        file_month = FILE_MONTH_PATTERN.search(file_name)
+
+        if column is None or file_month is None:
+            return None
+
+        return pc.or_(
+            pc.not_equal(pc.year(column), int(file_month.group(1))),
+            pc.not_equal(pc.month(column), int(file_month.group(2))),
+        )
+
+
+Rule = RangeRule | AllowedValuesRule | GreaterThanRule | SumRule | FileMonthRule
+
+
+def compile_rule(rule_config: dict[str, Any]) -> Rule:
+    """Build one rule from its [[rules]] table in config.toml."""
+    name = rule_config.get("name", "<unnamed>")
+    kind = rule_config.get("kind")
+
+    try:
+        common = {
+            "name": rule_config["name"],
+            "field": rule_config["column"],
+            "budget": rule_config.get("budget"),
+        }
+
+        if kind == "range":
+            if "min" not in rule_config and "max" not in rule_config:
+                raise ValueError(f"Range rule {name!r} needs min or max.")
+
+            return RangeRule(
+                **common,
+                minimum=rule_config.get("min"),
+                maximum=rule_config.get("max"),
+            )
+
+        if kind == "allowed_values":
+            return AllowedValuesRule(
+                **common,
+                values=tuple(rule_config["values"]),
+            )
+
+        if kind == "greater_than":
+            return GreaterThanRule(**common, other=rule_config["other"])
+
+        if kind == "sum":
+            return SumRule(
+                **common,
+                components=tuple(rule_config["components"]),
+                tolerance=rule_config.get("tolerance", 0.01),
+            )
+
+        if kind == "file_month":
+            return FileMonthRule(**common)
+    except KeyError as error:
+        raise ValueError(
+            f"Rule {name!r} is missing the {error.args[0]!r} setting."
+        ) from error
+
+    raise ValueError(f"Rule {name!r} has an unknown kind: {kind!r}.")
+
+
+def compile_rules(rules_config: list[dict[str, Any]]) -> tuple[Rule, ...]:
+    rules = tuple(compile_rule(rule_config) for rule_config in rules_config)
+    names = [rule.name for rule in rules]
+
+    if len(set(names)) != len(names):
+        raise ValueError("Rule names in config.toml must be unique.")
+
+    return rules
+
+
+def rule_violations(
+    batch: pa.RecordBatch,
+    rules: tuple[Rule, ...],
+    file_name: str,
+    first_row: int = 0,
+) -> pa.Table:
+    """Run every rule's kernel over the batch; one error per violation.
+
+    Nulls never violate a rule, and a rule whose columns are absent or
+    of a type it cannot compare is skipped: both are the model's to
+    report. The errors are built as Arrow columns, without a Python
+    object per violation.
+    """
+    errors: list[pa.Table] = [ROW_ERROR_SCHEMA.empty_table()]
+
+    for rule in rules:
+        try:
+            mask = rule.violations(batch, file_name)
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError, pa.ArrowTypeError):
+            continue
+
+        if mask is None:
+            continue
+
+        row_indices = np.flatnonzero(
+            np.asarray(pc.fill_null(mask, False), dtype=bool)
+        )
+
+        if not row_indices.size:
+            continue
+
+        violation_count = int(row_indices.size)
+
+        errors.append(
+            pa.table(
+                [
+                    pa.array(first_row + row_indices, pa.int64()),
+                    pa.repeat(pa.scalar("rule", pa.string()), violation_count),
+                    pa.repeat(pa.scalar(rule.field, pa.string()), violation_count),
+                    pa.repeat(pa.scalar(rule.name, pa.string()), violation_count),
+                    pa.repeat(
+                        pa.scalar(rule.message, pa.string()),
+                        violation_count,
+                    ),
+                    value_text(
+                        batch.column(rule.field).take(pa.array(row_indices))
+                    ),
+                ],
+                schema=ROW_ERROR_SCHEMA,
+            )
+        )
+
+    return pa.concat_tables(errors)
+
+
+def value_text(values: pa.Array) -> pa.Array:
+    """Cast values to text as str() writes them, like the model's errors."""
+    text = values.cast(pa.string())
+
+    if pa.types.is_floating(values.type):
+        text = pc.if_else(
+            pc.match_substring_regex(text, r"^-?\d+$"),
+            pc.binary_join_element_wise(text, ".0", ""),
+            text,
+        )
+    elif pa.types.is_timestamp(values.type):
+        text = pc.replace_substring_regex(text, r"\.0+$", "")
+    elif pa.types.is_boolean(values.type):
+        text = pc.if_else(values, "True", "False")
+
+    return text
+
+
+class RuleBudgetExceeded(Exception):
+    """A rule had more violations in a file than its budget allows."""
+
+
+def check_rule_budgets(
+    rules: tuple[Rule, ...],
+    rule_counts: dict[str, int],
+    errors: pa.Table,
+) -> None:
+    """Add the errors' rule violations to rule_counts; raise on overrun."""
+    for rule_name, violations in rule_error_counts(errors).items():
+        rule_counts[rule_name] = rule_counts.get(rule_name, 0) + violations
+
+    for rule in rules:
+        if rule.budget is not None and rule_counts.get(rule.name, 0) > rule.budget:
+            raise RuleBudgetExceeded(
+                f"Rule {rule.name} exceeded its budget of {rule.budget:,} "
+                f"violations ({rule.message})."
+            )
+
+
 def parse_args() -> argparse.Namespace:
     """Parse command-line arguments."""
     parser = argparse.ArgumentParser(
@@ -74,6 +750,9 @@ def parse_args() -> argparse.Namespace:
     Specify the file extension and output directory:
         py validate_file_against_pydantic_model.py ../data_in --extension .parquet --output-dir ../data_out
 
+    Validate PSV exports from parquet_to_psv.py before BULK INSERT:
+        py validate_file_against_pydantic_model.py ../data_out --extension .psv --output-dir ../data_out
+
     Simulate a failure for restart testing:
         py validate_file_against_pydantic_model.py ../data_in --output-dir ../data_out --fail-on yellow_tripdata_2024-04.parquet
     """,
@@ -89,7 +768,10 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument(
         "--extension",
         default=".parquet",
-        help="File extension to process. Default: .parquet",
+        help=(
+            "File extension to process: .parquet, or .psv for exports "
+            "from parquet_to_psv.py. Default: .parquet"
+        ),
     )
 
     parser.add_argument(
@@ -101,9 +783,99 @@ def parse_args() -> argparse.Namespace:
 
     parser.add_argument(
         "--batch-size",
-        type=int,
+        type=batch_size_argument,
         default=50_000,
-        help="Number of Parquet rows to read per batch. Default: 50000",
+        help=(
+            "Number of Parquet rows to read per batch, or 'auto' to size "
+            "batches for --target-batch-seconds under --max-memory-mb. "
+            "Default: 50000"
+        ),
+    )
+
+    parser.add_argument(
+        "--target-batch-seconds",
+        type=float,
+        default=1.0,
+        help=(
+            "With --batch-size auto, the per-batch latency to aim for. "
+            "Default: 1.0"
+        ),
+    )
+
+    parser.add_argument(
+        "--max-memory-mb",
+        type=float,
+        default=2048,
+        help=(
+            "With --batch-size auto, the process RSS above which batches "
+            "shrink. Default: 2048"
+        ),
+    )
+
+    parser.add_argument(
+        "--engine",
+        choices=VALIDATION_ENGINES,
+        default="columnar",
+        help=(
+            "columnar checks TaxiTrip's field types and nullability with "
+            "Arrow compute per batch and runs Pydantic only on the rows "
+            "that fail them, for its exact error; pydantic runs "
+            "model_validate on every row. Both fail on the same row with "
+            "the same error. Default: columnar"
+        ),
+    )
+
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help=(
+            "Number of validation processes. Row groups of all pending "
+            "files are validated in parallel, while this process writes "
+            "every progress and event-log record in file and row-group "
+            "order. Default: 1"
+        ),
+    )
+
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help=(
+            "Also profile each file from the batches being validated and "
+            "write <stem>_profile.csv (<stem>_psv_profile.csv for PSV "
+            "input) to the output directory, in the format "
+            "validate_parquet_batch.py writes."
+        ),
+    )
+
+    parser.add_argument(
+        "--fsync",
+        choices=FSYNC_POLICIES,
+        default="commit",
+        help=(
+            "When progress, event and summary logs are fsynced: after "
+            "every group commit, once at exit, or never. Default: commit"
+        ),
+    )
+
+    parser.add_argument(
+        "--gc-growth-mb",
+        type=float,
+        default=GC_GROWTH_MB,
+        help=(
+            "Run a full garbage collection only after RSS has grown this "
+            f"many MB since the last one. Default: {GC_GROWTH_MB:,.0f}"
+        ),
+    )
+
+    parser.add_argument(
+        "--control-port",
+        type=int,
+        help=(
+            f"Serve a control endpoint on {CONTROL_HOST} at this port "
+            "(0 picks a free one): GET /status; POST /pause, /resume, "
+            "/stop, /stop-after-file, /batch-size?rows=N, /workers?count=N."
+        ),
     )
 
     parser.add_argument(
@@ -116,6 +888,165 @@ def parse_args() -> argparse.Namespace:
 
     return parser.parse_args()
 
+def batch_size_argument(value: str) -> int | str:
+    """argparse type for --batch-size: a positive row count or 'auto'."""
+    if value == "auto":
+        return value
+
+    try:
+        batch_size = int(value)
+    except ValueError as error:
+        raise argparse.ArgumentTypeError(
+            f"Expected a row count or 'auto', got {value!r}."
+        ) from error
+
+    if batch_size <= 0:
+        raise argparse.ArgumentTypeError(
+            "Batch size must be greater than zero."
+        )
+
+    return batch_size
+
+
+def is_psv_file(file_path: Path) -> bool:
+    return file_path.suffix.lower() == PSV_EXTENSION
+
+
+def psv_column_types(model: type[BaseModel]) -> dict[str, pa.DataType]:
+    """Arrow types to parse a PSV export's TaxiTrip columns as.
+
+    int fields are parsed as float64: a double Parquet column such as
+    passenger_count is exported as "1.0", and a fraction must reach the
+    model as a row error rather than fail the whole read.
+    """
+    arrow_types = {
+        int: pa.float64(),
+        float: pa.float64(),
+        str: pa.string(),
+        datetime: pa.timestamp("us"),
+    }
+
+    column_types: dict[str, pa.DataType] = {}
+
+    for name, model_field in model.model_fields.items():
+        annotation = model_field.annotation
+        members = [
+            member
+            for member in get_args(annotation) or (annotation,)
+            if member is not NoneType
+        ]
+
+        if len(members) == 1 and members[0] in arrow_types:
+            column_types[name] = arrow_types[members[0]]
+
+    return column_types
+
+
+def sliced_batches(
+    blocks: Iterable[pa.RecordBatch],
+    batch_rows: Callable[[], int],
+) -> Iterator[pa.RecordBatch]:
+    """Regroup record batches into batches of batch_rows() rows.
+
+    batch_rows is called again before every batch, so a size changed
+    mid-file applies from the next batch. Batches are zero-copy slices
+    of a block; only a batch spanning two blocks is concatenated.
+    """
+    pending: list[pa.RecordBatch] = []
+    pending_rows = 0
+
+    for block in blocks:
+        offset = 0
+        rows = batch_rows()
+
+        while pending_rows + block.num_rows - offset >= rows:
+            needed = rows - pending_rows
+            batch = block.slice(offset, needed)
+
+            yield pa.concat_batches([*pending, batch]) if pending else batch
+
+            pending = []
+            pending_rows = 0
+            offset += needed
+            rows = batch_rows()
+
+        if offset < block.num_rows:
+            pending.append(block.slice(offset))
+            pending_rows += block.num_rows - offset
+
+    if pending_rows:
+        yield pa.concat_batches(pending)
+
+
+def psv_record_batches(
+    file_path: Path,
+    batch_rows: Callable[[], int],
+) -> Iterator[pa.RecordBatch]:
+    """Stream a PSV file as record batches of batch_rows() rows.
+
+    open_csv yields one batch per parsed block, regrouped by
+    sliced_batches.
+    """
+    reader = pacsv.open_csv(
+        file_path,
+        read_options=pacsv.ReadOptions(
+            use_threads=True,
+            block_size=PSV_BLOCK_BYTES,
+        ),
+        parse_options=pacsv.ParseOptions(delimiter=PSV_DELIMITER),
+        convert_options=pacsv.ConvertOptions(
+            column_types=psv_column_types(TaxiTrip),
+            null_values=[PSV_NULL],
+            strings_can_be_null=True,
+            quoted_strings_can_be_null=False,
+        ),
+    )
+
+    return sliced_batches(reader, batch_rows)
+
+
+def row_group_count(file_path: Path) -> int:
+    if is_psv_file(file_path):
+        return 1
+
+    return pq.ParquetFile(file_path).num_row_groups
+
+
+def batch_read_rows(batch_size: int, batch_sizer: BatchSizer | None) -> int:
+    """Rows per Parquet read; auto reads min_rows so batches can shrink."""
+    if batch_sizer is not None:
+        return batch_sizer.settings.min_rows
+
+    return batch_size
+
+
+def row_group_batches(
+    file_path: Path,
+    row_group: int,
+    batch_rows: Callable[[], int],
+    read_rows: int,
+    parquet_file: pq.ParquetFile | None = None,
+) -> Iterator[pa.RecordBatch]:
+    """Record batches of one row group; a PSV file is all row group 0.
+
+    Parquet is read read_rows at a time and regrouped into batches of
+    batch_rows(), which is re-read before every batch.
+    """
+    if is_psv_file(file_path):
+        return psv_record_batches(file_path, batch_rows)
+
+    if parquet_file is None:
+        parquet_file = pq.ParquetFile(file_path)
+
+    return sliced_batches(
+        parquet_file.iter_batches(
+            batch_size=read_rows,
+            row_groups=[row_group],
+        ),
+        batch_rows,
+    )
+
+
 def normalize_extension(extension: str) -> str:
     """Ensure that the file extension begins with a period."""
     extension = extension.strip()
@@ -144,6 +1075,11 @@ def discover_files(
             f"Source path is not a directory: {source_dir}"
         )
 
+    if extension not in (PARQUET_EXTENSION, PSV_EXTENSION):
+        raise ValueError(
+            f"--extension must be {PARQUET_EXTENSION} or {PSV_EXTENSION}."
+        )
+
     matching_files = sorted(
         path
         for path in source_dir.iterdir()
@@ -166,6 +1102,8 @@ def prepare_output_paths(
         progress=output_dir / output_config["progress"],
         errors=output_dir / output_config["errors"],
         summary=output_dir / output_config["summary"],
+        cache=output_dir / output_config["cache"],
+        profile_state=output_dir / output_config["profile_state"],
     )
 
 
@@ -174,99 +1112,1345 @@ def utc_now() -> str:
     return datetime.now(timezone.utc).isoformat()
 
 
-def append_jsonl(path: Path, record: dict[str, Any]) -> None:
-    """Append one JSON object to a JSON Lines file."""
-    with path.open("a", encoding="utf-8") as file:
-        json.dump(record, file, ensure_ascii=False, default=str)
-        file.write("\n")
-        file.flush()
+class LogWriter:
+    """Append JSON Lines records from one background thread.
 
+    Records are queued in order and written in group commits: one open,
+    write and flush per file for everything queued within
+    LOG_COMMIT_SECONDS or LOG_COMMIT_RECORDS, with fsync as fsync_policy
+    says. A write failure is raised by the next append or by close.
+    """
 
-def load_latest_statuses(
-    event_log_path: Path,
-) -> dict[str, dict[str, Any]]:
-    """Return the most recent event_log record for each file."""
-    latest: dict[str, dict[str, Any]] = {}
+    def __init__(self, fsync_policy: str) -> None:
+        self.fsync_policy = fsync_policy
+        self.error: Exception | None = None
+        self.written_paths: set[Path] = set()
+        self.records: queue.Queue[tuple[Path, dict[str, Any]] | None] = (
+            queue.Queue(maxsize=LOG_QUEUE_RECORDS)
+        )
+        self.thread = threading.Thread(
+            target=self.run,
+            name="log-writer",
+            daemon=True,
+        )
+        self.thread.start()
 
-    if not event_log_path.exists():
-        return latest
+    def append(self, path: Path, record: dict[str, Any]) -> None:
+        """Queue one JSON object for the end of a JSON Lines file."""
+        if self.error is not None:
+            raise self.error
 
-    with event_log_path.open("r", encoding="utf-8") as file:
-        for line_number, line in enumerate(file, start=1):
-            line = line.strip()
+        self.records.put((path, record))
 
-            if not line:
-                continue
+    def close(self) -> None:
+        """Write everything queued, apply the close fsync, stop the thread."""
+        self.records.put(None)
+        self.thread.join()
 
-            try:
-                record = json.loads(line)
-            except json.JSONDecodeError as error:
-                raise ValueError(
-                    f"Invalid JSON in {event_log_path} "
-                    f"at line {line_number}."
-                ) from error
+        if self.error is not None:
+            raise self.error
 
-            filename = record.get("file")
+    def run(self) -> None:
+        pending: list[tuple[Path, dict[str, Any]]] = []
+        commit_at = 0.0
+        closing = False
 
-            if isinstance(filename, str):
-                latest[filename] = record
+        while not closing:
+            try:
+                item = self.records.get(
+                    timeout=max(commit_at - monotonic(), 0) if pending else None
+                )
+            except queue.Empty:
+                pass
+            else:
+                if item is None:
+                    closing = True
+                else:
+                    if not pending:
+                        commit_at = monotonic() + LOG_COMMIT_SECONDS
+
+                    pending.append(item)
+
+                    if len(pending) < LOG_COMMIT_RECORDS:
+                        continue
+
+            if pending and self.error is None:
+                try:
+                    self.commit(pending)
+                except Exception as error:
+                    self.error = error
+
+            pending = []
+
+        if self.fsync_policy == "close" and self.error is None:
+            for path in self.written_paths:
+                with path.open("a", encoding="utf-8") as file:
+                    os.fsync(file.fileno())
+
+    def commit(self, pending: list[tuple[Path, dict[str, Any]]]) -> None:
+        lines_by_path: dict[Path, list[str]] = {}
+
+        for path, record in pending:
+            lines_by_path.setdefault(path, []).append(
+                json.dumps(record, ensure_ascii=False, default=str) + "\n"
+            )
 
-    return latest
+        for path, lines in lines_by_path.items():
+            with path.open("a", encoding="utf-8") as file:
+                file.write("".join(lines))
+                file.flush()
 
+                if self.fsync_policy == "commit":
+                    os.fsync(file.fileno())
 
-def validate_file(
+            self.written_paths.add(path)
+
+
+@dataclass
+class MemoryPolicy:
+    """Collect garbage only when RSS has grown by growth_mb since the last
+    collection, instead of after every batch."""
+
+    growth_mb: float
+    baseline_mb: float | None = None
+
+    def after_batch(self, process: psutil.Process, memory_mb: float) -> float:
+        """Collect if due; return the RSS (MB) to report for the batch."""
+        if self.baseline_mb is None:
+            self.baseline_mb = memory_mb
+
+        if memory_mb - self.baseline_mb < self.growth_mb:
+            return memory_mb
+
+        gc.collect()
+
+        # Freed memory is often kept by the allocator, so RSS may not
+        # fall; the new baseline stops repeated collections either way.
+        self.baseline_mb = process.memory_info().rss / (1024 * 1024)
+
+        return self.baseline_mb
+
+
+@dataclass
+class BatchTimings:
+    """Seconds one batch spent in each stage of the hot path.
+
+    model covers the columnar field checks and TaxiTrip.model_validate;
+    to_pylist is the conversion of the rows handed to the model.
+    """
+
+    decode_seconds: float = 0.0
+    to_pylist_seconds: float = 0.0
+    model_seconds: float = 0.0
+    rules_seconds: float = 0.0
+    profile_seconds: float = 0.0
+    gc_seconds: float = 0.0
+    progress_seconds: float = 0.0
+
+    @property
+    def total_seconds(self) -> float:
+        return (
+            self.decode_seconds
+            + self.to_pylist_seconds
+            + self.model_seconds
+            + self.rules_seconds
+            + self.profile_seconds
+            + self.gc_seconds
+            + self.progress_seconds
+        )
+
+    def record_fields(self, batch_rows: int) -> dict[str, float]:
+        """The batch_completed fields: each stage in ms, plus rows/s."""
+        total_seconds = self.total_seconds
+
+        return {
+            "decode_ms": round(self.decode_seconds * 1000, 2),
+            "to_pylist_ms": round(self.to_pylist_seconds * 1000, 2),
+            "model_ms": round(self.model_seconds * 1000, 2),
+            "rules_ms": round(self.rules_seconds * 1000, 2),
+            "profile_ms": round(self.profile_seconds * 1000, 2),
+            "gc_ms": round(self.gc_seconds * 1000, 2),
+            "progress_ms": round(self.progress_seconds * 1000, 2),
+            "rows_per_second": (
+                round(batch_rows / total_seconds) if total_seconds else 0
+            ),
+        }
+
+
+def read_event_records(event_log_path: Path) -> Iterator[dict[str, Any]]:
+    """Yield the event_log records in the order they were written."""
+    if not event_log_path.exists():
+        return
+
+    with event_log_path.open("r", encoding="utf-8") as file:
+        for line_number, line in enumerate(file, start=1):
+            line = line.strip()
+
+            if not line:
+                continue
+
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as error:
+                raise ValueError(
+                    f"Invalid JSON in {event_log_path} "
+                    f"at line {line_number}."
+                ) from error
+
+            yield record
+
+
+@dataclass(frozen=True)
+class FileFingerprint:
+    file_size: int
+    file_mtime_ns: int
+    footer_sha256: str
+    model_sha256: str
+    rules_sha256: str
+    rules_version: int
+
+    @property
+    def key(self) -> str:
+        return hashlib.sha256(
+            json.dumps(asdict(self), sort_keys=True).encode("utf-8")
+        ).hexdigest()
+
+
+def model_sha256(model: type[BaseModel]) -> str:
+    """Hash a model's JSON schema, which changes with any field or type."""
+    return hashlib.sha256(
+        json.dumps(model.model_json_schema(), sort_keys=True).encode("utf-8")
+    ).hexdigest()
+
+
+def rules_sha256(rules_config: list[dict[str, Any]]) -> str:
+    """Hash the [[rules]] tables, so editing any rule invalidates results."""
+    return hashlib.sha256(
+        json.dumps(rules_config, sort_keys=True).encode("utf-8")
+    ).hexdigest()
+
+
+def file_fingerprint(
     file_path: Path,
-    batch_size: int,
-    progress_path: Path,
-    stop_request_path: Path,
+    model_hash: str,
+    rules_hash: str,
+) -> FileFingerprint:
+    """Identify a Parquet file and the rules it would be validated against.
+
+    The footer holds the schema, row-group offsets and column statistics,
+    so it changes whenever the data does, and reading it costs one seek.
+    A PSV file is identified by its last PSV_TAIL_BYTES instead.
+    """
+    stat = file_path.stat()
+
+    if is_psv_file(file_path):
+        with file_path.open("rb") as file:
+            file.seek(-min(PSV_TAIL_BYTES, stat.st_size), os.SEEK_END)
+            tail = file.read()
+
+        return FileFingerprint(
+            file_size=stat.st_size,
+            file_mtime_ns=stat.st_mtime_ns,
+            footer_sha256=hashlib.sha256(tail).hexdigest(),
+            model_sha256=model_hash,
+            rules_sha256=rules_hash,
+            rules_version=RULES_VERSION,
+        )
+
+    with file_path.open("rb") as file:
+        file.seek(-PARQUET_TAIL_BYTES, os.SEEK_END)
+        footer_length_bytes = file.read(4)
+
+        footer_length = struct.unpack("<I", footer_length_bytes)[0]
+
+        file.seek(-(PARQUET_TAIL_BYTES + footer_length), os.SEEK_END)
+        footer = file.read(footer_length)
+
+    return FileFingerprint(
+        file_size=stat.st_size,
+        file_mtime_ns=stat.st_mtime_ns,
+        footer_sha256=hashlib.sha256(footer + footer_length_bytes).hexdigest(),
+        model_sha256=model_hash,
+        rules_sha256=rules_hash,
+        rules_version=RULES_VERSION,
+    )
+
+
+def load_validation_cache(cache_path: Path) -> dict[str, dict[str, Any]]:
+    """Return the cached validation results keyed by fingerprint."""
+    if not cache_path.exists():
+        return {}
+
+    with cache_path.open("r", encoding="utf-8") as file:
+        return json.load(file)
+
+
+def save_validation_result(
+    cache_path: Path,
+    cache: dict[str, dict[str, Any]],
+    fingerprint: FileFingerprint,
+    summary: dict[str, Any],
 ) -> None:
-    """Read and validate one Parquet file in batches."""
-    parquet_file = pq.ParquetFile(file_path)
-    process = psutil.Process(os.getpid())
-    rows_processed = 0
+    """Cache a file's validation summary under its fingerprint.
 
-    for batch_number, batch in enumerate(
-        parquet_file.iter_batches(batch_size=batch_size),
-        start=1,
-    ):        
-        records = batch.to_pylist()
+    The cache is rewritten through a temporary file and renamed into
+    place, so an interrupted write never leaves it truncated.
+    """
+    cache[fingerprint.key] = {
+        "fingerprint": asdict(fingerprint),
+        "summary": summary,
+    }
 
-        for record in records:
-            TaxiTrip.model_validate(record)
+    temporary_path = cache_path.with_name(f"{cache_path.name}.tmp")
 
-        rows_processed += len(records)
+    with temporary_path.open("w", encoding="utf-8") as file:
+        json.dump(cache, file)
 
-        memory_mb = process.memory_info().rss / (1024 * 1024)
+    temporary_path.replace(cache_path)
+
+
+def load_checkpoints(
+    event_log_path: Path,
+) -> dict[str, dict[str, Any]]:
+    """Return the last row-group checkpoint of each unfinished file.
+
+    A completed record clears the file's checkpoint, so a file that is
+    validated again after completing starts from its first row group.
+    """
+    checkpoints: dict[str, dict[str, Any]] = {}
+
+    for record in read_event_records(event_log_path):
+        filename = record.get("file")
 
-        progress_record = {
-            "event_type": "batch_completed",
+        if not isinstance(filename, str):
+            continue
+
+        if record.get("status") == "checkpoint":
+            checkpoints[filename] = record
+        elif record.get("status") == "completed":
+            checkpoints.pop(filename, None)
+
+    return checkpoints
+
+
+def resume_position(
+    fingerprint: FileFingerprint,
+    checkpoint: dict[str, Any] | None,
+) -> tuple[int, int, int]:
+    """Return the first row group, batch number and rows already validated.
+
+    A checkpoint written under another fingerprint is ignored: the file
+    or the rules changed, and it is validated from the start.
+    """
+    if checkpoint is None or checkpoint.get("fingerprint") != fingerprint.key:
+        return 0, 0, 0
+
+    return (
+        checkpoint["row_group"] + 1,
+        checkpoint["batch_number"],
+        checkpoint["rows_processed"],
+    )
+
+
+def write_checkpoint(
+    log_writer: LogWriter,
+    event_log_path: Path,
+    file_path: Path,
+    fingerprint: FileFingerprint,
+    row_group: int,
+    batch_number: int,
+    rows_processed: int,
+) -> None:
+    """Record that every row group up to row_group has been validated."""
+    log_writer.append(
+        event_log_path,
+        {
             "file": file_path.name,
+            "status": "checkpoint",
+            "row_group": row_group,
             "batch_number": batch_number,
-            "batch_rows": len(records),
             "rows_processed": rows_processed,
-            "memory_mb": round(memory_mb, 1),
-            "recorded_at": utc_now(),
-        }
+            "fingerprint": fingerprint.key,
+            "checkpointed_at": utc_now(),
+        },
+    )
+
+
+def duckdb_text(text: str, arrow_type: pa.DataType) -> str:
+    """Rewrite an Arrow string cast as DuckDB's CAST(... AS VARCHAR)."""
+    if pa.types.is_floating(arrow_type) and ARROW_WHOLE_NUMBER_TEXT.fullmatch(text):
+        return f"{text}.0"
+
+    if pa.types.is_timestamp(arrow_type) and "." in text:
+        seconds, _, fraction = text.partition(".")
+        fraction = ARROW_TIMESTAMP_FRACTION.sub("", fraction)
+
+        return f"{seconds}.{fraction}" if fraction else seconds
+
+    return text
+
+
+def has_min_max(arrow_type: pa.DataType) -> bool:
+    """Whether validate_parquet_batch.py profiles a column's min and max."""
+    return (
+        pa.types.is_integer(arrow_type)
+        or pa.types.is_floating(arrow_type)
+        or pa.types.is_decimal(arrow_type)
+        or pa.types.is_timestamp(arrow_type)
+        or pa.types.is_date(arrow_type)
+        or pa.types.is_time(arrow_type)
+    )
+
 
-        append_jsonl(
-            progress_path,
-            progress_record,
+def batch_profile(batch: pa.RecordBatch) -> dict[str, Any]:
+    """Profile one batch with the keys validate_parquet_batch.py writes.
+
+    The example is the smallest value as text, as MIN(CAST(... AS
+    VARCHAR)) picks it.
+    """
+    profile: dict[str, Any] = {"__rowcount": batch.num_rows}
+
+    for column_field, column in zip(batch.schema, batch.columns):
+        name = column_field.name
+        profile[f"{name}__nulls"] = column.null_count
+
+        try:
+            example = pc.min(column.cast(pa.string())).as_py()
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+            example = None
+
+        profile[f"{name}__example"] = (
+            None if example is None else duckdb_text(example, column_field.type)
         )
 
-        print(
-            f"  Batch {batch_number:,}: "
-            f"{rows_processed:,} rows validated; "
-            f"memory: {memory_mb:,.1f} MB"
+        if has_min_max(column_field.type):
+            min_max = pc.min_max(column).as_py()
+            profile[f"{name}__min"] = min_max["min"]
+            profile[f"{name}__max"] = min_max["max"]
+
+    return profile
+
+
+@dataclass
+class ProfileAccumulator:
+    """Running profile of a file, merged batch by batch in file order."""
+
+    values: dict[str, Any] = field(default_factory=dict)
+
+    def add(self, profile: dict[str, Any]) -> None:
+        for key, value in profile.items():
+            current = self.values.get(key)
+
+            if key not in self.values or current is None:
+                self.values[key] = value
+            elif value is None:
+                continue
+            elif key == "__rowcount" or key.endswith("__nulls"):
+                self.values[key] = current + value
+            elif key.endswith("__max"):
+                self.values[key] = max(current, value)
+            else:
+                self.values[key] = min(current, value)
+
+
+def profile_state_path(profile_dir: Path, file_path: Path) -> Path:
+    return profile_dir / f"{file_path.name}.parquet"
+
+
+def save_profile_state(
+    profile_dir: Path,
+    file_path: Path,
+    row_group: int,
+    profile: ProfileAccumulator,
+) -> None:
+    """Keep the profile up to a checkpointed row group for a resume.
+
+    A one-row Parquet table keeps each value's type, which JSON would
+    not for timestamps.
+    """
+    profile_dir.mkdir(parents=True, exist_ok=True)
+
+    pq.write_table(
+        pa.Table.from_pylist([{"__row_group": row_group, **profile.values}]),
+        profile_state_path(profile_dir, file_path),
+    )
+
+
+def load_profile_state(
+    profile_dir: Path,
+    file_path: Path,
+    row_group: int,
+) -> ProfileAccumulator | None:
+    """Return the profile saved at row_group's checkpoint, if there is one."""
+    state_path = profile_state_path(profile_dir, file_path)
+
+    if not state_path.exists():
+        return None
+
+    values = pq.read_table(state_path).to_pylist()[0]
+
+    if values.pop("__row_group") != row_group:
+        return None
+
+    return ProfileAccumulator(values=values)
+
+
+def profile_csv_value(key: str, value: Any) -> str:
+    """Format a value the way pandas wrote it from the DuckDB profile."""
+    if value is None:
+        return ""
+
+    # SUM(col IS NULL) came back as a float column.
+    if key.endswith("__nulls"):
+        return str(float(value))
+
+    return str(value)
+
+
+def profile_csv_path(output_dir: Path, file_path: Path) -> Path:
+    """<stem>_profile.csv, as validate_parquet_batch.py names it.
+
+    Other inputs add their extension, <stem>_psv_profile.csv, so a PSV
+    export validated beside its Parquet source keeps its own profile.
+    """
+    if file_path.suffix.lower() == PARQUET_EXTENSION:
+        return output_dir / f"{file_path.stem}_profile.csv"
+
+    return output_dir / f"{file_path.stem}_{file_path.suffix[1:]}_profile.csv"
+
+
+def write_profile_csv(profile_path: Path, profile: ProfileAccumulator) -> None:
+    """Write a profile CSV in validate_parquet_batch.py's layout."""
+    with profile_path.open("w", encoding="utf-8", newline="") as file:
+        writer = csv.writer(file, lineterminator="\n")
+        writer.writerow(["", "value"])
+
+        for key, value in profile.values.items():
+            writer.writerow([key, profile_csv_value(key, value)])
+
+
+def validated_batches(
+    batches: Iterator[pa.RecordBatch],
+    batch_sizer: BatchSizer | None,
+    field_checks: tuple[FieldCheck, ...] | None,
+    memory_policy: MemoryPolicy,
+    rules: tuple[Rule, ...],
+    file_name: str,
+    profile: ProfileAccumulator | None = None,
+) -> Iterator[tuple[int, float, list[dict[str, Any]], BatchTimings]]:
+    """Validate record batches, from row_group_batches, one by one.
+
+    Yields the row count, process RSS (MB), row errors and stage timings
+    of each validated batch, with row offsets counted from the first row
+    read. Each batch is also added to profile, when one is given, and
+    batch_sizer, when given, is adjusted after it.
+    """
+    process = psutil.Process(os.getpid())
+
+    batches = iter(batches)
+    first_row = 0
+
+    while True:
+        batch_started_at = perf_counter()
+        batch = next(batches, None)
+
+        if batch is None:
+            break
+
+        timings = BatchTimings(
+            decode_seconds=perf_counter() - batch_started_at,
+        )
+
+        batch_errors = validate_batch(
+            batch,
+            field_checks,
+            first_row,
+            rules,
+            file_name,
+            timings,
         )
 
-        # Explicitly release the batch-related objects after each progress message:
-        del records
+        if profile is not None:
+            profiled_at = perf_counter()
+            profile.add(batch_profile(batch))
+            timings.profile_seconds = perf_counter() - profiled_at
+
+        batch_rows = batch.num_rows
+        first_row += batch_rows
+        memory_mb = process.memory_info().rss / (1024 * 1024)
+
+        if batch_sizer is not None:
+            adjust_batch_size(
+                batch_sizer=batch_sizer,
+                batch_rows=batch_rows,
+                elapsed_seconds=perf_counter() - batch_started_at,
+                memory_mb=memory_mb,
+            )
+
         del batch
-        gc.collect()
+        collected_at = perf_counter()
+        memory_mb = memory_policy.after_batch(process, memory_mb)
+        timings.gc_seconds = perf_counter() - collected_at
+
+        yield batch_rows, memory_mb, batch_errors, timings
+
+
+def write_batch_progress(
+    log_writer: LogWriter,
+    progress_path: Path,
+    file_name: str,
+    batch_number: int,
+    batch_rows: int,
+    rows_processed: int,
+    memory_mb: float,
+    timings: BatchTimings,
+) -> None:
+    """Print and record a batch_completed event.
+
+    progress_ms times the console output and the hand-off to the log
+    writer; the file write itself happens on the writer thread.
+    """
+    started_at = perf_counter()
+
+    print(
+        f"  Batch {batch_number:,}: "
+        f"{rows_processed:,} rows validated; "
+        f"memory: {memory_mb:,.1f} MB"
+    )
+
+    progress_record = {
+        "event_type": "batch_completed",
+        "file": file_name,
+        "batch_number": batch_number,
+        "batch_rows": batch_rows,
+        "rows_processed": rows_processed,
+        "memory_mb": round(memory_mb, 1),
+        "recorded_at": utc_now(),
+    }
+
+    timings.progress_seconds = perf_counter() - started_at
+    progress_record.update(timings.record_fields(batch_rows))
+
+    log_writer.append(
+        progress_path,
+        progress_record,
+    )
+
+
+def error_part_path(errors_dir: Path, file_path: Path, row_group: int) -> Path:
+    return errors_dir / file_path.name / f"row_group_{row_group:05d}.parquet"
+
+
+def clear_file_errors(errors_dir: Path, file_path: Path) -> None:
+    """Remove the stored errors of a file validated from its start."""
+    shutil.rmtree(errors_dir / file_path.name, ignore_errors=True)
+
+
+def write_row_group_errors(
+    errors_dir: Path,
+    file_path: Path,
+    row_group: int,
+    errors: pa.Table,
+) -> None:
+    """Store a row group's errors, replacing any from an earlier attempt.
+
+    Called before the row group is checkpointed, so a checkpointed row
+    group always has its errors on disk.
+    """
+    part_path = error_part_path(errors_dir, file_path, row_group)
+
+    if not errors.num_rows:
+        part_path.unlink(missing_ok=True)
+        return
+
+    part_path.parent.mkdir(parents=True, exist_ok=True)
+
+    table = errors.add_column(
+        0,
+        ERROR_SCHEMA.field("file"),
+        pa.repeat(pa.scalar(file_path.name, pa.string()), errors.num_rows),
+    ).add_column(
+        1,
+        ERROR_SCHEMA.field("row_group"),
+        pa.repeat(pa.scalar(row_group, pa.int32()), errors.num_rows),
+    )
+
+    pq.write_table(table.cast(ERROR_SCHEMA), part_path)
+
+
+def concat_row_errors(errors: list[pa.Table]) -> pa.Table:
+    """One row error table from per-batch tables, empty if there were none.
+
+    A row group can fail before its first batch yields, so this must not
+    depend on the list being non-empty.
+    """
+    if not errors:
+        return ROW_ERROR_SCHEMA.empty_table()
+
+    return pa.concat_tables(errors)
+
+
+def read_file_errors(errors_dir: Path, file_path: Path) -> pa.Table:
+    file_errors_dir = errors_dir / file_path.name
+
+    if not file_errors_dir.exists():
+        return ERROR_SCHEMA.empty_table()
+
+    return pq.read_table(file_errors_dir, schema=ERROR_SCHEMA)
+
+
+def stored_rule_counts(errors_dir: Path, file_path: Path) -> dict[str, int]:
+    """Violations per rule in a file's stored row groups, for budgets."""
+    return rule_error_counts(read_file_errors(errors_dir, file_path))
+
+
+def rule_error_counts(errors: pa.Table) -> dict[str, int]:
+    """Violations per rule among errors."""
+    rule_errors = errors.filter(pc.field("source") == "rule")
+
+    return {
+        group["error_type"]: group["count_all"]
+        for group in rule_errors.group_by("error_type")
+        .aggregate([([], "count_all")])
+        .to_pylist()
+    }
+
+
+def summarize_file_errors(
+    errors_dir: Path,
+    file_path: Path,
+    rows_processed: int,
+) -> dict[str, Any]:
+    """Aggregate a file's stored errors into one summary record.
+
+    Counts are per field and error type, each with its most frequent
+    offending values. invalid_rows and first_error cover model errors
+    only; rule violations are counted per rule.
+    """
+    errors = read_file_errors(errors_dir, file_path)
+    model_errors = errors.filter(pc.field("source") == "model")
+    error_counts: list[dict[str, Any]] = []
+    invalid_rows = 0
+    first_error = None
+
+    if model_errors.num_rows:
+        invalid_rows = (
+            model_errors.group_by(["row_group", "row_offset"])
+            .aggregate([])
+            .num_rows
+        )
+        first_error = model_errors.sort_by(
+            [("row_group", "ascending"), ("row_offset", "ascending")]
+        ).slice(0, 1).to_pylist()[0]
+
+    if errors.num_rows:
+        value_counts = errors.group_by(
+            ["source", "field", "error_type", "value"]
+        ).aggregate([([], "count_all")])
+
+        for group in (
+            errors.group_by(["source", "field", "error_type"])
+            .aggregate([([], "count_all")])
+            .sort_by([("count_all", "descending"), ("field", "ascending")])
+            .to_pylist()
+        ):
+            top_values = (
+                value_counts.filter(
+                    (pc.field("source") == group["source"])
+                    & (pc.field("field") == group["field"])
+                    & (pc.field("error_type") == group["error_type"])
+                )
+                .sort_by([("count_all", "descending"), ("value", "ascending")])
+                .slice(0, SUMMARY_TOP_VALUES)
+                .to_pylist()
+            )
+
+            error_counts.append(
+                {
+                    "source": group["source"],
+                    "field": group["field"],
+                    "error_type": group["error_type"],
+                    "count": group["count_all"],
+                    "top_values": [
+                        {"value": value["value"], "count": value["count_all"]}
+                        for value in top_values
+                    ],
+                }
+            )
+
+    return {
+        "file": file_path.name,
+        "rows_processed": rows_processed,
+        "invalid_rows": invalid_rows,
+        "error_count": errors.num_rows,
+        "rule_violations": stored_rule_counts(errors_dir, file_path),
+        "first_error": first_error,
+        "errors": error_counts,
+        "recorded_at": utc_now(),
+    }
+
+
+class FileValidationError(Exception):
+    """A file has invalid rows; they are in the errors directory."""
+
+
+def check_file_summary(summary: dict[str, Any]) -> None:
+    """Raise FileValidationError if the summarized file had invalid rows."""
+    first_error = summary["first_error"]
+
+    if first_error is None:
+        return
+
+    raise FileValidationError(
+        f"{summary['invalid_rows']:,} invalid rows; first at row group "
+        f"{first_error['row_group']:,}, offset {first_error['row_offset']:,}: "
+        f"{first_error['field']}: {first_error['message']}"
+    )
+
+
+@dataclass(frozen=True)
+class ControlSignals:
+    """Run controls shared with --workers processes.
+
+    The multiprocessing objects are handed to workers by the pool
+    initializer, so a pause, stop or new batch size reaches row groups
+    already queued.
+    """
+
+    stop_request_path: Path
+    stop: Any  # multiprocessing.Event
+    pause: Any  # multiprocessing.Event
+    batch_rows: Any  # multiprocessing.Value; 0 keeps the configured size
+    worker_limit: Any  # multiprocessing.Value
+    running_workers: Any  # multiprocessing.Value
+
+    def stop_requested(self) -> bool:
+        return self.stop.is_set() or self.stop_request_path.exists()
+
+    def wait_while_paused(self) -> None:
+        while self.pause.is_set() and not self.stop_requested():
+            sleep(STOP_POLL_SECONDS)
+
+    def acquire_worker_slot(self) -> bool:
+        """Wait until fewer than worker_limit row groups are running.
+
+        Returns False if a stop was requested while waiting.
+        """
+        while not self.stop_requested():
+            with self.running_workers.get_lock():
+                if self.running_workers.value < self.worker_limit.value:
+                    self.running_workers.value += 1
+                    return True
+
+            sleep(STOP_POLL_SECONDS)
+
+        return False
+
+    def release_worker_slot(self) -> None:
+        with self.running_workers.get_lock():
+            self.running_workers.value -= 1
+
+    def current_batch_rows(
+        self,
+        batch_size: int,
+        batch_sizer: BatchSizer | None,
+    ) -> int:
+        """Rows in the next batch: the live size if set, else auto or fixed."""
+        if self.batch_rows.value:
+            return self.batch_rows.value
 
-        if stop_request_path.exists():
+        return batch_sizer.rows if batch_sizer is not None else batch_size
+
+
+def create_control_signals(
+    stop_request_path: Path,
+    workers: int,
+) -> ControlSignals:
+    return ControlSignals(
+        stop_request_path=stop_request_path,
+        stop=multiprocessing.Event(),
+        pause=multiprocessing.Event(),
+        batch_rows=multiprocessing.Value("q", 0),
+        worker_limit=multiprocessing.Value("i", workers),
+        running_workers=multiprocessing.Value("i", 0),
+    )
+
+
+@dataclass
+class ValidatorControl:
+    """State behind --control-port: the signals plus a status snapshot."""
+
+    signals: ControlSignals
+    batch_size: int | str
+    max_workers: int
+    stop_after_file: bool = False
+    status: dict[str, Any] = field(default_factory=dict)
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def update(self, **fields: Any) -> None:
+        with self.lock:
+            self.status.update(fields, updated_at=utc_now())
+
+    def snapshot(self) -> dict[str, Any]:
+        if self.signals.stop_requested():
+            state = "stopping"
+        elif self.signals.pause.is_set():
+            state = "paused"
+        else:
+            state = "running"
+
+        with self.lock:
+            status = dict(self.status)
+
+        return {
+            "state": state,
+            "pid": os.getpid(),
+            **status,
+            "batch_size": self.signals.batch_rows.value or self.batch_size,
+            "workers": self.signals.worker_limit.value,
+            "max_workers": self.max_workers,
+            "stop_after_file": self.stop_after_file,
+        }
+
+    def apply(self, command: str, params: dict[str, list[str]]) -> None:
+        """Apply one control command; raise ValueError if it is invalid."""
+        if command == "pause":
+            self.signals.pause.set()
+        elif command == "resume":
+            self.signals.pause.clear()
+        elif command == "stop":
+            self.signals.stop.set()
+        elif command == "stop-after-file":
+            self.stop_after_file = True
+        elif command == "batch-size":
+            rows = int(params.get("rows", [""])[0])
+
+            if rows < 0:
+                raise ValueError("rows must be zero or positive.")
+
+            # Takes effect from the next batch; 0 restores the
+            # --batch-size the run started with.
+            self.signals.batch_rows.value = rows
+        elif command == "workers":
+            count = int(params.get("count", [""])[0])
+
+            if not 1 <= count <= self.max_workers:
+                raise ValueError(
+                    f"count must be between 1 and --workers "
+                    f"({self.max_workers})."
+                )
+
+            self.signals.worker_limit.value = count
+        else:
+            raise ValueError(f"Unknown command: {command}")
+
+
+class ControlRequestHandler(BaseHTTPRequestHandler):
+    """GET /status; POST /pause, /resume, /stop, /stop-after-file,
+    /batch-size?rows=N and /workers?count=N. Every reply is the status."""
+
+    control: ValidatorControl
+
+    def do_GET(self) -> None:
+        if urlparse(self.path).path != "/status":
+            self.send_json(404, {"error": "Not found"})
+            return
+
+        self.send_json(200, self.control.snapshot())
+
+    def do_POST(self) -> None:
+        url = urlparse(self.path)
+
+        try:
+            self.control.apply(url.path.strip("/"), parse_qs(url.query))
+        except ValueError as error:
+            self.send_json(400, {"error": str(error)})
+            return
+
+        self.send_json(200, self.control.snapshot())
+
+    def send_json(self, status_code: int, body: dict[str, Any]) -> None:
+        payload = json.dumps(body, default=str).encode("utf-8")
+
+        self.send_response(status_code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+def start_control_server(
+    control: ValidatorControl,
+    port: int,
+) -> ThreadingHTTPServer:
+    """Serve control requests from a daemon thread on CONTROL_HOST."""
+    handler = type(
+        "BoundControlRequestHandler",
+        (ControlRequestHandler,),
+        {"control": control},
+    )
+
+    server = ThreadingHTTPServer((CONTROL_HOST, port), handler)
+
+    threading.Thread(
+        target=server.serve_forever,
+        name="control-server",
+        daemon=True,
+    ).start()
+
+    return server
+
+
+def validate_file(
+    file_path: Path,
+    fingerprint: FileFingerprint,
+    batch_size: int,
+    log_writer: LogWriter,
+    progress_path: Path,
+    event_log_path: Path,
+    errors_dir: Path,
+    control: ValidatorControl,
+    memory_policy: MemoryPolicy,
+    batch_sizer: BatchSizer | None = None,
+    field_checks: tuple[FieldCheck, ...] | None = None,
+    rules: tuple[Rule, ...] = (),
+    checkpoint: dict[str, Any] | None = None,
+    profile: ProfileAccumulator | None = None,
+    profile_dir: Path | None = None,
+) -> int:
+    """Read and validate one Parquet or PSV file in batches; return its
+    row count.
+
+    field_checks selects the columnar engine; None validates every row
+    with Pydantic. Each validated row group has its errors stored and is
+    checkpointed in the event log, and validation resumes after the one
+    in checkpoint. A rule over its budget stops the file at that batch.
+    With profile, the batches are profiled too and the profile so far is
+    saved under profile_dir at each checkpoint. control pauses or stops
+    the file between batches and can override the batch size.
+    """
+    parquet_file = None if is_psv_file(file_path) else pq.ParquetFile(file_path)
+    first_row_group, batch_number, rows_processed = resume_position(
+        fingerprint,
+        checkpoint,
+    )
+
+    if first_row_group == 0:
+        clear_file_errors(errors_dir, file_path)
+
+    rule_counts = stored_rule_counts(errors_dir, file_path)
+
+    num_row_groups = 1 if parquet_file is None else parquet_file.num_row_groups
+
+    for row_group in range(first_row_group, num_row_groups):
+        row_group_errors: list[pa.Table] = []
+
+        for batch_rows, memory_mb, batch_errors, timings in validated_batches(
+            batches=row_group_batches(
+                file_path=file_path,
+                row_group=row_group,
+                batch_rows=lambda: control.signals.current_batch_rows(
+                    batch_size,
+                    batch_sizer,
+                ),
+                read_rows=batch_read_rows(batch_size, batch_sizer),
+                parquet_file=parquet_file,
+            ),
+            batch_sizer=batch_sizer,
+            field_checks=field_checks,
+            memory_policy=memory_policy,
+            rules=rules,
+            file_name=file_path.name,
+            profile=profile,
+        ):
+            batch_number += 1
+            rows_processed += batch_rows
+            row_group_errors.append(batch_errors)
+
+            write_batch_progress(
+                log_writer=log_writer,
+                progress_path=progress_path,
+                file_name=file_path.name,
+                batch_number=batch_number,
+                batch_rows=batch_rows,
+                rows_processed=rows_processed,
+                memory_mb=memory_mb,
+                timings=timings,
+            )
+
+            control.update(
+                file=file_path.name,
+                batch_number=batch_number,
+                rows_processed=rows_processed,
+            )
+
+            check_rule_budgets(rules, rule_counts, batch_errors)
+
+            control.signals.wait_while_paused()
+
+            if control.signals.stop_requested():
+                raise KeyboardInterrupt
+
+        write_row_group_errors(
+            errors_dir=errors_dir,
+            file_path=file_path,
+            row_group=row_group,
+            errors=concat_row_errors(row_group_errors),
+        )
+
+        if profile is not None and profile_dir is not None:
+            save_profile_state(profile_dir, file_path, row_group, profile)
+
+        write_checkpoint(
+            log_writer=log_writer,
+            event_log_path=event_log_path,
+            file_path=file_path,
+            fingerprint=fingerprint,
+            row_group=row_group,
+            batch_number=batch_number,
+            rows_processed=rows_processed,
+        )
+
+    return rows_processed
+
+
+# Memory policy and run controls of a --workers process; set once by the
+# pool initializer.
+worker_memory_policy: MemoryPolicy | None = None
+worker_signals: ControlSignals | None = None
+
+
+def init_worker(gc_growth_mb: float, signals: ControlSignals) -> None:
+    global worker_memory_policy, worker_signals
+
+    worker_memory_policy = MemoryPolicy(growth_mb=gc_growth_mb)
+    worker_signals = signals
+
+
+@dataclass(frozen=True)
+class RowGroupResult:
+    """What a --workers process reports back for one row group."""
+
+    batches: list[tuple[int, float, BatchTimings]]
+    row_errors: pa.Table
+    profile: dict[str, Any] | None = None
+    error: str | None = None
+    interrupted: bool = False
+
+
+class RowGroupValidationError(Exception):
+    """A row group failed in a worker; the message is the original error."""
+
+
+def validate_row_group(
+    file_path: Path,
+    row_group: int,
+    batch_size: int,
+    auto_batch_size: AutoBatchSize | None,
+    field_checks: tuple[FieldCheck, ...] | None,
+    rules: tuple[Rule, ...],
+    profile: bool = False,
+) -> RowGroupResult:
+    """Validate one row group in a worker process.
+
+    Nothing is written here: the batches done, the row errors, and the
+    error that ended the row group if any, go back to the parent, the
+    only writer of the progress and event logs and the error store.
+    The row group waits for a free slot under the live worker limit.
+    """
+    memory_policy = worker_memory_policy
+    signals = worker_signals
+
+    if memory_policy is None or signals is None:
+        raise RuntimeError("Worker process has not been initialized.")
+
+    if not signals.acquire_worker_slot():
+        return RowGroupResult(
+            batches=[],
+            row_errors=ROW_ERROR_SCHEMA.empty_table(),
+            interrupted=True,
+        )
+
+    try:
+        return validate_row_group_slot(
+            file_path=file_path,
+            row_group=row_group,
+            batch_size=batch_size,
+            auto_batch_size=auto_batch_size,
+            field_checks=field_checks,
+            rules=rules,
+            profile=profile,
+            memory_policy=memory_policy,
+            signals=signals,
+        )
+    finally:
+        signals.release_worker_slot()
+
+
+def validate_row_group_slot(
+    file_path: Path,
+    row_group: int,
+    batch_size: int,
+    auto_batch_size: AutoBatchSize | None,
+    field_checks: tuple[FieldCheck, ...] | None,
+    rules: tuple[Rule, ...],
+    profile: bool,
+    memory_policy: MemoryPolicy,
+    signals: ControlSignals,
+) -> RowGroupResult:
+    batches: list[tuple[int, float, BatchTimings]] = []
+    errors: list[pa.Table] = []
+    row_group_profile = ProfileAccumulator() if profile else None
+    batch_sizer = (
+        BatchSizer(settings=auto_batch_size)
+        if auto_batch_size is not None
+        else None
+    )
+
+    try:
+        for batch_rows, memory_mb, batch_errors, timings in validated_batches(
+            batches=row_group_batches(
+                file_path=file_path,
+                row_group=row_group,
+                batch_rows=lambda: signals.current_batch_rows(
+                    batch_size,
+                    batch_sizer,
+                ),
+                read_rows=batch_read_rows(batch_size, batch_sizer),
+            ),
+            batch_sizer=batch_sizer,
+            field_checks=field_checks,
+            memory_policy=memory_policy,
+            rules=rules,
+            file_name=file_path.name,
+            profile=row_group_profile,
+        ):
+            batches.append((batch_rows, memory_mb, timings))
+            errors.append(batch_errors)
+
+            signals.wait_while_paused()
+
+            if signals.stop_requested():
+                return RowGroupResult(
+                    batches=batches,
+                    row_errors=concat_row_errors(errors),
+                    interrupted=True,
+                )
+    except Exception as error:
+        return RowGroupResult(
+            batches=batches,
+            row_errors=concat_row_errors(errors),
+            error=str(error),
+        )
+
+    return RowGroupResult(
+        batches=batches,
+        row_errors=concat_row_errors(errors),
+        profile=(
+            row_group_profile.values if row_group_profile is not None else None
+        ),
+    )
+
+
+def write_row_group_results(
+    file_path: Path,
+    fingerprint: FileFingerprint,
+    futures: list[Future],
+    log_writer: LogWriter,
+    progress_path: Path,
+    event_log_path: Path,
+    errors_dir: Path,
+    control: ValidatorControl,
+    rules: tuple[Rule, ...] = (),
+    checkpoint: dict[str, Any] | None = None,
+    profile: ProfileAccumulator | None = None,
+    profile_dir: Path | None = None,
+) -> int:
+    """Write a file's results from its row-group futures; return its rows.
+
+    futures holds the row groups after checkpoint. Results are consumed
+    in row-group order whatever order the workers finish in, so the
+    progress log and checkpoints read as a sequential run's would. Like
+    validate_file, a stop request raises KeyboardInterrupt and the first
+    failing row group raises its error.
+    """
+    first_row_group, batch_number, rows_processed = resume_position(
+        fingerprint,
+        checkpoint,
+    )
+
+    if first_row_group == 0:
+        clear_file_errors(errors_dir, file_path)
+
+    rule_counts = stored_rule_counts(errors_dir, file_path)
+
+    for row_group, future in enumerate(futures, start=first_row_group):
+        while not wait([future], timeout=STOP_POLL_SECONDS).done:
+            if control.signals.stop_requested():
+                raise KeyboardInterrupt
+
+        result = future.result()
+
+        for batch_rows, memory_mb, timings in result.batches:
+            batch_number += 1
+            rows_processed += batch_rows
+
+            write_batch_progress(
+                log_writer=log_writer,
+                progress_path=progress_path,
+                file_name=file_path.name,
+                batch_number=batch_number,
+                batch_rows=batch_rows,
+                rows_processed=rows_processed,
+                memory_mb=memory_mb,
+                timings=timings,
+            )
+
+        control.update(
+            file=file_path.name,
+            batch_number=batch_number,
+            rows_processed=rows_processed,
+        )
+
+        if result.error is not None:
+            raise RowGroupValidationError(result.error)
+
+        # Workers validate whole row groups, so a budget stops the file
+        # at the first row group that overruns it.
+        check_rule_budgets(rules, rule_counts, result.row_errors)
+
+        if result.interrupted:
+            raise KeyboardInterrupt
+
+        write_row_group_errors(
+            errors_dir=errors_dir,
+            file_path=file_path,
+            row_group=row_group,
+            errors=result.row_errors,
+        )
+
+        if profile is not None and profile_dir is not None:
+            profile.add(result.profile or {})
+            save_profile_state(profile_dir, file_path, row_group, profile)
+
+        write_checkpoint(
+            log_writer=log_writer,
+            event_log_path=event_log_path,
+            file_path=file_path,
+            fingerprint=fingerprint,
+            row_group=row_group,
+            batch_number=batch_number,
+            rows_processed=rows_processed,
+        )
+
+        if control.signals.stop_requested():
             raise KeyboardInterrupt
 
+    return rows_processed
+
 
 def main() -> None:
     args = parse_args()
@@ -278,14 +2462,50 @@ def main() -> None:
     extension = normalize_extension(args.extension)
 
     batch_size = args.batch_size
+    auto_batch_size = None
 
-    if batch_size <= 0:
-        raise ValueError("Batch size must be greater than zero.")
+    if batch_size == "auto":
+        if args.target_batch_seconds <= 0 or args.max_memory_mb <= 0:
+            raise ValueError(
+                "--target-batch-seconds and --max-memory-mb must be positive."
+            )
+
+        auto_batch_size = AutoBatchSize(
+            min_rows=AUTO_BATCH_MIN_ROWS,
+            max_rows=AUTO_BATCH_MAX_ROWS,
+            target_seconds=args.target_batch_seconds,
+            memory_limit_mb=args.max_memory_mb,
+        )
+
+    if args.workers < 1:
+        raise ValueError("--workers must be at least 1.")
+
+    if args.gc_growth_mb <= 0:
+        raise ValueError("--gc-growth-mb must be positive.")
 
     stop_request_path = (
         output_dir / config["control"]["stop_request"]
     )
 
+    control = ValidatorControl(
+        signals=create_control_signals(stop_request_path, args.workers),
+        batch_size="auto" if auto_batch_size is not None else batch_size,
+        max_workers=args.workers,
+    )
+
+    rules = compile_rules(config.get("rules", []))
+
+    field_checks = None
+
+    if args.engine == "columnar":
+        field_checks = model_field_checks(TaxiTrip)
+
+        if field_checks is None:
+            print(
+                "TaxiTrip has rules without a columnar equivalent; "
+                "validating every row with Pydantic."
+            )
+
     files = discover_files(
         source_dir=source_dir,
         extension=extension,
@@ -296,157 +2516,366 @@ def main() -> None:
         output_config=config["outputs"],
     )
 
-    latest_statuses = load_latest_statuses(
-        output_paths.event_log
-    )
+    checkpoints = load_checkpoints(output_paths.event_log)
 
-    append_jsonl(
-        output_paths.progress,
-        {
-            "event_type": "run_started",
-            "source_directory": str(source_dir),
-            "output_directory": str(output_dir),
-            "file_extension": extension,
-            "files_discovered": len(files),
-            "batch_size": batch_size,
-            "started_at": utc_now(),
-        },
-    )
+    validation_cache = load_validation_cache(output_paths.cache)
+
+    taxi_trip_sha256 = model_sha256(TaxiTrip)
+    config_rules_sha256 = rules_sha256(config.get("rules", []))
+
+    fingerprints = {
+        file_path.name: file_fingerprint(
+            file_path,
+            taxi_trip_sha256,
+            config_rules_sha256,
+        )
+        for file_path in files
+    }
+
+    # Results of earlier runs for files unchanged since, under the same
+    # rules; files with no invalid rows are skipped, unless --profile
+    # still has their profile to write.
+    cached_summaries = {
+        file_name: validation_cache[fingerprint.key]["summary"]
+        for file_name, fingerprint in fingerprints.items()
+        if fingerprint.key in validation_cache
+        and not (
+            args.profile
+            and not profile_csv_path(output_dir, Path(file_name)).exists()
+        )
+    }
 
     print(f"Source directory: {source_dir}")
     print(f"Output directory: {output_dir}")
     print(f"File extension: {extension}")
     print(f"Files discovered: {len(files):,}")
-    print(f"Batch size: {batch_size:,}")
+    print(f"Validation engine: {args.engine}")
+    print(f"Rules: {len(rules):,}")
+    if auto_batch_size is not None:
+        print(
+            f"Batch size: auto ({AUTO_BATCH_MIN_ROWS:,}-"
+            f"{AUTO_BATCH_MAX_ROWS:,} rows, "
+            f"{args.target_batch_seconds:,.2f} s target, "
+            f"{args.max_memory_mb:,.0f} MB RSS ceiling)"
+        )
+    else:
+        print(f"Batch size: {batch_size:,}")
+
+    executor = None
+    row_group_futures: dict[str, list[Future]] = {}
+
+    if args.workers > 1:
+        print(f"Workers: {args.workers:,}")
+
+        # Queue every row group of the files this run will validate up
+        # front, so workers keep busy across file boundaries; the loop
+        # below writes their results one file at a time, in order.
+        executor = ProcessPoolExecutor(
+            max_workers=args.workers,
+            initializer=init_worker,
+            initargs=(args.gc_growth_mb, control.signals),
+        )
 
-    for file_path in files:
-        
-        previous_status = latest_statuses.get(file_path.name)
+        for file_path in files:
+            if (
+                file_path.name in cached_summaries
+                or file_path.name == args.fail_on
+            ):
+                continue
 
-        if (
-            previous_status
-            and previous_status.get("status") == "completed"
-        ):
-            append_jsonl(
-                output_paths.progress,
-                {
-                    "event_type": "file_skipped",
-                    "file": file_path.name,
-                    "reason": "previously_completed",
-                    "recorded_at": utc_now(),
-                },
+            first_row_group, _, _ = resume_position(
+                fingerprints[file_path.name],
+                checkpoints.get(file_path.name),
             )
 
-            print(f"Skipping completed file: {file_path.name}")
-            continue
+            row_group_futures[file_path.name] = [
+                executor.submit(
+                    validate_row_group,
+                    file_path=file_path,
+                    row_group=row_group,
+                    batch_size=batch_size,
+                    auto_batch_size=auto_batch_size,
+                    field_checks=field_checks,
+                    rules=rules,
+                    profile=args.profile,
+                )
+                for row_group in range(
+                    first_row_group,
+                    row_group_count(file_path),
+                )
+            ]
 
-        append_jsonl(
-            output_paths.progress,
-            {
-                "event_type": "file_started",
-                "file": file_path.name,
-                "recorded_at": utc_now(),
-            },
+    # Started after the worker processes are forked, so none inherits
+    # the writer thread's state.
+    log_writer = LogWriter(fsync_policy=args.fsync)
+    memory_policy = MemoryPolicy(growth_mb=args.gc_growth_mb)
+
+    control_server = None
+    control_endpoint_path = output_dir / config["control"]["endpoint"]
+
+    if args.control_port is not None:
+        control_server = start_control_server(control, args.control_port)
+        control_url = f"http://{CONTROL_HOST}:{control_server.server_port}"
+
+        # Tells the control page where this run is listening.
+        control_endpoint_path.write_text(
+            json.dumps({"url": control_url, "pid": os.getpid()}),
+            encoding="utf-8",
         )
 
-        print(f"Processing: {file_path.name}")
+        print(f"Control endpoint: {control_url}")
 
-        # Record that processing has begun.
-        append_jsonl(
-            output_paths.event_log,
+    try:
+        log_writer.append(
+            output_paths.progress,
             {
-                "file": file_path.name,
-                "status": "started",
+                "event_type": "run_started",
+                "source_directory": str(source_dir),
+                "output_directory": str(output_dir),
+                "file_extension": extension,
+                "files_discovered": len(files),
+                "batch_size": batch_size,
+                "engine": args.engine,
                 "started_at": utc_now(),
             },
         )
 
-        try:
-            # Temporary failure test.
-            if (
-                args.fail_on
-                and file_path.name == args.fail_on
-            ):
-                raise RuntimeError(
-                    f"Simulated failure for {file_path.name}"
+        for file_path in files:
+            fingerprint = fingerprints[file_path.name]
+            cached_summary = cached_summaries.get(file_path.name)
+
+            if cached_summary is not None and not cached_summary["invalid_rows"]:
+                log_writer.append(
+                    output_paths.progress,
+                    {
+                        "event_type": "file_skipped",
+                        "file": file_path.name,
+                        "reason": "unchanged_since_validated",
+                        "recorded_at": utc_now(),
+                    },
                 )
 
-            # Pydantic row validation.
-            validate_file(
-                file_path=file_path,
-                batch_size=batch_size,
-                progress_path=output_paths.progress,
-                stop_request_path=stop_request_path,
-            )
-
-            # Record successful completion.
-            append_jsonl(
-                output_paths.event_log,
-                {
-                    "file": file_path.name,
-                    "status": "completed",
-                    "completed_at": utc_now(),
-                },
-            )
+                print(f"Skipping unchanged valid file: {file_path.name}")
+                continue
 
-            append_jsonl(
+            log_writer.append(
                 output_paths.progress,
                 {
-                    "event_type": "file_completed",
+                    "event_type": "file_started",
                     "file": file_path.name,
                     "recorded_at": utc_now(),
                 },
             )
 
-            print(f"Completed: {file_path.name}")
+            print(f"Processing: {file_path.name}")
 
-        except KeyboardInterrupt:
-            append_jsonl(
-                output_paths.event_log,
-                {
-                    "file": file_path.name,
-                    "status": "interrupted",
-                    "interrupted_at": utc_now(),
-                },
+            checkpoint = checkpoints.get(file_path.name)
+            first_row_group, _, rows_validated = resume_position(
+                fingerprint,
+                checkpoint,
             )
 
-            append_jsonl(
-                output_paths.progress,
-                {
-                    "event_type": "file_interrupted",
-                    "file": file_path.name,
-                    "recorded_at": utc_now(),
-                },
-            )
+            if first_row_group:
+                print(
+                    f"  Resuming at row group {first_row_group:,} "
+                    f"({rows_validated:,} rows already validated)"
+                )
 
-            print(f"Interrupted: {file_path.name}")
-            return
+            profile = None
+
+            if args.profile and first_row_group == 0:
+                profile = ProfileAccumulator()
+            elif args.profile:
+                profile = load_profile_state(
+                    output_paths.profile_state,
+                    file_path,
+                    first_row_group - 1,
+                )
 
-        except Exception as error:
-            # Record the failure before the program exits.
-            append_jsonl(
+                if profile is None:
+                    print(
+                        "  No profile was saved with the checkpoint; "
+                        "this file will not be profiled"
+                    )
+
+            # Record that processing has begun.
+            log_writer.append(
                 output_paths.event_log,
                 {
                     "file": file_path.name,
-                    "status": "failed",
-                    "error": str(error),
-                    "failed_at": utc_now(),
+                    "status": "started",
+                    "started_at": utc_now(),
                 },
             )
 
-            append_jsonl(
-                output_paths.progress,
-                {
-                    "event_type": "file_failed",
-                    "file": file_path.name,
-                    "error": str(error),
-                    "recorded_at": utc_now(),
-                },
-            )
+            try:
+                # Temporary failure test.
+                if (
+                    args.fail_on
+                    and file_path.name == args.fail_on
+                ):
+                    raise RuntimeError(
+                        f"Simulated failure for {file_path.name}"
+                    )
+
+                # Unchanged since a validation that found invalid rows.
+                if cached_summary is not None:
+                    print("  Unchanged since validated; reusing the result")
+                    check_file_summary(cached_summary)
+
+                # Pydantic row validation.
+                if executor is not None:
+                    rows_processed = write_row_group_results(
+                        file_path=file_path,
+                        fingerprint=fingerprint,
+                        futures=row_group_futures.pop(file_path.name),
+                        log_writer=log_writer,
+                        progress_path=output_paths.progress,
+                        event_log_path=output_paths.event_log,
+                        errors_dir=output_paths.errors,
+                        control=control,
+                        rules=rules,
+                        checkpoint=checkpoint,
+                        profile=profile,
+                        profile_dir=output_paths.profile_state,
+                    )
+                else:
+                    rows_processed = validate_file(
+                        file_path=file_path,
+                        fingerprint=fingerprint,
+                        batch_size=batch_size,
+                        log_writer=log_writer,
+                        progress_path=output_paths.progress,
+                        event_log_path=output_paths.event_log,
+                        errors_dir=output_paths.errors,
+                        control=control,
+                        memory_policy=memory_policy,
+                        batch_sizer=(
+                            BatchSizer(settings=auto_batch_size)
+                            if auto_batch_size is not None
+                            else None
+                        ),
+                        field_checks=field_checks,
+                        rules=rules,
+                        checkpoint=checkpoint,
+                        profile=profile,
+                        profile_dir=output_paths.profile_state,
+                    )
+
+                summary = summarize_file_errors(
+                    errors_dir=output_paths.errors,
+                    file_path=file_path,
+                    rows_processed=rows_processed,
+                )
+
+                log_writer.append(output_paths.summary, summary)
+
+                save_validation_result(
+                    cache_path=output_paths.cache,
+                    cache=validation_cache,
+                    fingerprint=fingerprint,
+                    summary=summary,
+                )
+
+                for rule_name, violations in summary["rule_violations"].items():
+                    print(f"  Rule {rule_name}: {violations:,} violations")
+
+                if summary["invalid_rows"]:
+                    print(
+                        f"  {summary['invalid_rows']:,} invalid rows; "
+                        f"errors in {output_paths.errors / file_path.name}"
+                    )
+
+                if profile is not None:
+                    profile_path = profile_csv_path(output_dir, file_path)
+                    write_profile_csv(profile_path, profile)
+                    print(f"  Profile: {profile_path}")
+
+                check_file_summary(summary)
+
+                # Record successful completion.
+                log_writer.append(
+                    output_paths.event_log,
+                    {
+                        "file": file_path.name,
+                        "status": "completed",
+                        "completed_at": utc_now(),
+                    },
+                )
+
+                log_writer.append(
+                    output_paths.progress,
+                    {
+                        "event_type": "file_completed",
+                        "file": file_path.name,
+                        "recorded_at": utc_now(),
+                    },
+                )
+
+                print(f"Completed: {file_path.name}")
+
+                control.update(last_completed_file=file_path.name)
+
+                if control.stop_after_file:
+                    print("Stopping after this file, as requested")
+                    return
+
+            except KeyboardInterrupt:
+                log_writer.append(
+                    output_paths.event_log,
+                    {
+                        "file": file_path.name,
+                        "status": "interrupted",
+                        "interrupted_at": utc_now(),
+                    },
+                )
+
+                log_writer.append(
+                    output_paths.progress,
+                    {
+                        "event_type": "file_interrupted",
+                        "file": file_path.name,
+                        "recorded_at": utc_now(),
+                    },
+                )
+
+                print(f"Interrupted: {file_path.name}")
+                return
+
+            except Exception as error:
+                # Record the failure before the program exits.
+                log_writer.append(
+                    output_paths.event_log,
+                    {
+                        "file": file_path.name,
+                        "status": "failed",
+                        "error": str(error),
+                        "failed_at": utc_now(),
+                    },
+                )
+
+                log_writer.append(
+                    output_paths.progress,
+                    {
+                        "event_type": "file_failed",
+                        "file": file_path.name,
+                        "error": str(error),
+                        "recorded_at": utc_now(),
+                    },
+                )
+
+                print(f"Failed: {file_path.name}: {error}")
+                raise
+
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
 
-            print(f"Failed: {file_path.name}: {error}")
-            raise
+        if control_server is not None:
+            control_server.shutdown()
+            control_endpoint_path.unlink(missing_ok=True)
 
+        log_writer.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
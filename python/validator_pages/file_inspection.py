@@ -1,6 +1,8 @@
 from pathlib import Path
 import streamlit as st
 from datetime import datetime
+import duckdb
+import json
 import pyarrow.parquet as pq
 import tomllib
 from typing import Any
@@ -166,3 +168,81 @@ st.dataframe(
     width="stretch",
     hide_index=True,
 )
+
+st.subheader("Validation Findings")
+
+latest_summary = None
+
+if summary_path.exists():
+    with summary_path.open("r", encoding="utf-8") as file:
+        for line in file:
+            line = line.strip()
+
+            if not line:
+                continue
+
+            record = json.loads(line)
+
+            if record.get("file") == selected_file.name:
+                latest_summary = record
+
+if latest_summary is None:
+    st.info("This file has no validation summary yet.")
+    st.stop()
+
+rows_col, invalid_col, errors_col = st.columns(3)
+
+rows_col.metric(
+    "Rows validated",
+    f"{latest_summary['rows_processed']:,}",
+)
+
+invalid_col.metric(
+    "Invalid rows",
+    f"{latest_summary['invalid_rows']:,}",
+)
+
+errors_col.metric(
+    "Errors and rule violations",
+    f"{latest_summary['error_count']:,}",
+)
+
+if not latest_summary["errors"]:
+    st.success("No invalid rows were found.")
+    st.stop()
+
+st.dataframe(
+    [
+        {
+            "Source": error.get("source", "model"),
+            "Field": error["field"],
+            "Error type": error["error_type"],
+            "Count": error["count"],
+            "Top values": ", ".join(
+                f"{value['value']} ({value['count']:,})"
+                for value in error["top_values"]
+            ),
+        }
+        for error in latest_summary["errors"]
+    ],
+    width="stretch",
+    hide_index=True,
+)
+
+file_errors_path = errors_path / selected_file.name
+
+if file_errors_path.exists():
+    st.write("**First invalid rows**")
+
+    st.dataframe(
+        duckdb.sql(
+            "SELECT row_group, row_offset, source, field, error_type, value, "
+            "message "
+            "FROM read_parquet($errors) "
+            "ORDER BY row_group, row_offset, field "
+            "LIMIT 1000",
+            params={"errors": str(file_errors_path / "*.parquet")},
+        ).df(),
+        width="stretch",
+        hide_index=True,
+    )
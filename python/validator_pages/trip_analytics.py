@@ -50,42 +50,118 @@ progress_path = (
     data_out / config["outputs"]["progress"]
 )
 
-data_in = Path("./data_in").resolve()
-parquet_files = sorted(data_in.glob("*.parquet"))
+warehouse_path = data_out / config["warehouse"]["duckdb"]
+warehouse_table = config["warehouse"]["table"]
+
+trip_source = st.radio(
+    "Trip data",
+    options=["Parquet files", "DuckDB warehouse"],
+    horizontal=True,
+    help=(
+        "The warehouse is built by parquet_to_postgres.py "
+        f"--target duckdb:{warehouse_path}; it is sorted by pickup time, "
+        "so queries do not re-scan the raw Parquet files."
+    ),
+)
 
-if not parquet_files:
-    st.warning("No Parquet files were found.")
-    st.stop()
+use_warehouse = trip_source == "DuckDB warehouse"
 
-file_names = [file_path.name for file_path in parquet_files]
 
-choose_files = st.checkbox(
-    "Choose files",
-    value=False,
-)
+def quote_identifier(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+if use_warehouse:
+    if not warehouse_path.exists():
+        st.warning(
+            f"No DuckDB warehouse was found at {warehouse_path}. "
+            "Load one with parquet_to_postgres.py "
+            f"--target duckdb:{warehouse_path}"
+        )
+        st.stop()
 
-if choose_files:
-    selected_file_names = st.multiselect(
-        "Select Parquet files",
-        options=file_names,
-        default=file_names,
+    selected_files = []
+
+    # Column names follow python/loader/columns.toml in the warehouse.
+    trips_source = ".".join(
+        quote_identifier(part)
+        for part in warehouse_table.split(".", maxsplit=1)
+    )
+    pickup_location_column = "pu_location_id"
+
+    with duckdb.connect(str(warehouse_path), read_only=True) as connection:
+        warehouse_rows = connection.sql(
+            f"SELECT count(*) FROM {trips_source}"
+        ).fetchone()[0]
+
+        trip_distance_stats = connection.sql(
+            "SELECT * FROM gold.trip_distances_stats"
+        ).df()
+
+    st.metric(
+        "Warehouse trips",
+        f"{warehouse_rows:,}",
     )
 
-    selected_files = [
-        data_in / file_name
-        for file_name in selected_file_names
-    ]
+    with st.expander("Trip distance stats (gold.trip_distances_stats)"):
+        st.dataframe(
+            trip_distance_stats,
+            width="stretch",
+            hide_index=True,
+        )
 else:
-    selected_files = parquet_files
+    data_in = Path("./data_in").resolve()
+    parquet_files = sorted(data_in.glob("*.parquet"))
 
-if not selected_files:
-    st.warning("Select at least one Parquet file.")
-    st.stop()
+    if not parquet_files:
+        st.warning("No Parquet files were found.")
+        st.stop()
 
-st.metric(
-    "Files selected",
-    len(selected_files),
-)
+    file_names = [file_path.name for file_path in parquet_files]
+
+    choose_files = st.checkbox(
+        "Choose files",
+        value=False,
+    )
+
+    if choose_files:
+        selected_file_names = st.multiselect(
+            "Select Parquet files",
+            options=file_names,
+            default=file_names,
+        )
+
+        selected_files = [
+            data_in / file_name
+            for file_name in selected_file_names
+        ]
+    else:
+        selected_files = parquet_files
+
+    if not selected_files:
+        st.warning("Select at least one Parquet file.")
+        st.stop()
+
+    st.metric(
+        "Files selected",
+        len(selected_files),
+    )
+
+    file_list_sql = ", ".join(
+        "'" + str(file_path).replace("'", "''") + "'"
+        for file_path in selected_files
+    )
+
+    trips_source = f"read_parquet([{file_list_sql}])"
+    pickup_location_column = "PULocationID"
+
+
+def connect_trip_source() -> duckdb.DuckDBPyConnection:
+    """Open the warehouse read-only, or an in-memory database for Parquet."""
+    if use_warehouse:
+        return duckdb.connect(str(warehouse_path), read_only=True)
+
+    return duckdb.connect()
 
 payment_type_labels = {
     0: "Flex Fare trip",
@@ -173,6 +249,17 @@ if run_pandas:
 
   pickup_frames = []
 
+  if use_warehouse:
+      with connect_trip_source() as connection:
+          pickup_frames.append(
+              connection.sql(
+                  f"""
+                  SELECT tpep_pickup_datetime, payment_type
+                  FROM {trips_source}
+                  """
+              ).df()
+          )
+
   for file_path in selected_files:
       table = pq.read_table(
           file_path,
@@ -235,17 +322,7 @@ if show_pickup_map:
 
     started_at = perf_counter()
 
-    selected_file_paths: list[str] = [
-        str(file_path)
-        for file_path in selected_files
-    ]
-    
-    connection = duckdb.connect()
-
-    file_list_sql = ", ".join(
-            f"'{file_path.replace("'", "''")}'"
-            for file_path in selected_file_paths
-        )
+    connection = connect_trip_source()
 
     payment_type_sql = ", ".join(
             str(payment_type)
@@ -255,14 +332,14 @@ if show_pickup_map:
     trips_by_zone = connection.sql(
         f"""
         SELECT
-            PULocationID AS "LocationID",
+            {pickup_location_column} AS "LocationID",
             COUNT(*) AS "TripCount"
-        FROM read_parquet([{file_list_sql}])
+        FROM {trips_source}
         WHERE payment_type IN ({payment_type_sql})
-        AND PULocationID IS NOT NULL
-        AND PULocationID > 0
-        GROUP BY PULocationID
-        ORDER BY PULocationID
+        AND {pickup_location_column} IS NOT NULL
+        AND {pickup_location_column} > 0
+        GROUP BY {pickup_location_column}
+        ORDER BY {pickup_location_column}
         """
     ).df()
 
@@ -333,17 +410,7 @@ if run_duckdb:
 
     started_at = perf_counter()
 
-    selected_file_paths: list[str] = [
-        str(file_path)
-        for file_path in selected_files
-    ]
-
-    connection = duckdb.connect()
-
-    file_list_sql = ", ".join(
-        f"'{file_path.replace("'", "''")}'"
-        for file_path in selected_file_paths
-    )
+    connection = connect_trip_source()
 
     payment_type_sql = ", ".join(
         str(payment_type)
@@ -358,7 +425,7 @@ if run_duckdb:
                 AS INTEGER
             ) AS "Pickup hour",
             COUNT(*) AS "Trips"
-        FROM read_parquet([{file_list_sql}])
+        FROM {trips_source}
         WHERE payment_type IN ({payment_type_sql})
         GROUP BY 1
         ORDER BY 1
@@ -385,17 +452,7 @@ if run_duckdb:
 if run_payment_type:
     started_at = perf_counter()
 
-    selected_file_paths: list[str] = [
-        str(file_path)
-        for file_path in selected_files
-    ]
-
-    connection = duckdb.connect()
-
-    file_list_sql = ", ".join(
-        f"'{file_path.replace("'", "''")}'"
-        for file_path in selected_file_paths
-    )
+    connection = connect_trip_source()
 
     trips_by_payment_type = connection.sql(
         f"""
@@ -411,7 +468,7 @@ if run_payment_type:
                 ELSE 'Other'
             END AS "Payment type",
             COUNT(*) AS "Trips"
-        FROM read_parquet([{file_list_sql}])
+        FROM {trips_source}
         GROUP BY payment_type
         ORDER BY "Trips" DESC
         """
@@ -49,6 +49,18 @@ def read_progress_records(
     return records
 
 
+# batch_completed timing fields and their chart labels, in hot-path order.
+TIMING_STAGES = {
+    "decode_ms": "Decode",
+    "to_pylist_ms": "to_pylist",
+    "model_ms": "Model validation",
+    "rules_ms": "Rules",
+    "profile_ms": "Profile",
+    "gc_ms": "GC",
+    "progress_ms": "Progress I/O",
+}
+
+
 config = load_config(CONFIG_PATH)
 
 st.title("Validation Analytics")
@@ -61,8 +73,23 @@ default_data_out = "./data_out"
 data_in = Path(default_data_in).expanduser().resolve()
 data_out = Path(default_data_out).expanduser().resolve()
 
-progress_path = (
-    data_out / config["outputs"]["progress"]
+# parquet_to_postgres.py --telemetry writes the same record shape.
+progress_sources = {
+    "Validation": data_out / config["outputs"]["progress"],
+    "Postgres load": data_out / config["outputs"]["load_progress"],
+}
+
+progress_source = st.radio(
+    "Progress log",
+    options=list(progress_sources),
+    horizontal=True,
+)
+
+progress_path = progress_sources[progress_source]
+rows_label = (
+    "Rows validated"
+    if progress_source == "Validation"
+    else "Rows loaded"
 )
 
 event_log_path = data_out / config["outputs"]["event_log"]
@@ -150,7 +177,7 @@ def show_live_analytics():
     col1, col2, col3 = st.columns(3)
 
     col1.metric(
-        label="Rows validated",
+        label=rows_label,
         value=f"{rows_completed:,}",
     )
 
@@ -166,10 +193,10 @@ def show_live_analytics():
 
     st.progress(
         progress_ratio,
-        text=f"{progress_ratio:.1%} of all rows validated",
+        text=f"{progress_ratio:.1%} of all rows {rows_label.split()[1]}",
     )
 
-    st.subheader("Memory Usage")
+    st.subheader("Memory and Timing")
 
     latest_batch_record = max(
         batch_records,
@@ -214,20 +241,57 @@ def show_live_analytics():
             key="memory_file",
         )
 
+    selected_records = [
+        record
+        for record in batch_records
+        if record["file"] == selected_memory_file
+    ]
+
     memory_records = [
         {
             "Batch": record["batch_number"],
             "Memory (MB)": record["memory_mb"],
+            "Rows/s": record.get("rows_per_second"),
         }
-        for record in batch_records
-        if record["file"] == selected_memory_file
+        for record in selected_records
     ]
 
-    st.line_chart(
-        memory_records,
-        x="Batch",
-        y="Memory (MB)",
-    )
+    # Older progress logs, and the Postgres load, have no timings.
+    timing_records = [
+        {
+            "Batch": record["batch_number"],
+            **{
+                label: record[stage]
+                for stage, label in TIMING_STAGES.items()
+            },
+        }
+        for record in selected_records
+        if all(stage in record for stage in TIMING_STAGES)
+    ]
+
+    memory_col, timing_col = st.columns(2)
+
+    with memory_col:
+        st.markdown("**Memory (MB)**")
+
+        st.line_chart(
+            memory_records,
+            x="Batch",
+            y="Memory (MB)",
+        )
+
+    with timing_col:
+        st.markdown("**Batch time by stage (ms)**")
+
+        if timing_records:
+            st.bar_chart(
+                timing_records,
+                x="Batch",
+                y=list(TIMING_STAGES.values()),
+                stack=True,
+            )
+        else:
+            st.info("No timing records have been recorded for this file.")
 
     st.dataframe(
         memory_records,
@@ -5,6 +5,8 @@ from pathlib import Path
 from typing import Any
 import streamlit as st
 import json
+import urllib.error
+import urllib.request
 
 
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
@@ -79,6 +81,36 @@ def read_event_records(
     return records
 
 
+def send_control_command(
+    endpoint_path: Path,
+    command: str,
+    method: str = "POST",
+) -> dict[str, Any] | None:
+    """Send a command to the running validator's control endpoint.
+
+    Returns the validator status, or None if no endpoint is listening.
+    """
+    if not endpoint_path.exists():
+        return None
+
+    endpoint = json.loads(endpoint_path.read_text(encoding="utf-8"))
+
+    request = urllib.request.Request(
+        f"{endpoint['url']}/{command}",
+        method=method,
+    )
+
+    try:
+        with urllib.request.urlopen(request, timeout=2) as response:
+            return json.loads(response.read())
+    except urllib.error.HTTPError as error:
+        st.warning(json.loads(error.read()).get("error", str(error)))
+    except urllib.error.URLError:
+        pass
+
+    return None
+
+
 config = load_config(CONFIG_PATH)
 
 st.title("Validation Controls")
@@ -111,12 +143,42 @@ with extension_col:
         value=".parquet",
     )
 
+    validation_engine = st.selectbox(
+        "Validation engine",
+        options=["columnar", "pydantic"],
+        help=(
+            "columnar checks types with Arrow and runs Pydantic only on "
+            "failing rows; pydantic validates every row."
+        ),
+    )
+
+    profile_files = st.checkbox(
+        "Profile files",
+        value=False,
+        help="Also write <stem>_profile.csv from the same pass (--profile).",
+    )
+
 with batch_size_col:
+    adaptive_batches = st.checkbox(
+        "Adaptive batch size",
+        value=False,
+        help="Pass --batch-size auto to size batches by latency and memory.",
+    )
+
     batch_size = st.number_input(
         "Batch size",
         min_value=1,
         value=50_000,
         step=10_000,
+        disabled=adaptive_batches,
+    )
+
+    workers = st.number_input(
+        "Workers",
+        min_value=1,
+        value=1,
+        step=1,
+        help="Validation processes; row groups are validated in parallel.",
     )
 
 data_in = Path(source_directory).expanduser().resolve()
@@ -134,6 +196,10 @@ stop_request_path = (
     data_out / config["control"]["stop_request"]
 )
 
+control_endpoint_path = (
+    data_out / config["control"]["endpoint"]
+)
+
 if "validator_process" not in st.session_state:
     st.session_state.validator_process = None
 
@@ -180,9 +246,18 @@ if start_clicked:
             "--extension",
             extension,
             "--batch-size",
-            str(batch_size),
+            "auto" if adaptive_batches else str(batch_size),
+            "--engine",
+            validation_engine,
+            "--workers",
+            str(workers),
+            "--control-port",
+            "0",
         ]
 
+        if profile_files:
+            command.append("--profile")
+
         st.session_state.validator_process = subprocess.Popen(
             command,
             cwd=PROJECT_ROOT,
@@ -203,6 +278,57 @@ if stop_clicked:
     st.rerun()
 
 
+if validator_running:
+    st.subheader("Live Control")
+
+    pause_col, resume_col, stop_after_col = st.columns(3)
+
+    with pause_col:
+        if st.button("Pause", width="stretch"):
+            send_control_command(control_endpoint_path, "pause")
+
+    with resume_col:
+        if st.button("Resume", width="stretch"):
+            send_control_command(control_endpoint_path, "resume")
+
+    with stop_after_col:
+        if st.button("Stop after file", width="stretch"):
+            send_control_command(control_endpoint_path, "stop-after-file")
+
+    live_batch_col, live_workers_col = st.columns(2)
+
+    with live_batch_col:
+        live_batch_size = st.number_input(
+            "Live batch size",
+            min_value=0,
+            value=0,
+            step=10_000,
+            help="Applies from the next batch; 0 restores the start value.",
+        )
+
+        if st.button("Set batch size", width="stretch"):
+            send_control_command(
+                control_endpoint_path,
+                f"batch-size?rows={live_batch_size}",
+            )
+
+    with live_workers_col:
+        live_workers = st.number_input(
+            "Live workers",
+            min_value=1,
+            max_value=int(workers),
+            value=int(workers),
+            step=1,
+            help="Row groups running at once, up to the workers started with.",
+        )
+
+        if st.button("Set workers", width="stretch"):
+            send_control_command(
+                control_endpoint_path,
+                f"workers?count={live_workers}",
+            )
+
+
 @st.fragment(run_every="1s")
 def display_validation_events(
     event_log_path: Path,
@@ -222,6 +348,10 @@ def display_validation_events(
     for record in records:
         filename = record.get("file")
 
+        # Row-group checkpoints are resume points, not file statuses.
+        if record.get("status") == "checkpoint":
+            continue
+
         if isinstance(filename, str):
             latest_by_file[filename] = record
 
@@ -266,14 +396,25 @@ def display_validator_status() -> None:
         st.info("Validation has not been started.")
 
     elif process.poll() is None:
+        status = send_control_command(
+            control_endpoint_path,
+            "status",
+            method="GET",
+        )
+
         if stop_request_path.exists():
             st.warning(
                 "Stop requested. "
                 "Validation will stop after the current batch."
             )
+        elif status is not None and status["state"] == "paused":
+            st.warning("Validation is paused.")
         else:
             st.info("Validation is running.")
 
+        if status is not None:
+            st.json(status, expanded=False)
+
     elif process.returncode == 0:
         st.session_state.pop("stop_message", None)
         st.success("Validation process ended.")
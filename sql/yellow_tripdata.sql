@@ -21,5 +21,6 @@ CREATE TABLE bronze.yellow_tripdata (
     improvement_surcharge numeric(18,4) NOT NULL,
     total_amount numeric(18,4) NOT NULL,
     congestion_surcharge numeric(18,4),
-    airport_fee numeric(18,4)
+    airport_fee numeric(18,4),
+    cbd_congestion_fee numeric(18,4)
 );
\ No newline at end of file